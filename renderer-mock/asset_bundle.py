@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Per-order asset bundles for single-fetch rendering.
+Packs exactly the assets one book needs (its backgrounds and character
+overlays, the text-box overlay, the font and the page CSS) into one file:
+
+    b'LHBBNDL1' | uint64 header length | JSON header | blobs
+
+The header maps each asset name (its path under renderer-mock/assets, e.g.
+"backgrounds/page01_bedroom.png") to its offset, length, content type and
+sha256. Blobs are raw file bytes aligned to 64 bytes, so AssetBundle can
+memory-map the file and hand out memoryviews without copying, and
+page_server sends members with sendfile() at /<path>/ORDER.lhb/<name>.
+
+    python asset_bundle.py pack book.json -o ORDER-1.lhb
+    python asset_bundle.py pack --demo -o demo.lhb
+    python asset_bundle.py list demo.lhb
+"""
+
+from functools import lru_cache
+import argparse
+import hashlib
+import io
+import json
+import mimetypes
+import mmap
+import os
+import struct
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(SCRIPT_DIR, 'assets')
+MAGIC = b'LHBBNDL1'
+VERSION = 1
+ALIGN = 64
+SUFFIX = '.lhb'
+# Shared by every page of every book
+COMMON_ASSETS = ('fonts/custom-font.ttf', 'css/page-styles.css')
+TEXT_BOX = 'overlays/text-boxes/standard-box.png'
+COPY_CHUNK = 1 << 20
+
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def asset_name(path, taken=()):
+    """Bundle name for a file: its path under ASSETS_DIR, else external/<file name>"""
+    rel = os.path.relpath(os.path.abspath(path), ASSETS_DIR)
+    if rel.startswith(os.pardir):
+        stem, ext = os.path.splitext(os.path.basename(path))
+        rel, n = f"external/{stem}{ext}", 1
+        while rel in taken:
+            n += 1
+            rel = f"external/{stem}-{n}{ext}"
+    return rel.replace(os.sep, '/')
+
+
+def order_assets(pages, assets_dir=ASSETS_DIR):
+    """{name: path} of everything a book's pages need, in first-use order
+
+    pages use the page_compositor book format; a page may name its own
+    "text_box" image, otherwise the standard box is used for text pages.
+    """
+    paths = []
+    for page in pages:
+        for field in ('background', 'character', 'text_box'):
+            if page.get(field):
+                paths.append(page[field])
+        if page.get('text') and not page.get('text_box'):
+            paths.append(os.path.join(assets_dir, TEXT_BOX))
+    paths.extend(os.path.join(assets_dir, rel) for rel in COMMON_ASSETS)
+
+    assets = {}
+    seen = set()
+    for path in paths:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            assets[asset_name(path, assets)] = path
+    return assets
+
+
+def pack_bundle(assets, output_path, order=None):
+    """Write {name: path} into one bundle; returns the header entries
+
+    Files are streamed in, so the packer never holds more than a chunk.
+    Missing files raise FileNotFoundError before anything is written.
+    """
+    entries = {}
+    offset = 0
+    for name, path in assets.items():
+        size = os.path.getsize(path)
+        entries[name] = {'offset': offset, 'length': size,
+                         'type': mimetypes.guess_type(path)[0] or 'application/octet-stream'}
+        offset = _aligned(offset + size)
+
+    # sha256s are filled in while copying, so reserve their space in the header
+    for entry in entries.values():
+        entry['sha256'] = '0' * 64
+    header_len = len(json.dumps({'version': VERSION, 'order': order, 'assets': entries},
+                                separators=(',', ':')).encode('utf-8'))
+    data_start = _aligned(len(MAGIC) + 8 + header_len)
+
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as out:
+            for name, path in assets.items():
+                digest = hashlib.sha256()
+                out.seek(data_start + entries[name]['offset'])
+                with open(path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(COPY_CHUNK), b''):
+                        digest.update(chunk)
+                        out.write(chunk)
+                entries[name]['sha256'] = digest.hexdigest()
+            out.truncate(data_start + offset)
+            header = json.dumps({'version': VERSION, 'order': order, 'assets': entries},
+                                separators=(',', ':')).encode('utf-8')
+            out.seek(0)
+            out.write(MAGIC + struct.pack('<Q', len(header)) + header)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return entries
+
+
+def read_index(f):
+    """Parse a bundle header from an open binary file
+
+    Returns (header, data_start); member bytes live at data_start + offset.
+    """
+    prefix = f.read(len(MAGIC) + 8)
+    if len(prefix) < len(MAGIC) + 8 or prefix[:len(MAGIC)] != MAGIC:
+        raise ValueError("not an asset bundle")
+    (header_len,) = struct.unpack('<Q', prefix[len(MAGIC):])
+    header = json.loads(f.read(header_len))
+    if header.get('version') != VERSION:
+        raise ValueError(f"unsupported bundle version {header.get('version')}")
+    return header, _aligned(len(MAGIC) + 8 + header_len)
+
+
+@lru_cache(maxsize=64)
+def _cached_index(path, mtime_ns, size):
+    with open(path, 'rb') as f:
+        return read_index(f)
+
+
+def bundle_index(path):
+    """read_index() for a bundle on disk, memoised on its mtime and size"""
+    st = os.stat(path)
+    return _cached_index(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+class AssetBundle:
+    """Memory-mapped, read-only view of a bundle
+
+    view() returns a zero-copy memoryview into the mapping; release views
+    before close().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.header, self._data = read_index(f)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.assets = self.header['assets']
+        self.order = self.header.get('order')
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, name):
+        return name in self.assets
+
+    def names(self):
+        return list(self.assets)
+
+    def view(self, name):
+        """The member's bytes as a memoryview into the mapping"""
+        entry = self.assets[name]
+        start = self._data + entry['offset']
+        return memoryview(self._map)[start:start + entry['length']]
+
+    def read(self, name):
+        return bytes(self.view(name))
+
+    def image(self, name):
+        """Decode an image member (the decoder reads it from a copy of the bytes)"""
+        from PIL import Image
+        image = Image.open(io.BytesIO(self.view(name)))
+        image.load()
+        return image
+
+    def verify(self):
+        """Names whose bytes no longer match their recorded sha256"""
+        return [name for name, entry in self.assets.items()
+                if hashlib.sha256(self.view(name)).hexdigest() != entry['sha256']]
+
+    def extract(self, name, output_path):
+        with open(output_path, 'wb') as f:
+            f.write(self.view(name))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Pack and inspect per-order asset bundles")
+    commands = parser.add_subparsers(dest='command', required=True)
+    pack = commands.add_parser('pack', help="bundle the assets a book needs")
+    pack.add_argument('book', nargs='?', help="book JSON (see page_compositor.py)")
+    pack.add_argument('--demo', action='store_true', help="bundle the demo book from the mock assets")
+    pack.add_argument('--order', help="order id to record (default: the output name)")
+    pack.add_argument('-o', '--output', required=True)
+    listing = commands.add_parser('list', help="list a bundle's members")
+    listing.add_argument('bundle')
+    listing.add_argument('--verify', action='store_true', help="also check every member's sha256")
+    args = parser.parse_args()
+
+    if args.command == 'pack':
+        from page_compositor import demo_pages, load_book
+        if not args.book and not args.demo:
+            parser.error("pass a book JSON file or --demo")
+        pages = demo_pages() if args.demo else load_book(args.book)
+        order = args.order or os.path.basename(args.output).rsplit(SUFFIX, 1)[0]
+        entries = pack_bundle(order_assets(pages), args.output, order)
+        total = sum(entry['length'] for entry in entries.values())
+        print(f"✅ Packed {len(entries)} assets ({total / 2**20:.1f} MB) into {args.output}")
+    else:
+        with AssetBundle(args.bundle) as bundle:
+            print(f"{args.bundle}: order {bundle.order}, {len(bundle.assets)} assets")
+            for name, entry in bundle.assets.items():
+                print(f"  {name:48s} {entry['length']:>10,}  {entry['type']}")
+            if args.verify:
+                bad = bundle.verify()
+                print("✅ All members verified" if not bad else f"❌ Corrupt: {', '.join(bad)}")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Placeholder background generator for the mock renderer.
+Pages are rendered in parallel, fonts are loaded once per worker, the label
+text is rasterised once per page into a mask that is pasted for the outline
+and the fill, and the flat-colour output can be encoded in a fast mode.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageFont
+import json
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(SCRIPT_DIR, 'assets/backgrounds')
+# Shared tooling (timing spans) lives in ../scripts
+SCRIPTS_DIR = os.path.normpath(os.path.join(SCRIPT_DIR, '../scripts'))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.append(SCRIPTS_DIR)
+from instrumentation import span  # noqa: E402
+
+# Image specifications
+WIDTH = 3375   # 11.25 inches at 300 DPI (11" + 0.125" bleed each side)
+HEIGHT = 2625  # 8.75 inches at 300 DPI (8.25" + 0.25" bleed top/bottom)
+DPI = 300
+FONT_SIZE = 120
+FONT_CANDIDATES = ("/System/Library/Fonts/Arial.ttf", "/System/Library/Fonts/Helvetica.ttc")
+
+# Page descriptions for The Adventure Compass story
+PAGES = [
+    ("page01_bedroom", "Bedroom Scene", (135, 206, 235)),  # Sky blue
+    ("page02_bedroom_night", "Bedroom Night", (25, 25, 112)),  # Midnight blue
+    ("page03_forest", "Forest Path", (34, 139, 34)),  # Forest green
+    ("page04_mountain", "Mountain View", (139, 137, 137)),  # Gray
+    ("page05_sky", "Sky Scene", (135, 206, 235)),  # Sky blue
+    ("page06_sea", "Ocean Scene", (0, 191, 255)),  # Deep sky blue
+    ("page07_picnic", "Picnic Area", (255, 228, 196)),  # Bisque
+    ("page08_cave", "Cave Entrance", (105, 105, 105)),  # Dim gray
+    ("page09_garden", "Garden Scene", (144, 238, 144)),  # Light green
+    ("page10_town", "Town Square", (255, 218, 185)),  # Peach puff
+    ("page11_bedroom_return", "Bedroom Return", (135, 206, 235)),  # Sky blue
+    ("page12_compass_glow", "Compass Glow", (255, 215, 0)),  # Gold
+    ("page13_keepsake_frame", "Keepsake Frame", (255, 228, 196)),  # Bisque
+    ("page14_dedication_frame", "Dedication Frame", (255, 228, 196))  # Bisque
+]
+
+# PNG encodings: default matches the original output, fast trades size for
+# speed, palette stores the flat colours as an 8-bit palette (smallest, and
+# still faster than default)
+ENCODINGS = ('default', 'fast', 'palette')
+
+
+@lru_cache(maxsize=None)
+def load_font(size=FONT_SIZE):
+    """Load the label font once per process"""
+    for path in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def page_label(filename, description):
+    return f"{filename}\n{description}\n11.25\" × 8.75\" @ 300 DPI\n(11\" × 8.25\" trim)"
+
+
+def render_label(text, font):
+    """Rasterise text once into an 'L' mask of its ink
+
+    Returns (mask, (dx, dy), bbox): (dx, dy) is the mask's offset from the
+    text origin and bbox the text's bounding box at (0, 0), which can start
+    left of or above the origin (negative bearings).
+    """
+    bbox = ImageDraw.Draw(Image.new('L', (1, 1))).textbbox((0, 0), text, font=font)
+    mask = Image.new('L', (bbox[2] - bbox[0], bbox[3] - bbox[1]), 0)
+    ImageDraw.Draw(mask).text((-bbox[0], -bbox[1]), text, fill=255, font=font)
+    return mask, (bbox[0], bbox[1]), bbox
+
+
+def render_background(filename, description, color, width=WIDTH, height=HEIGHT, font=None, outline=2):
+    """Return the placeholder background for one page
+
+    The label mask is pasted as the black copies at -outline and +outline
+    and the white copy on top; paste() blends a colour through a mask as
+    draw.text does, so this matches the original three draw.text calls.
+    """
+    font = font or load_font()
+    img = Image.new('RGB', (width, height), tuple(color))
+    mask, (dx, dy), bbox = render_label(page_label(filename, description), font)
+
+    # Centre the text block as before
+    x = (width - (bbox[2] - bbox[0])) // 2 + dx
+    y = (height - (bbox[3] - bbox[1])) // 2 + dy
+    for (ox, oy), colour in (((-outline, -outline), (0, 0, 0)),
+                             ((outline, outline), (0, 0, 0)),
+                             ((0, 0), (255, 255, 255))):
+        img.paste(colour, (x + ox, y + oy), mask)
+    return img
+
+
+def save_background(img, path, encoding='default'):
+    """Encode a background as PNG"""
+    if encoding == 'fast':
+        img.save(path, "PNG", dpi=(DPI, DPI), compress_level=1)
+    elif encoding == 'palette':
+        img.quantize(colors=256, method=Image.Quantize.FASTOCTREE).save(
+            path, "PNG", dpi=(DPI, DPI), compress_level=1)
+    else:
+        img.save(path, "PNG", dpi=(DPI, DPI))
+
+
+def generate_page(page, output_dir=OUTPUT_DIR, encoding='default', width=WIDTH, height=HEIGHT):
+    """Render and save one (filename, description, color) page; returns its path"""
+    filename, description, color = page
+    path = os.path.join(output_dir, f"{filename}.png")
+    with span('render', tool='backgrounds'):
+        img = render_background(filename, description, color, width, height)
+    with span('encode', tool='backgrounds', encoding=encoding) as s:
+        save_background(img, path, encoding)
+        s.bytes_out = os.path.getsize(path)
+    return path
+
+
+def generate_backgrounds(pages=PAGES, output_dir=OUTPUT_DIR, encoding='default', workers=None,
+                         width=WIDTH, height=HEIGHT):
+    """Render every page across a process pool; yields output paths in page order"""
+    os.makedirs(output_dir, exist_ok=True)
+    if workers == 1 or len(pages) <= 1:
+        for page in pages:
+            yield generate_page(page, output_dir, encoding, width, height)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=load_font) as pool:
+        futures = [pool.submit(generate_page, page, output_dir, encoding, width, height)
+                   for page in pages]
+        for future in futures:
+            yield future.result()
+
+
+def load_pages(path):
+    """Read a page list from JSON
+
+    Accepts [{"filename": ..., "description": ..., "color": [r, g, b] or "#rrggbb"}, ...]
+    or the same as [filename, description, color] triples.
+    """
+    with open(path, 'r') as f:
+        entries = json.load(f)
+    pages = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            entry = (entry['filename'], entry.get('description', entry['filename']), entry['color'])
+        filename, description, color = entry
+        if isinstance(color, str):
+            color = color.lstrip('#')
+            color = tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+        pages.append((filename, description, tuple(color)))
+    return pages
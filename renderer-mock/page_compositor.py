@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Local page compositor for the book renderer.
+Builds each 300 DPI page from its background, character overlay, text box
+and story text following STYLE_GUIDE.md, and appends the pages to a single
+PDF one at a time, so only one page is held in memory. Backgrounds are
+decoded for their page and dropped with it (a book uses each one once);
+fitted character overlays, fonts and text boxes are shared across pages and
+books in bounded caches. Nothing touches the network.
+
+A book is a JSON file:
+
+    {"pages": [{"background": "assets/backgrounds/page01_bedroom.png",
+                "character": "assets/overlays/characters/pose01.png",
+                "position": "right",
+                "text": "It was a nice night in Seattle.<br>Ava went outside."}]}
+
+Relative paths are resolved against the book file. A page may give
+"background_color" ([r, g, b] or "#rrggbb") instead of a background image.
+"""
+
+from collections import OrderedDict
+from PIL import Image, ImageDraw, ImageOps
+import argparse
+import json
+import os
+import sys
+import time
+from backgrounds import DPI, HEIGHT, PAGES, WIDTH
+from text_boxes import TextBoxFactory, parse_color
+from text_layout import FONT_PATH, PX, STYLE, TextLayout
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Shared tooling (timing spans) lives in ../scripts
+SCRIPTS_DIR = os.path.normpath(os.path.join(SCRIPT_DIR, '../scripts'))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.append(SCRIPTS_DIR)
+from instrumentation import span  # noqa: E402
+ASSETS_DIR = os.path.join(SCRIPT_DIR, 'assets')
+# Fitted character overlays kept across pages and books (~5 MB each)
+MAX_IMAGE_BYTES = 64 * 1024 * 1024
+
+# LOCKED-IN specifications from assets/css/page-styles.css (text metrics
+# live in text_layout.STYLE)
+TEXT_COLOR = '#312116'
+TEXT_BOX = {'bottom': 0.03, 'radius': 50, 'color': 'ede9c1', 'opacity': 128}
+CHARACTER = {'width': 250, 'top': 0.25, 'inset': 0.08}
+
+
+def _image_bytes(image):
+    # Pillow stores RGB and RGBA images at 4 bytes per pixel
+    return image.width * image.height * 4
+
+
+class PageCompositor:
+    """Composite book pages at print resolution, caching decoded assets"""
+
+    def __init__(self, width=WIDTH, height=HEIGHT, font_path=FONT_PATH, boxes=None,
+                 layout=None, max_image_bytes=MAX_IMAGE_BYTES):
+        self.width = width
+        self.height = height
+        self.boxes = boxes or TextBoxFactory()
+        self.layout = layout or TextLayout(font_path, page_width=width)
+        self.max_image_bytes = max_image_bytes
+        self.images = OrderedDict()
+        self.image_bytes = 0
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def image(self, path, fit):
+        """Decode path and fit it ('cover' the page or 'character' width)
+
+        'character' fits are memoised in an LRU bounded by max_image_bytes,
+        keyed on the file's mtime and size so edited assets are picked up
+        without restarting. 'cover' fits (a full page each) are decoded on
+        every call and not kept.
+        """
+        st = os.stat(path)
+        if fit == 'cover':
+            return self._decode(path, fit, st)
+        key = (os.path.abspath(path), st.st_mtime_ns, st.st_size, fit)
+        image = self.images.get(key)
+        if image is not None:
+            self.images.move_to_end(key)
+            self.stats['hits'] += 1
+            return image
+        self.stats['misses'] += 1
+
+        image = self._decode(path, fit, st)
+        size = _image_bytes(image)
+        if size <= self.max_image_bytes:
+            self.images[key] = image
+            self.image_bytes += size
+            while self.image_bytes > self.max_image_bytes:
+                self.image_bytes -= _image_bytes(self.images.popitem(last=False)[1])
+        return image
+
+    def _decode(self, path, fit, st):
+        with span('decode', tool='page_compositor', fit=fit) as s, Image.open(path) as source:
+            s.bytes_in = st.st_size
+            if fit == 'cover':
+                image = ImageOps.fit(source.convert('RGB'), (self.width, self.height),
+                                     Image.Resampling.LANCZOS)
+            else:
+                source = source.convert('RGBA')
+                width = round(CHARACTER['width'] * PX)
+                image = source.resize((width, round(source.height * width / source.width)),
+                                      Image.Resampling.LANCZOS)
+        return image
+
+    def background(self, page):
+        if page.get('background'):
+            return self.image(page['background'], 'cover')
+        color = page.get('background_color', (255, 255, 255))
+        return Image.new('RGB', (self.width, self.height), parse_color(color))
+
+    def draw_text(self, page_image, text, layout=None):
+        """Draw the text box and centred story text onto page_image
+
+        layout is a text_layout fit for text; it is computed here if not given.
+        """
+        layout = layout or self.layout.fit(text)
+        box_width, box_height = layout['box_width'], layout['box_height']
+        x = (self.width - box_width) // 2
+        y = self.height - round(self.height * TEXT_BOX['bottom']) - box_height
+        box = self.boxes.get(box_width, box_height, radius=round(TEXT_BOX['radius'] * PX),
+                             color=TEXT_BOX['color'], opacity=TEXT_BOX['opacity'])
+        page_image.paste(box, (x, y), box)
+
+        draw = ImageDraw.Draw(page_image)
+        font = self.layout.font(layout['font_size'])
+        metrics = self.layout.metrics(layout['font_size'])
+        fill = parse_color(TEXT_COLOR)
+        line_height = layout['line_height']
+        ascent, descent = font.getmetrics()
+        top = y + round(STYLE['padding'][0] * PX) + (line_height - ascent - descent) // 2
+        for i, line in enumerate(layout['lines']):
+            offsets, width = metrics.positions(line, layout['spacing'])
+            line_x = x + (box_width - width) / 2
+            for char, offset in zip(line, offsets):
+                if not char.isspace():
+                    draw.text((line_x + offset, top + i * line_height), char, font=font, fill=fill)
+
+    def draw_character(self, page_image, path, position='right'):
+        character = self.image(path, 'character')
+        inset = round(self.width * CHARACTER['inset'])
+        if position == 'left':
+            x = inset
+        elif position == 'center':
+            x = (self.width - character.width) // 2
+        else:
+            x = self.width - inset - character.width
+        page_image.paste(character, (x, round(self.height * CHARACTER['top'])), character)
+
+    def compose(self, page, layout=None):
+        """Return one finished RGB page"""
+        page_image = self.background(page)
+        if page.get('character'):
+            self.draw_character(page_image, page['character'], page.get('position', 'right'))
+        if page.get('text'):
+            self.draw_text(page_image, page['text'], layout)
+        return page_image
+
+    def render_book(self, pages, output_path, layouts=None):
+        """Compose pages and write them to one PDF; returns the page count
+
+        All story text is laid out up front in one batch unless layouts are
+        given.
+        """
+        pages = list(pages)
+        if layouts is None:
+            with span('layout', tool='page_compositor'):
+                layouts = self.layout.layout_book([page.get('text') or '' for page in pages])
+        tmp_path = output_path + '.tmp'
+        count = 0
+        try:
+            for page, layout in zip(pages, layouts):
+                with span('compose', tool='page_compositor'):
+                    page_image = self.compose(page, layout)
+                with span('encode', tool='page_compositor', format='pdf') as s:
+                    before = os.path.getsize(tmp_path) if count else 0
+                    page_image.save(tmp_path, 'PDF', resolution=DPI, append=count > 0)
+                    s.bytes_out = os.path.getsize(tmp_path) - before
+                count += 1
+            if count:
+                os.replace(tmp_path, output_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return count
+
+
+def load_book(path):
+    """Read a book JSON file, resolving asset paths against its directory"""
+    with open(path, 'r') as f:
+        book = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    pages = book['pages'] if isinstance(book, dict) else book
+    for page in pages:
+        for field in ('background', 'character'):
+            if page.get(field):
+                page[field] = os.path.join(base, page[field])
+    return pages
+
+
+def demo_pages():
+    """A book from the mock assets: the generated backgrounds where present,
+    flat page colours otherwise, with pose01 and placeholder text"""
+    character = os.path.join(ASSETS_DIR, 'overlays/characters/pose01.png')
+    pages = []
+    for number, (filename, description, color) in enumerate(PAGES, 1):
+        background = os.path.join(ASSETS_DIR, f'backgrounds/{filename}.png')
+        pages.append({
+            'background': background if os.path.exists(background) else None,
+            'background_color': color,
+            'character': character if os.path.exists(character) else None,
+            'position': ('right', 'left')[number % 2],
+            'text': f"Page {number}: {description}.<br>Little Hero keeps exploring.",
+        })
+    return pages
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Composite book pages into one print PDF")
+    parser.add_argument('book', nargs='?', help="book JSON (see module docstring)")
+    parser.add_argument('-o', '--output', default='book.pdf')
+    parser.add_argument('--demo', action='store_true', help="render a book from the mock assets")
+    args = parser.parse_args()
+    if not args.book and not args.demo:
+        parser.error("pass a book JSON file or --demo")
+
+    started = time.perf_counter()
+    compositor = PageCompositor()
+    pages = demo_pages() if args.demo else load_book(args.book)
+    count = compositor.render_book(pages, args.output)
+    print(f"✅ Wrote {count} pages to {args.output} in {time.perf_counter() - started:.1f}s "
+          f"({compositor.stats['hits']} image cache hits)")
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Static file server for the page development / preview renderer.
+Serves requests concurrently over keep-alive connections, answers
+conditional requests with 304, supports single byte ranges and sends file
+bodies with sendfile() so they never pass through Python.
+
+Small, hot files (page CSS, fonts, text-box overlays) are kept in a bounded
+in-memory LRU together with precompressed gzip/brotli variants; hit and
+miss counters are served as JSON from /__stats.
+
+Members of per-order asset bundles (see asset_bundle.py) are served at
+/<path>/<ORDER>.lhb/<asset name>, sent with sendfile() straight from the
+bundle file.
+"""
+
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from functools import partial
+import argparse
+import gzip
+import http.server
+import json
+import os
+import threading
+import urllib.parse
+from asset_bundle import SUFFIX as BUNDLE_SUFFIX, bundle_index
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PORT = 8789
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_MAX_FILE_BYTES = 4 * 1024 * 1024
+STATS_PATH = '/__stats'
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript',
+                      'image/svg+xml', 'font/ttf', 'font/otf')
+
+
+def is_compressible(content_type):
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class AssetCache:
+    """Bounded LRU of file bodies and their precompressed variants
+
+    Entries are keyed by path and dropped as soon as the file's mtime or
+    size changes. Variants are only kept when they save at least 10%.
+    """
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, max_file_bytes=CACHE_MAX_FILE_BYTES):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = min(max_file_bytes, max_bytes)
+        self.entries = OrderedDict()
+        self.size = 0
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _entry_size(entry):
+        return sum(len(body) for body in entry['bodies'].values())
+
+    def _drop(self, path):
+        entry = self.entries.pop(path)
+        self.size -= self._entry_size(entry)
+
+    def get(self, path, st, content_type):
+        """Return {'stat', 'bodies': {encoding: bytes}} for path, loading it on a miss
+
+        Returns None for files too large to cache.
+        """
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self.entries.get(path)
+            if entry is not None:
+                if entry['stat'] == stamp:
+                    self.entries.move_to_end(path)
+                    self.stats['hits'] += 1
+                    return entry
+                self._drop(path)
+                self.stats['invalidations'] += 1
+            self.stats['misses'] += 1
+        if st.st_size > self.max_file_bytes:
+            return None
+
+        with open(path, 'rb') as f:
+            body = f.read()
+        entry = {'stat': stamp, 'bodies': {'identity': body}}
+        if is_compressible(content_type) and body:
+            variants = {'gzip': gzip.compress(body, 9)}
+            if brotli is not None:
+                variants['br'] = brotli.compress(body)
+            for encoding, data in variants.items():
+                if len(data) < len(body) * 0.9:
+                    entry['bodies'][encoding] = data
+
+        with self._lock:
+            if path in self.entries:
+                self._drop(path)
+            self.entries[path] = entry
+            self.size += self._entry_size(entry)
+            while self.size > self.max_bytes and len(self.entries) > 1:
+                self._drop(next(iter(self.entries)))
+                self.stats['evictions'] += 1
+        return entry
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, entries=len(self.entries), bytes=self.size,
+                        max_bytes=self.max_bytes)
+
+
+class PageRequestHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Idle keep-alive connections are closed after this many seconds
+    timeout = 30
+    quiet = False
+    cache = None
+
+    def end_headers(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self.serve(send_body=True)
+
+    def do_HEAD(self):
+        self.serve(send_body=False)
+
+    def resolve(self):
+        """Return the file to serve for this request, or None to fall back to the stdlib"""
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not self.path.split('?', 1)[0].endswith('/'):
+                return None
+            for index in ('index.html', 'index.htm'):
+                index_path = os.path.join(path, index)
+                if os.path.isfile(index_path):
+                    return index_path
+            return None
+        return path
+
+    def bundle_member(self):
+        """(bundle path, member name) if the request addresses a bundle member, else None"""
+        url_path = self.path.split('?', 1)[0]
+        marker = url_path.find(BUNDLE_SUFFIX + '/')
+        if marker < 0:
+            return None
+        split = marker + len(BUNDLE_SUFFIX)
+        bundle_path = self.translate_path(url_path[:split])
+        if not os.path.isfile(bundle_path):
+            return None
+        return bundle_path, urllib.parse.unquote(url_path[split + 1:])
+
+    def serve_member(self, send_body, bundle_path, name):
+        try:
+            f = open(bundle_path, 'rb')
+        except OSError:
+            self.send_error(404, "File not found")
+            return
+        with f:
+            try:
+                header, data_start = bundle_index(bundle_path)
+            except ValueError:
+                self.send_error(404, "Not an asset bundle")
+                return
+            entry = header['assets'].get(name)
+            if entry is None:
+                self.send_error(404, "Not in bundle")
+                return
+            self.serve_file(bundle_path, os.fstat(f.fileno()), send_body, entry['type'], f=f,
+                            member=(data_start + entry['offset'], entry['length'], entry['sha256']))
+
+    def serve(self, send_body):
+        if self.cache is not None and self.path.split('?', 1)[0] == STATS_PATH:
+            return self.send_stats(send_body)
+        member = self.bundle_member()
+        if member is not None:
+            return self.serve_member(send_body, *member)
+        path = self.resolve()
+        if path is None:
+            # Directory redirects and listings
+            return super().do_GET() if send_body else super().do_HEAD()
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.send_error(404, "File not found")
+            return
+
+        content_type = self.guess_type(path)
+        entry = self.cache.get(path, st, content_type) if self.cache is not None else None
+        if entry is not None:
+            return self.serve_file(path, st, send_body, content_type, bodies=entry['bodies'])
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            self.send_error(404, "File not found")
+            return
+        with f:
+            self.serve_file(path, os.fstat(f.fileno()), send_body, content_type, f=f)
+
+    def send_stats(self, send_body):
+        body = json.dumps(self.cache.snapshot()).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def choose_encoding(self, bodies):
+        """Pick the smallest variant the client accepts (ignoring q-value ranking)"""
+        accepted = set()
+        for token in self.headers.get('Accept-Encoding', '').split(','):
+            name, _, params = token.strip().partition(';')
+            if name and params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+                accepted.add(name.lower())
+        candidates = [enc for enc in bodies if enc != 'identity' and (enc in accepted or '*' in accepted)]
+        return min(candidates, key=lambda enc: len(bodies[enc]), default='identity')
+
+    def validators(self, st):
+        """Return (etag, last_modified) for a file"""
+        return f'"{st.st_mtime_ns:x}-{st.st_size:x}"', formatdate(st.st_mtime, usegmt=True)
+
+    def not_modified(self, etag, st):
+        """True if the client's cached copy is still current"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return if_none_match.strip() == '*' or etag in [t.strip() for t in if_none_match.split(',')]
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return int(st.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def byte_range(self, size, etag, last_modified):
+        """Parse a single-range Range header
+
+        Returns None to send the whole file, (start, end) inclusive for a
+        satisfiable range, or False when a valid range starts past the end.
+        Multi-range requests get the whole file, which RFC 9110 allows, and
+        so do invalid ranges such as "bytes=5-2" (RFC 9110 §14.1.1 says to
+        ignore the header).
+        """
+        header = self.headers.get('Range')
+        if not header or not header.startswith('bytes=') or ',' in header:
+            return None
+        if_range = self.headers.get('If-Range')
+        if if_range and if_range.strip() not in (etag, last_modified):
+            return None
+
+        start, dash, end = header[len('bytes='):].strip().partition('-')
+        if not dash or not (start or end) or not (start + end).isdigit():
+            return None
+        if not start:
+            suffix = int(end)
+            if suffix == 0 or size == 0:
+                return False
+            return max(0, size - suffix), size - 1
+        start = int(start)
+        if end and int(end) < start:
+            return None
+        if start >= size:
+            return False
+        return start, min(int(end), size - 1) if end else size - 1
+
+    def serve_file(self, path, st, send_body, content_type, f=None, bodies=None, member=None):
+        """Send a file from an open handle (via sendfile) or from cached bodies
+
+        member=(offset, length, sha256) sends just that slice of f.
+        """
+        etag, last_modified = self.validators(st)
+        if member is not None:
+            etag = f'"{member[2][:32]}"'
+        encoding = 'identity'
+        vary = is_compressible(content_type)
+        if bodies is not None and not self.headers.get('Range'):
+            encoding = self.choose_encoding(bodies)
+            if encoding != 'identity':
+                etag = f'{etag[:-1]}-{encoding}"'
+
+        if self.not_modified(etag, st):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', last_modified)
+            if vary:
+                self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return
+
+        body = bodies[encoding] if bodies is not None else None
+        size = len(body) if body is not None else member[1] if member else st.st_size
+        span = self.byte_range(size, etag, last_modified)
+        if span is False:
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{size}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        start, end = span or (0, size - 1)
+        length = end - start + 1 if size else 0
+        self.send_response(206 if span else 200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(length))
+        self.send_header('Last-Modified', last_modified)
+        self.send_header('ETag', etag)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Cache-Control', 'no-cache')
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+        if vary:
+            self.send_header('Vary', 'Accept-Encoding')
+        if span:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        self.end_headers()
+
+        if not send_body or not length:
+            return
+        if body is not None:
+            self.wfile.write(memoryview(body)[start:end + 1])
+        else:
+            self.wfile.flush()
+            self.connection.sendfile(f, (member[0] if member else 0) + start, length)
+
+
+class PageServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+
+def make_server(directory=SCRIPT_DIR, port=DEFAULT_PORT, bind='', quiet=False,
+                cache_bytes=CACHE_MAX_BYTES, handler_class=PageRequestHandler):
+    """Create (but do not start) a server for directory
+
+    cache_bytes=0 disables the in-memory asset cache and the stats endpoint.
+    """
+    cache = AssetCache(cache_bytes) if cache_bytes else None
+    handler = type(handler_class.__name__, (handler_class,), {'quiet': quiet, 'cache': cache})
+    return PageServer((bind, port), partial(handler, directory=directory))
+
+
+def serve(directory=SCRIPT_DIR, port=DEFAULT_PORT, bind='', quiet=False,
+          cache_bytes=CACHE_MAX_BYTES, banner=()):
+    """Serve directory until interrupted"""
+    with make_server(directory, port, bind, quiet, cache_bytes) as httpd:
+        for line in banner:
+            print(line)
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def parse_args(default_port=DEFAULT_PORT):
+    parser = argparse.ArgumentParser(description="Serve renderer-mock pages and assets")
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', default_port)))
+    parser.add_argument('--bind', default='', help="address to bind (default: all interfaces)")
+    parser.add_argument('--directory', default=SCRIPT_DIR, help="directory to serve")
+    parser.add_argument('--quiet', action='store_true', help="do not log every request")
+    parser.add_argument('--cache-mb', type=int, default=CACHE_MAX_BYTES // (1024 * 1024),
+                        help="in-memory asset cache size, 0 to disable")
+    args = parser.parse_args()
+    args.cache_bytes = args.cache_mb * 1024 * 1024
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    serve(args.directory, args.port, args.bind, args.quiet, args.cache_bytes,
+          banner=[f"📂 Serving {args.directory} on http://localhost:{args.port}"])
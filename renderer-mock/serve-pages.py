@@ -1,22 +1,12 @@
 #!/usr/bin/env python3
-import http.server
-import socketserver
-import os
+from page_server import parse_args, serve
 
 PORT = 8789
 
-class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
-    def end_headers(self):
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        super().end_headers()
-
 if __name__ == "__main__":
-    os.chdir('/Users/jeff/Projects/little-hero-books/renderer-mock')
-    
-    with socketserver.TCPServer(("", PORT), MyHTTPRequestHandler) as httpd:
-        print(f"🎨 Page Development Server running on http://localhost:{PORT}")
-        print(f"📄 Page Index: http://localhost:{PORT}/pages/")
-        print(f"📄 Page 02 Test: http://localhost:{PORT}/pages/page02-test.html")
-        httpd.serve_forever()
+    args = parse_args(PORT)
+    serve(args.directory, args.port, args.bind, args.quiet, args.cache_bytes, banner=[
+        f"🎨 Page Development Server running on http://localhost:{args.port}",
+        f"📄 Page Index: http://localhost:{args.port}/pages/",
+        f"📄 Page 02 Test: http://localhost:{args.port}/pages/page02-test.html",
+    ])
@@ -1,21 +1,11 @@
 #!/usr/bin/env python3
-import http.server
-import socketserver
-import os
+from page_server import parse_args, serve
 
 PORT = 8788
 
-class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
-    def end_headers(self):
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        super().end_headers()
-
 if __name__ == "__main__":
-    os.chdir('/Users/jeff/Projects/little-hero-books/renderer-mock')
-    
-    with socketserver.TCPServer(("", PORT), MyHTTPRequestHandler) as httpd:
-        print(f"🚀 Simple test server running on http://localhost:{PORT}")
-        print(f"📄 Test page: http://localhost:{PORT}/test-html.html")
-        httpd.serve_forever()
+    args = parse_args(PORT)
+    serve(args.directory, args.port, args.bind, args.quiet, args.cache_bytes, banner=[
+        f"🚀 Simple test server running on http://localhost:{args.port}",
+        f"📄 Test page: http://localhost:{args.port}/test-html.html",
+    ])
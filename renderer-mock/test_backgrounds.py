@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+"""
+Label pasting against the original draw.text rendering, run with:
+python -m pytest renderer-mock
+"""
+
+import os
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+from backgrounds import page_label, render_background, render_label
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+FONT_PATH = os.path.join(SCRIPT_DIR, 'assets/fonts/custom-font.ttf')
+
+
+def original_background(filename, description, color, width, height, font):
+    """The per-offset rendering create-test-images.py used to do"""
+    img = Image.new('RGB', (width, height), color)
+    draw = ImageDraw.Draw(img)
+    text = page_label(filename, description)
+    bbox = draw.textbbox((0, 0), text, font=font)
+    x = (width - (bbox[2] - bbox[0])) // 2
+    y = (height - (bbox[3] - bbox[1])) // 2
+    draw.text((x - 2, y - 2), text, fill=(0, 0, 0), font=font)
+    draw.text((x + 2, y + 2), text, fill=(0, 0, 0), font=font)
+    draw.text((x, y), text, fill=(255, 255, 255), font=font)
+    return img
+
+
+@pytest.mark.parametrize('filename, description, color', [
+    ("page01_bedroom", "Bedroom Scene", (135, 206, 235)),
+    ("jungle", "Jig-saw, Quay", (25, 25, 112)),
+])
+def test_matches_original_rendering(filename, description, color):
+    font = ImageFont.truetype(FONT_PATH, 120)
+    # The case this guards: ink left of the text origin
+    assert render_label(page_label(filename, description), font)[2][0] < 0
+    new = render_background(filename, description, color, 1800, 1200, font)
+    old = original_background(filename, description, color, 1800, 1200, font)
+    assert np.array_equal(np.asarray(new), np.asarray(old))
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Rounded text-box overlays built on demand for any size.
+TextBoxFactory renders a box once per (width, height, radius, color,
+opacity, scale), keeps it in a bounded LRU and optionally persists the PNG
+to a disk cache. Run with --serve to expose it over HTTP:
+
+    GET /text-box.png?width=607&height=90&radius=50&color=ede9c1&opacity=128&scale=1
+"""
+
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+from PIL import Image, ImageDraw
+import argparse
+import hashlib
+import http.server
+import io
+import os
+import threading
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DISK_CACHE_DIR = os.path.normpath(os.path.join(SCRIPT_DIR, '../.cache/text-boxes'))
+DEFAULT_PORT = 8790
+MAX_ENTRIES = 256
+MAX_SIDE = 10000
+
+DEFAULTS = {'radius': 50, 'color': 'ede9c1', 'opacity': 128, 'scale': 1}
+PRESETS = {
+    'standard': {'width': 607, 'height': 90},  # matches the width/height from logs
+    'small': {'width': 400, 'height': 70},     # dedication pages
+    'large': {'width': 700, 'height': 120},    # longer text
+}
+
+
+def parse_color(color):
+    """Return (r, g, b) for 'rrggbb' / '#rrggbb' or an (r, g, b) tuple"""
+    if isinstance(color, str):
+        if color.startswith('#'):
+            color = color[1:]
+        return int(color[0:2], 16), int(color[2:4], 16), int(color[4:6], 16)
+    return tuple(color[:3])
+
+
+def create_rounded_rectangle(width, height, corner_radius, color, opacity=255):
+    """Create a rounded rectangle image with the specified dimensions and styling."""
+
+    # Create image with transparency
+    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+
+    r, g, b = parse_color(color)
+
+    # Create rounded rectangle
+    # We'll draw it as a filled shape
+    draw.rounded_rectangle(
+        [(0, 0), (width-1, height-1)],
+        radius=corner_radius,
+        fill=(r, g, b, opacity)
+    )
+
+    return img
+
+
+def box_key(width, height, radius=DEFAULTS['radius'], color=DEFAULTS['color'],
+            opacity=DEFAULTS['opacity'], scale=DEFAULTS['scale']):
+    """Normalise box parameters into a hashable key, validating them"""
+    key = (int(width), int(height), int(radius), '%02x%02x%02x' % parse_color(color),
+           int(opacity), float(scale))
+    width, height, radius, _, opacity, scale = key
+    if radius < 0 or not 0 <= opacity <= 255 or not 0 < scale <= MAX_SIDE:
+        raise ValueError("radius, opacity or scale out of range")
+    # The box is rendered at the rounded scaled size, which must be at least 1 pixel
+    if not (1 <= round(width * scale) <= MAX_SIDE and 1 <= round(height * scale) <= MAX_SIDE):
+        raise ValueError(f"box size out of range: {width}x{height} @ {scale}x")
+    return key
+
+
+class TextBoxFactory:
+    """Bounded LRU of rendered boxes, optionally backed by a disk cache
+
+    Returned images are shared between callers and must be treated as
+    read-only; copy() one before drawing on it.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.entries = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'disk_hits': 0}
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        name = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.png")
+
+    def _render(self, key):
+        width, height, radius, color, opacity, scale = key
+        img = create_rounded_rectangle(round(width * scale), round(height * scale),
+                                       round(radius * scale), color, opacity)
+        return {'image': img, 'png': None}
+
+    def _entry(self, key):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry
+            self.stats['misses'] += 1
+
+        entry = None
+        if self.cache_dir:
+            path = self._disk_path(key)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    png = f.read()
+                image = Image.open(io.BytesIO(png))
+                image.load()
+                entry = {'image': image, 'png': png}
+                with self._lock:
+                    self.stats['disk_hits'] += 1
+        if entry is None:
+            entry = self._render(key)
+            if self.cache_dir:
+                self._encode(entry)
+                tmp_path = self._disk_path(key) + f'.{os.getpid()}.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(entry['png'])
+                os.replace(tmp_path, self._disk_path(key))
+
+        with self._lock:
+            self.entries[key] = entry
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def _encode(entry):
+        if entry['png'] is None:
+            buffer = io.BytesIO()
+            entry['image'].save(buffer, 'PNG')
+            entry['png'] = buffer.getvalue()
+        return entry['png']
+
+    def get(self, width, height, **params):
+        """Return the box image for these parameters (see box_key)"""
+        return self._entry(box_key(width, height, **params))['image']
+
+    def get_png(self, width, height, **params):
+        """Return the box as encoded PNG bytes"""
+        return self._encode(self._entry(box_key(width, height, **params)))
+
+    def save(self, path, width, height, **params):
+        """Write the box PNG to path"""
+        with open(path, 'wb') as f:
+            f.write(self.get_png(width, height, **params))
+
+
+class TextBoxHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    factory = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path != '/text-box.png':
+            self.send_error(404, "Not found")
+            return
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            params = {name: query[name] for name in ('radius', 'color', 'opacity', 'scale')
+                      if name in query}
+            png = self.factory.get_png(query['width'], query['height'], **params)
+        except (KeyError, ValueError) as e:
+            self.send_error(400, f"Bad text-box parameters: {e}")
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(png)))
+        self.send_header('Cache-Control', 'public, max-age=31536000, immutable')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(png)
+
+
+def serve(port=DEFAULT_PORT, bind='', factory=None):
+    """Serve text boxes over HTTP until interrupted"""
+    handler = type('TextBoxHandler', (TextBoxHandler,), {'factory': factory or TextBoxFactory()})
+    with http.server.ThreadingHTTPServer((bind, port), handler) as httpd:
+        httpd.daemon_threads = True
+        print(f"📦 Text-box service running on http://localhost:{port}/text-box.png")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build rounded text-box overlays on demand")
+    parser.add_argument('--serve', action='store_true', help="run the HTTP service")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--bind', default='')
+    parser.add_argument('--max-entries', type=int, default=MAX_ENTRIES)
+    parser.add_argument('--disk-cache', nargs='?', const=DISK_CACHE_DIR, default=None,
+                        help=f"persist rendered boxes (default dir: {DISK_CACHE_DIR})")
+    args = parser.parse_args()
+    if not args.serve:
+        parser.error("nothing to do; pass --serve (or use create-text-box.py for the presets)")
+    serve(args.port, args.bind, TextBoxFactory(args.max_entries, args.disk_cache))
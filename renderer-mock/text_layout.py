@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Text-fit layout for story text boxes.
+Measures text against the project font using per-size glyph advances and
+kerning pairs that are cached on disk (.cache/glyph-metrics.json, keyed on
+the font's content hash), so after the first book a layout is dictionary
+lookups only. For each page it picks line breaks (greedy, honouring <br>),
+the largest font size that fits the line limit, and the exact text-box size.
+layout_book() lays out a whole book in one call and saves the cache once.
+
+    python text_layout.py --name Ava --hometown Seattle
+"""
+
+from PIL import ImageFont
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+FONT_PATH = os.path.join(SCRIPT_DIR, 'assets/fonts/custom-font.ttf')
+CACHE_PATH = os.path.normpath(os.path.join(SCRIPT_DIR, '../.cache/glyph-metrics.json'))
+DPI = 300
+# CSS pixels (1/96 in) to print pixels
+PX = DPI / 96
+
+# LOCKED-IN text specifications from assets/css/page-styles.css, in CSS px;
+# min_font_size is how far the fit may shrink text before giving up
+STYLE = {'font_size': 20, 'min_font_size': 14, 'letter_spacing': 1.5, 'line_height': 1.4,
+         'box_width': 0.65, 'padding': (40, 60), 'max_lines': 2}
+
+BREAK = re.compile(r'<br\s*/?>|\n', re.IGNORECASE)
+
+# Story text from Node 4 of the book-assembly workflow (scripts/fix-workflow-json.py)
+STORY = [
+    "It was a nice night in {h}. {n} went outside.",
+    "{n} looked at the stars.<br>You like to explore, the voice said.",
+    "There was a doorway! {n} walked through.",
+    "Stars were all around! {n} felt brave.",
+    "{n} noticed footprints and followed them.",
+    "The path went through giant trees. {n} felt small, but not scared.",
+    "Look how far you came, the voice said.",
+    "Lunch was waiting! {n} ate happily.<br>You earned this, the voice said.",
+    "The path became warm sand. Look down there, the voice said.<br>{n} found a beautiful shell!",
+    "{n} found a cave with sparkly crystals! They glowed with rainbow colors. "
+    "You can find beauty everywhere, the voice said.",
+    "The path went through giant flowers. The petals were SO big!<br>You make others happy, the voice said.",
+    "The voice felt very close now. You are perfect just as you are, it said.<br>"
+    "{n} looked around. Where was the voice?",
+    "Tiger appeared! It was the voice!<br>I have been with you this whole time, said Tiger.",
+    "Ready to fly home? asked Tiger. They flew through the stars to {h}.<br>I am always in your heart, said Tiger.",
+]
+
+
+def story_texts(child_name, hometown='Seattle'):
+    """The 14 personalised story strings"""
+    return [line.format(n=child_name, h=hometown) for line in STORY]
+
+
+def split_paragraphs(text):
+    """Split story text on <br> tags and newlines"""
+    return [part.strip() for part in BREAK.split(text)]
+
+
+def font_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+class GlyphMetrics:
+    """Advances and kerning pairs for one font at one pixel size
+
+    advance and kern are filled lazily from the font and persisted by
+    TextLayout; a string's width is the sum of its advances plus the kerning
+    of each adjacent pair, which matches ImageFont.getlength exactly.
+    """
+
+    def __init__(self, font, record):
+        self.font = font
+        self.advance = record.setdefault('advance', {})
+        self.kern = record.setdefault('kern', {})
+        self.dirty = False
+
+    def _fill(self, text):
+        for char in set(text):
+            if char not in self.advance:
+                self.advance[char] = self.font.getlength(char)
+                self.dirty = True
+        for pair in {text[i:i + 2] for i in range(len(text) - 1)}:
+            if pair not in self.kern:
+                kern = self.font.getlength(pair) - self.advance[pair[0]] - self.advance[pair[1]]
+                # Store zero pairs too so they are not measured again
+                self.kern[pair] = kern
+                self.dirty = True
+
+    def positions(self, text, spacing=0):
+        """x offset of every character and the total width, with letter spacing"""
+        self._fill(text)
+        offsets = []
+        x = 0.0
+        for i, char in enumerate(text):
+            if i:
+                x += self.kern[text[i - 1:i + 1]]
+            offsets.append(x)
+            x += self.advance[char] + spacing
+        return offsets, x
+
+    def width(self, text, spacing=0):
+        return self.positions(text, spacing)[1]
+
+
+class TextLayout:
+    """Fit story text into the locked text box, with a persistent metrics cache
+
+    All sizes are print pixels unless noted.
+    """
+
+    def __init__(self, font_path=FONT_PATH, cache_path=CACHE_PATH, page_width=3375, style=None):
+        self.font_path = font_path
+        self.cache_path = cache_path
+        self.page_width = page_width
+        self.style = dict(STYLE, **(style or {}))
+        self.digest = font_digest(font_path)
+        self.sizes = {}
+        self.fonts = {}
+        self._lock = threading.Lock()
+        self.cache = {}
+        if cache_path:
+            try:
+                with open(cache_path, 'r') as f:
+                    self.cache = json.load(f)
+            except (OSError, ValueError):
+                pass
+
+    def font(self, size):
+        """The ImageFont for a pixel size, loaded once"""
+        if size not in self.fonts:
+            self.fonts[size] = ImageFont.truetype(self.font_path, size)
+        return self.fonts[size]
+
+    def metrics(self, size):
+        """GlyphMetrics for a pixel size, backed by the persistent cache"""
+        with self._lock:
+            if size not in self.sizes:
+                record = self.cache.setdefault(self.digest, {}).setdefault(str(size), {})
+                self.sizes[size] = GlyphMetrics(self.font(size), record)
+            return self.sizes[size]
+
+    def spacing(self, size):
+        """Letter spacing in pixels, scaled with the font size like CSS px would be"""
+        return self.style['letter_spacing'] * PX * size / round(self.style['font_size'] * PX)
+
+    def wrap(self, text, size, max_width):
+        """Greedy line breaks for text at size; explicit <br> always breaks"""
+        metrics = self.metrics(size)
+        spacing = self.spacing(size)
+        lines = []
+        for paragraph in split_paragraphs(text):
+            line = ''
+            for word in paragraph.split():
+                candidate = f"{line} {word}" if line else word
+                if line and metrics.width(candidate, spacing) > max_width:
+                    lines.append(line)
+                    line = word
+                else:
+                    line = candidate
+            lines.append(line)
+        return lines
+
+    def fit(self, text):
+        """Lay out one page of text
+
+        Tries the locked font size first and shrinks one CSS px at a time
+        until the text fits in max_lines (or min_font_size is reached).
+        Returns {'lines', 'font_size', 'line_height', 'spacing', 'text_width',
+        'box_width', 'box_height', 'fits'}.
+        """
+        style = self.style
+        pad_y, pad_x = (round(p * PX) for p in style['padding'])
+        box_width = round(self.page_width * style['box_width'])
+        max_width = box_width - 2 * pad_x
+
+        for css_size in range(style['font_size'], style['min_font_size'] - 1, -1):
+            size = round(css_size * PX)
+            lines = self.wrap(text, size, max_width)
+            spacing = self.spacing(size)
+            widths = [self.metrics(size).width(line, spacing) for line in lines]
+            fits = len(lines) <= style['max_lines'] and max(widths) <= max_width
+            if fits:
+                break
+        line_height = round(size * style['line_height'])
+        return {
+            'lines': lines,
+            'font_size': size,
+            'line_height': line_height,
+            'spacing': spacing,
+            'text_width': max(widths),
+            'box_width': box_width,
+            'box_height': line_height * len(lines) + 2 * pad_y,
+            'fits': fits,
+        }
+
+    def layout_book(self, texts):
+        """Lay out every page of a book and persist any newly measured glyphs"""
+        layouts = [self.fit(text) for text in texts]
+        self.save()
+        return layouts
+
+    def save(self):
+        """Write the metrics cache atomically if anything new was measured"""
+        with self._lock:
+            if not self.cache_path or not any(m.dirty for m in self.sizes.values()):
+                return
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + f'.{os.getpid()}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.cache, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.cache_path)
+            for metrics in self.sizes.values():
+                metrics.dirty = False
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Lay out the story text for one book")
+    parser.add_argument('--name', default='Ava')
+    parser.add_argument('--hometown', default='Seattle')
+    args = parser.parse_args()
+
+    for number, layout in enumerate(TextLayout().layout_book(story_texts(args.name, args.hometown)), 1):
+        mark = '✓' if layout['fits'] else '⚠'
+        print(f"{mark} Page {number:2d}: {layout['font_size']}px, {len(layout['lines'])} lines, "
+              f"box {layout['box_width']}x{layout['box_height']}")
+        for line in layout['lines']:
+            print(f"      {line}")
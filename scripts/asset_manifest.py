@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+
+"""
+Asset manifest: one index of everything under assets/
+A single os.scandir pass over the tree records each file's size, mtime,
+sha256 and, for images, dimensions and mode in .cache/asset-manifest.json.
+Only files whose size or mtime changed are re-hashed, so a refresh of an
+unchanged tree costs one stat per entry, and lookups are dictionary hits.
+
+    python scripts/asset_manifest.py status            # refresh and report changes
+    python scripts/asset_manifest.py check assets/masks/pose01_head_mask.png ...
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.normpath(os.path.join(SCRIPT_DIR, '..'))
+ASSETS_DIR = os.path.join(REPO_DIR, 'assets')
+INDEX_PATH = os.path.normpath(os.path.join(SCRIPT_DIR, '../.cache/asset-manifest.json'))
+INDEX_VERSION = 1
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.gif', '.tif', '.tiff')
+# Model weights are checked by model_verify instead of being hashed here
+HASH_LIMIT = 256 * 1024 * 1024
+HASH_CHUNK = 1 << 20
+# Record layout: [size, mtime_ns, sha256, width, height, mode]
+FIELDS = ('size', 'mtime_ns', 'sha256', 'width', 'height', 'mode')
+
+
+def describe_file(path, size):
+    """Return [sha256, width, height, mode] for one file (None where not applicable)"""
+    digest = None
+    if size <= HASH_LIMIT:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+                digest.update(chunk)
+        digest = digest.hexdigest()
+    width = height = mode = None
+    if path.lower().endswith(IMAGE_EXTENSIONS):
+        try:
+            # Image.open only parses the header here
+            with Image.open(path) as img:
+                (width, height), mode = img.size, img.mode
+        except (OSError, ValueError):
+            pass
+    return [digest, width, height, mode]
+
+
+def scan_tree(root):
+    """One scandir pass: yields (relative path, is_dir, size, mtime_ns)"""
+    stack = ['']
+    while stack:
+        rel_dir = stack.pop()
+        with os.scandir(os.path.join(root, rel_dir)) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(rel)
+                    yield rel, True, 0, 0
+                elif entry.is_file():
+                    st = entry.stat()
+                    yield rel, False, st.st_size, st.st_mtime_ns
+
+
+class AssetManifest:
+    """Persistent index of the asset tree
+
+    Index keys are '/'-separated and relative to root. Lookups take absolute
+    paths or paths relative to base (the repo root, whatever the working
+    directory), e.g. 'assets/masks/pose01_head_mask.png'.
+    """
+
+    def __init__(self, root=ASSETS_DIR, index_path=INDEX_PATH, base=REPO_DIR):
+        self.root = os.path.abspath(root)
+        self.base = os.path.abspath(base)
+        self.index_path = index_path
+        self.files = {}
+        self.dirs = set()
+        self.dirty = False
+        try:
+            with open(index_path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION and data.get('root') == self.root:
+                self.files = data['files']
+                self.dirs = set(data['dirs'])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def resolve(self, path):
+        """Absolute path for a lookup path (relative paths are taken from base)"""
+        return os.path.normpath(os.path.join(self.base, path))
+
+    def key(self, path):
+        """Index key for a path, or None if it is outside the asset tree"""
+        rel = os.path.relpath(self.resolve(path), self.root)
+        if rel == os.curdir:
+            return ''
+        if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+            return None
+        return rel.replace(os.sep, '/')
+
+    def refresh(self, workers=None):
+        """Rescan the tree, re-describing new or changed files
+
+        Returns {'added': [...], 'changed': [...], 'removed': [...]}.
+        """
+        seen = {}
+        dirs = set()
+        for rel, is_dir, size, mtime_ns in scan_tree(self.root):
+            if is_dir:
+                dirs.add(rel)
+            else:
+                seen[rel] = (size, mtime_ns)
+
+        added = [rel for rel in seen if rel not in self.files]
+        changed = [rel for rel, stamp in seen.items()
+                   if rel in self.files and tuple(self.files[rel][:2]) != stamp]
+        removed = [rel for rel in self.files if rel not in seen]
+
+        stale = added + changed
+        if stale:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                described = pool.map(lambda rel: describe_file(os.path.join(self.root, rel), seen[rel][0]),
+                                     stale)
+                for rel, details in zip(stale, described):
+                    self.files[rel] = list(seen[rel]) + details
+        for rel in removed:
+            del self.files[rel]
+        if stale or removed or dirs != self.dirs:
+            self.dirs = dirs
+            self.dirty = True
+        return {'added': sorted(added), 'changed': sorted(changed), 'removed': sorted(removed)}
+
+    def get(self, path):
+        """Record for a file as a dict (see FIELDS), or None if it is not indexed"""
+        record = self.files.get(self.key(path))
+        return dict(zip(FIELDS, record)) if record else None
+
+    def exists(self, path):
+        key = self.key(path)
+        return key in self.files or key in self.dirs or key == ''
+
+    def is_dir(self, path):
+        key = self.key(path)
+        return key in self.dirs or key == ''
+
+    def missing(self, paths):
+        """The paths (files or directories) that are not in the index"""
+        return [path for path in paths if not self.exists(path)]
+
+    def find(self, pattern):
+        """Indexed files matching a glob relative to root, sorted"""
+        return sorted(rel for rel in self.files if fnmatch.fnmatchcase(rel, pattern))
+
+    def path(self, rel):
+        return os.path.join(self.root, *rel.split('/'))
+
+    def save(self):
+        """Write the index atomically if anything changed"""
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': INDEX_VERSION, 'root': self.root, 'files': self.files,
+                       'dirs': sorted(self.dirs)}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
+        self.dirty = False
+
+
+_shared = None
+
+
+def load_manifest(refresh=True):
+    """The process-wide manifest, refreshed and saved once on first use"""
+    global _shared
+    if _shared is None:
+        _shared = AssetManifest()
+        if refresh:
+            _shared.refresh()
+            _shared.save()
+    return _shared
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index and query the assets/ tree")
+    parser.add_argument('--root', default=ASSETS_DIR)
+    parser.add_argument('--rebuild', action='store_true', help="ignore the saved index")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('status', help="refresh the index and list what changed")
+    check = commands.add_parser('check', help="report which of these assets are missing")
+    check.add_argument('paths', nargs='+')
+    find = commands.add_parser('find', help="list indexed files matching a glob")
+    find.add_argument('pattern')
+    args = parser.parse_args()
+
+    manifest = AssetManifest(args.root)
+    if args.rebuild:
+        manifest.files, manifest.dirs = {}, set()
+    changes = manifest.refresh()
+    manifest.save()
+
+    if args.command == 'status':
+        for label, mark in (('added', '+'), ('changed', '~'), ('removed', '-')):
+            for rel in changes[label]:
+                print(f"{mark} {rel}")
+        counts = ', '.join(f"{len(changes[label])} {label}" for label in changes)
+        print(f"✓ {len(manifest.files)} files in {manifest.root} ({counts})")
+    elif args.command == 'check':
+        missing = manifest.missing(args.paths)
+        for path in args.paths:
+            record = manifest.get(path)
+            if path in missing:
+                print(f"✗ {path}: MISSING")
+            elif record is None:
+                print(f"✓ {path}/")
+            else:
+                dims = f", {record['width']}x{record['height']} {record['mode']}" if record['width'] else ''
+                print(f"✓ {path}: {record['size']:,} bytes{dims}")
+        sys.exit(1 if missing else 0)
+    else:
+        for rel in manifest.find(args.pattern):
+            print(rel)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+
+"""
+Streaming pose refresh: decode → transform → encode → upload, no temp files
+Each stage runs in its own worker threads and hands work to the next
+through a bounded queue, so decoding and PNG encoding overlap the uploads
+(Pillow and numpy release the GIL for the heavy lifting) while at most a
+few images per stage are in memory. Encoded PNGs go straight from a BytesIO
+to R2Uploader.upload_bytes(), which skips unchanged content; writing the
+outputs to assets/poses/<stage>/ as well is optional.
+
+    python scripts/asset_stream.py --upload edges
+    python scripts/asset_stream.py --upload annotated --write grayscale,edges,annotated
+"""
+
+from PIL import Image
+import argparse
+import io
+import os
+import queue
+import threading
+from instrumentation import span
+from pose_pipeline import (EDGE_OPTIONS, INPUT_DIR, OUTPUT_DIRS, STAGES, annotate_pose, find_poses,
+                           to_edge_map, to_grayscale)
+
+# Every pose variant replaces the same reference object
+KEY_TEMPLATE = 'book-mvp-simple-adventure/characters/poses/{name}'
+QUEUE_SIZE = 4
+DONE = object()
+
+
+def _run_stage(fn, inbox, outbox, workers):
+    """Start workers that pass each job through fn (which yields jobs) to outbox
+
+    Jobs that already carry an error are forwarded untouched; an exception
+    is recorded on the job instead of stopping the stage. The last worker to
+    see DONE forwards it.
+    """
+    remaining = [workers]
+    lock = threading.Lock()
+
+    def work():
+        while True:
+            job = inbox.get()
+            if job is DONE:
+                # Put it back for sibling workers
+                inbox.put(DONE)
+                break
+            if job['error']:
+                outbox.put(job)
+                continue
+            try:
+                for result in fn(job):
+                    outbox.put(result)
+            except Exception as e:
+                job['error'] = str(e)
+                job.pop('image', None)
+                job.pop('data', None)
+                outbox.put(job)
+        with lock:
+            remaining[0] -= 1
+            last = not remaining[0]
+        if last:
+            outbox.put(DONE)
+
+    threads = [threading.Thread(target=work, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+class PoseStream:
+    """Stream poses through the pose stages into R2 and/or local files
+
+    upload: stages whose output is uploaded (object key from key_template,
+    which needs '{stage}' if more than one stage is uploaded).
+    write: stages whose output is also written to output_dirs.
+    """
+
+    def __init__(self, uploader=None, upload=('edges',), write=(), output_dirs=OUTPUT_DIRS,
+                 key_template=KEY_TEMPLATE, edge_options=None, queue_size=QUEUE_SIZE,
+                 cpu_workers=None, force=False):
+        unknown = (set(upload) | set(write)) - set(STAGES)
+        if unknown:
+            raise ValueError(f"unknown stage(s): {', '.join(sorted(unknown))}")
+        if upload and uploader is None:
+            raise ValueError("uploading needs an uploader")
+        if len(upload) > 1 and '{stage}' not in key_template:
+            raise ValueError("key_template needs '{stage}' when uploading several stages")
+        self.uploader = uploader
+        self.upload_stages = tuple(upload)
+        self.write_stages = tuple(write)
+        self.stages = tuple(stage for stage in STAGES if stage in upload or stage in write)
+        self.output_dirs = output_dirs
+        self.key_template = key_template
+        self.edge_options = dict(EDGE_OPTIONS, **(edge_options or {}))
+        self.queue_size = queue_size
+        self.cpu_workers = cpu_workers or min(4, os.cpu_count() or 1)
+        self.force = force
+
+    def decode(self, job):
+        with span('decode', tool='asset_stream') as s:
+            s.bytes_in = os.path.getsize(job['source'])
+            # load() closes the file once a single-frame image is read
+            image = Image.open(job['source'])
+            image.load()
+        job['image'] = image
+        yield job
+
+    def transform(self, job):
+        with span('transform', tool='asset_stream', stage='grayscale'):
+            gray = to_grayscale(job.pop('image'))
+        for stage in self.stages:
+            with span('transform', tool='asset_stream', stage=stage):
+                if stage == 'grayscale':
+                    image = gray
+                elif stage == 'edges':
+                    image = to_edge_map(gray, **self.edge_options)
+                else:
+                    image = annotate_pose(gray)
+            yield dict(job, stage=stage, image=image)
+
+    def encode(self, job):
+        stage = job['stage']
+        with span('encode', tool='asset_stream', stage=stage) as s:
+            buffer = io.BytesIO()
+            job.pop('image').save(buffer, 'PNG')
+            s.bytes_out = buffer.tell()
+        job['data'] = buffer
+        if stage in self.write_stages:
+            path = os.path.join(self.output_dirs[stage], job['pose'])
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(buffer.getbuffer())
+            os.replace(tmp_path, path)
+            job['path'] = path
+        yield job
+
+    def upload(self, job):
+        if job['stage'] in self.upload_stages:
+            job['key'] = self.key_template.format(name=job['pose'], stage=job['stage'])
+            job['status'] = self.uploader.upload_bytes(job['data'], job['key'], 'image/png',
+                                                       force=self.force)
+        elif job.get('path'):
+            job['status'] = 'written'
+        job.pop('data')
+        yield job
+
+    def run(self, input_paths):
+        """Stream every pose; yields one result per (pose, stage) as it finishes
+
+        A result is {'pose', 'source', 'stage', 'key', 'path', 'status',
+        'error'} with status 'uploaded', 'skipped', 'written' or None on error.
+        """
+        for stage in self.write_stages:
+            os.makedirs(self.output_dirs[stage], exist_ok=True)
+        upload_workers = self.uploader.max_workers if self.uploader else 1
+        stages = ((self.decode, 1), (self.transform, self.cpu_workers), (self.encode, self.cpu_workers),
+                  (self.upload, upload_workers))
+        queues = [queue.Queue(self.queue_size) for _ in range(len(stages) + 1)]
+        for (fn, workers), inbox, outbox in zip(stages, queues, queues[1:]):
+            _run_stage(fn, inbox, outbox, workers)
+
+        def feed():
+            for path in input_paths:
+                queues[0].put({'pose': os.path.basename(path), 'source': path, 'stage': None,
+                               'key': None, 'path': None, 'status': None, 'error': None})
+            queues[0].put(DONE)
+
+        threading.Thread(target=feed, daemon=True).start()
+        try:
+            while True:
+                job = queues[-1].get()
+                if job is DONE:
+                    return
+                yield job
+        finally:
+            if self.uploader is not None:
+                self.uploader.save()
+
+
+def report(results):
+    """Print a ✓/↷/✗ line per result and return the number that succeeded"""
+    done = 0
+    for result in results:
+        label = f"{result['pose']} [{result['stage'] or 'decode'}]"
+        if result['error']:
+            print(f"✗ Failed {label}: {result['error']}")
+            continue
+        done += 1
+        if result['status'] == 'uploaded':
+            print(f"✓ Uploaded {label} → {result['key']}")
+        elif result['status'] == 'skipped':
+            print(f"↷ Unchanged {label}: {result['key']}")
+        else:
+            print(f"✓ Wrote {label} → {os.path.relpath(result['path'])}")
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream pose variants straight to R2")
+    parser.add_argument('inputs', nargs='*', help="pose files (default: every pose in --input-dir)")
+    parser.add_argument('--input-dir', default=INPUT_DIR)
+    parser.add_argument('--upload', default='edges',
+                        help="comma-separated stages to upload (empty for none): " + ', '.join(STAGES))
+    parser.add_argument('--write', default='', help="comma-separated stages to also write to disk")
+    parser.add_argument('--key-template', default=KEY_TEMPLATE)
+    parser.add_argument('--bucket', default=None, help="R2 bucket (default: the uploader's)")
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE)
+    parser.add_argument('--workers', type=int, default=None, help="transform/encode threads")
+    parser.add_argument('--force', action='store_true', help="upload even if unchanged")
+    args = parser.parse_args()
+
+    upload = tuple(s for s in args.upload.split(',') if s)
+    write = tuple(s for s in args.write.split(',') if s)
+    if not upload and not write:
+        parser.error("nothing to do: pass --upload and/or --write stages")
+
+    inputs = args.inputs or find_poses(args.input_dir)
+    if not inputs:
+        print(f"⚠ No poses found in {args.input_dir}")
+        return
+
+    uploader = None
+    if upload:
+        from r2_uploader import R2Uploader
+        uploader = R2Uploader(args.bucket) if args.bucket else R2Uploader()
+    try:
+        stream = PoseStream(uploader, upload, write, key_template=args.key_template,
+                            queue_size=args.queue_size, cpu_workers=args.workers, force=args.force)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"Streaming {len(inputs)} poses (upload: {', '.join(upload) or 'none'}; "
+          f"write: {', '.join(write) or 'none'})...\n")
+    results = []
+
+    def collect():
+        for result in stream.run(inputs):
+            results.append(result)
+            yield result
+
+    done = report(collect())
+    print(f"\n✓ Done! {done}/{len(results)} outputs in place")
+    if done < len(results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
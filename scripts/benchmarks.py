@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks for the image and workflow tooling at print resolution
+Synthetic fixtures are generated at real sizes (a 3375x2625 spread, a 2048px
+pose sheet, a multi-MB ComfyUI workflow) and cached in .cache/bench-fixtures.
+Each benchmark runs in its own subprocess so its peak RSS is its own; wall
+time is the median of --repeat runs after one warm-up.
+
+    python scripts/benchmarks.py --save before.json
+    python scripts/benchmarks.py --compare before.json --threshold 0.10
+"""
+
+from contextlib import redirect_stdout
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RENDERER_DIR = os.path.normpath(os.path.join(SCRIPT_DIR, '../renderer-mock'))
+FIXTURE_DIR = os.path.normpath(os.path.join(SCRIPT_DIR, '../.cache/bench-fixtures'))
+SPREAD_SIZE = (3375, 2625)
+POSE_SIZE = (2048, 2048)
+WORKFLOW_NODES = 4000
+REPEAT = 5
+THRESHOLD = 0.10
+
+
+def load_script(path, name=None):
+    """Import a script by path (works for hyphenated file names)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    name = name or os.path.splitext(os.path.basename(path))[0].replace('-', '_')
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KB elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+def make_fixtures(fixture_dir=FIXTURE_DIR):
+    """Generate the synthetic inputs once; returns their paths"""
+    import numpy as np
+    from PIL import Image, ImageDraw
+
+    os.makedirs(fixture_dir, exist_ok=True)
+    paths = {name: os.path.join(fixture_dir, name)
+             for name in ('spread.png', 'pose.png', 'workflow.json')}
+    rng = np.random.default_rng(2024)
+
+    if not os.path.exists(paths['spread.png']):
+        # Painted-looking background: smooth gradients plus noise and shapes
+        w, h = SPREAD_SIZE
+        y, x = np.mgrid[0:h, 0:w]
+        base = np.stack([(x * 255 // w), (y * 255 // h), ((x + y) * 255 // (w + h))], axis=-1)
+        noise = rng.integers(0, 24, (h, w, 3))
+        img = Image.fromarray((base + noise).clip(0, 255).astype(np.uint8), 'RGB').convert('RGBA')
+        draw = ImageDraw.Draw(img)
+        for _ in range(60):
+            x0, y0 = rng.integers(0, w - 400), rng.integers(0, h - 400)
+            draw.ellipse([x0, y0, x0 + rng.integers(50, 400), y0 + rng.integers(50, 400)],
+                         fill=tuple(int(c) for c in rng.integers(0, 255, 3)) + (255,))
+        img.save(paths['spread.png'])
+
+    if not os.path.exists(paths['pose.png']):
+        # Character-like figure on a transparent sheet
+        w, h = POSE_SIZE
+        img = Image.new('RGBA', (w, h), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(img)
+        draw.ellipse([w * 0.38, h * 0.08, w * 0.62, h * 0.30], fill=(240, 200, 160, 255), outline=(60, 40, 30, 255), width=12)
+        draw.rounded_rectangle([w * 0.32, h * 0.30, w * 0.68, h * 0.66], 80, fill=(230, 110, 40, 255), outline=(60, 40, 30, 255), width=12)
+        for x0 in (0.36, 0.52):
+            draw.rounded_rectangle([w * x0, h * 0.64, w * (x0 + 0.12), h * 0.94], 40, fill=(50, 90, 170, 255), outline=(60, 40, 30, 255), width=12)
+        for x0 in (0.18, 0.68):
+            draw.rounded_rectangle([w * x0, h * 0.32, w * (x0 + 0.14), h * 0.40], 30, fill=(240, 200, 160, 255), outline=(60, 40, 30, 255), width=12)
+        img.save(paths['pose.png'])
+
+    if not os.path.exists(paths['workflow.json']):
+        nodes = []
+        for i in range(WORKFLOW_NODES):
+            nodes.append({
+                'id': i, 'type': ('LoadImage', 'CheckpointLoaderSimple', 'LoraLoader', 'SaveImage')[i % 4],
+                'pos': [i * 10, i * 5], 'size': {'0': 315, '1': 98}, 'flags': {}, 'order': i, 'mode': 0,
+                'inputs': [{'name': 'model', 'type': 'MODEL', 'link': i}],
+                'outputs': [{'name': 'IMAGE', 'type': 'IMAGE', 'links': [i + 1], 'slot_index': 0}],
+                'properties': {'Node name for S&R': 'Node'},
+                'widgets_values': [f"PATH_POSE_IMAGEpose{i % 12 + 1:02d}.png",
+                                   f"PATH_MODELS/Loras/character_{i}.safetensors",
+                                   f"PATH_MASKSpose{i % 12 + 1:02d}_head_mask.png",
+                                   "PATH_OUTPUT", 0.75, 1024, "a storybook illustration " * 8],
+            })
+        with open(paths['workflow.json'], 'w') as f:
+            json.dump({'last_node_id': WORKFLOW_NODES, 'nodes': nodes, 'links': [], 'groups': [],
+                       'config': {}, 'extra': {}, 'version': 0.4}, f, indent=2)
+    return paths
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks: setup(fixtures, work_dir) returns (run, items per run)
+# ---------------------------------------------------------------------------
+
+def succeeded(fn, *args):
+    """run() for the converter scripts, which report failure by returning False
+
+    Their output is silenced while timing, so raise instead; a broken
+    converter must fail the benchmark rather than be timed as a fast run.
+    """
+    def run():
+        if fn(*args) is not True:
+            raise RuntimeError(f"{fn.__name__}{args} failed")
+    return run
+
+
+def bench_grayscale(fixtures, work_dir):
+    module = load_script(os.path.join(SCRIPT_DIR, 'convert-poses-to-grayscale.py'))
+    output = os.path.join(work_dir, 'gray.png')
+    return succeeded(module.convert_to_grayscale, fixtures['spread.png'], output), 1
+
+
+def bench_edges(fixtures, work_dir):
+    module = load_script(os.path.join(SCRIPT_DIR, 'convert-poses-to-edges.py'))
+    output = os.path.join(work_dir, 'edges.png')
+    return succeeded(module.convert_to_edge_map, fixtures['spread.png'], output), 1
+
+
+def bench_annotate(fixtures, work_dir):
+    module = load_script(os.path.join(SCRIPT_DIR, 'add-image-annotations.py'))
+    output = os.path.join(work_dir, 'annotated.png')
+    return succeeded(module.add_annotations_to_pose, fixtures['pose.png'], output), 1
+
+
+def bench_text_box(fixtures, work_dir):
+    module = load_script(os.path.join(RENDERER_DIR, 'text_boxes.py'))
+    # The locked text box at print size
+    return lambda: module.create_rounded_rectangle(2194, 424, 156, 'ede9c1', 128), 1
+
+
+def bench_backgrounds(fixtures, work_dir):
+    module = load_script(os.path.join(RENDERER_DIR, 'backgrounds.py'))
+    pages = module.PAGES[:4]
+    return lambda: list(module.generate_backgrounds(pages, work_dir, workers=1)), len(pages)
+
+
+def bench_workflow_paths(fixtures, work_dir):
+    module = load_script(os.path.join(SCRIPT_DIR, 'update_comfyui_paths.py'))
+    output = os.path.join(work_dir, 'workflow.json')
+    mappings = module.default_mappings('/srv/assets')
+    return lambda: module.update_workflow_paths(fixtures['workflow.json'], mappings, output), 1
+
+
+BENCHMARKS = {
+    'grayscale': bench_grayscale,
+    'edges': bench_edges,
+    'annotate': bench_annotate,
+    'text_box': bench_text_box,
+    'backgrounds': bench_backgrounds,
+    'workflow_paths': bench_workflow_paths,
+}
+
+
+def run_one(name, fixture_dir, repeat):
+    """Run one benchmark in this process and return its measurements"""
+    import tempfile
+
+    fixtures = make_fixtures(fixture_dir)
+    with tempfile.TemporaryDirectory() as work_dir, open(os.devnull, 'w') as devnull:
+        run, items = BENCHMARKS[name](fixtures, work_dir)
+        with redirect_stdout(devnull):
+            run()
+            baseline_rss = peak_rss_mb()
+            times = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                run()
+                times.append(time.perf_counter() - started)
+    median = statistics.median(times)
+    return {
+        'wall_s': round(median, 6),
+        'min_s': round(min(times), 6),
+        'items': items,
+        'items_per_s': round(items / median, 3) if median else None,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'warm_rss_mb': round(baseline_rss, 1),
+        'repeat': repeat,
+    }
+
+
+def run_isolated(name, fixture_dir, repeat):
+    """Run one benchmark in a fresh interpreter so its peak RSS is its own"""
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', name,
+                           '--fixtures', fixture_dir, '--repeat', str(repeat)],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def environment():
+    import numpy
+    import PIL
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'cpus': os.cpu_count(), 'pillow': PIL.__version__, 'numpy': numpy.__version__,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def compare(results, baseline, threshold):
+    """Print deltas against a saved run; returns the names that regressed"""
+    regressed = []
+    for name, result in results.items():
+        before = baseline.get('results', {}).get(name)
+        if not before or 'error' in before:
+            continue
+        if 'error' in result:
+            print(f"✗ {name:16s} failed: {result['error']}")
+            regressed.append(name)
+            continue
+        time_delta = result['wall_s'] / before['wall_s'] - 1
+        rss_delta = result['peak_rss_mb'] / before['peak_rss_mb'] - 1
+        worse = time_delta > threshold or rss_delta > threshold
+        mark = '✗' if worse else '✓'
+        print(f"{mark} {name:16s} time {time_delta:+7.1%}  peak RSS {rss_delta:+7.1%}")
+        if worse:
+            regressed.append(name)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the image and workflow tooling")
+    parser.add_argument('--only', help="comma-separated subset of: " + ', '.join(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--fixtures', default=FIXTURE_DIR)
+    parser.add_argument('--regenerate', action='store_true', help="rebuild the synthetic fixtures")
+    parser.add_argument('--save', help="write results as JSON")
+    parser.add_argument('--compare', help="JSON from an earlier --save to compare against")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="relative slowdown or memory growth that counts as a regression")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == 'fixtures':
+        make_fixtures(args.fixtures)
+        return
+    if args.child:
+        print(json.dumps(run_one(args.child, args.fixtures, args.repeat)))
+        return
+
+    names = [n for n in args.only.split(',') if n] if args.only else list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+    if args.regenerate:
+        shutil.rmtree(args.fixtures, ignore_errors=True)
+    # Build fixtures in a child too: on Linux a child inherits its parent's
+    # peak RSS, so this process has to stay small
+    subprocess.run([sys.executable, os.path.abspath(__file__), '--child', 'fixtures',
+                    '--fixtures', args.fixtures], check=True)
+
+    results = {}
+    print(f"{'benchmark':16s} {'median':>9s} {'items/s':>9s} {'peak RSS':>10s}")
+    for name in names:
+        result = results[name] = run_isolated(name, args.fixtures, args.repeat)
+        if 'error' in result:
+            print(f"{name:16s} ✗ {result['error']}")
+        else:
+            print(f"{name:16s} {result['wall_s']:8.3f}s {result['items_per_s']:9.2f} "
+                  f"{result['peak_rss_mb']:8.1f}MB")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2)
+        print(f"\n✓ Saved {args.save}")
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.compare} (threshold {args.threshold:.0%}):")
+        regressed = compare(results, baseline, args.threshold)
+        if regressed:
+            print(f"\n✗ Regressions: {', '.join(regressed)}")
+            sys.exit(1)
+    if any('error' in result for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+"""
+Content-hash build cache for generated assets
+An output is up to date when it was built from the same input bytes with the
+same transform parameters and has not been touched since. The manifest lives
+in .cache/build-manifest.json at the repo root.
+"""
+
+import hashlib
+import json
+import os
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.normpath(os.path.join(SCRIPT_DIR, '../.cache'))
+MANIFEST_PATH = os.path.join(CACHE_DIR, 'build-manifest.json')
+HASH_CHUNK = 1 << 20
+
+
+def file_digest(path):
+    """Return the sha256 hex digest of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+class BuildCache:
+    """Manifest of outputs keyed on input content and transform parameters
+
+    Input digests are memoised on (size, mtime) so unchanged inputs are not
+    re-read on every run.
+    """
+
+    def __init__(self, manifest_path=MANIFEST_PATH):
+        self.manifest_path = manifest_path
+        self.root = os.path.dirname(os.path.abspath(manifest_path))
+        self.inputs = {}
+        self.outputs = {}
+        self.dirty = False
+        try:
+            with open(manifest_path, 'r') as f:
+                data = json.load(f)
+            self.inputs = data.get('inputs', {})
+            self.outputs = data.get('outputs', {})
+        except (OSError, ValueError):
+            pass
+
+    def _rel(self, path):
+        return os.path.relpath(os.path.abspath(path), self.root)
+
+    def input_digest(self, path):
+        """Return the content digest of an input file"""
+        rel = self._rel(path)
+        stat = _stat_key(path)
+        entry = self.inputs.get(rel)
+        if entry and entry[:2] == stat:
+            return entry[2]
+        digest = file_digest(path)
+        self.inputs[rel] = stat + [digest]
+        self.dirty = True
+        return digest
+
+    def key(self, input_path, transform, params=None):
+        """Return the build key for transform(input_path, **params)"""
+        payload = json.dumps([self.input_digest(input_path), transform, params or {}],
+                             sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def is_fresh(self, output_path, key):
+        """True if output_path exists and was last built with key"""
+        entry = self.outputs.get(self._rel(output_path))
+        if not entry or entry[0] != key:
+            return False
+        try:
+            return entry[1:] == _stat_key(output_path)
+        except OSError:
+            return False
+
+    def record(self, output_path, key):
+        """Remember that output_path was just built with key"""
+        self.outputs[self._rel(output_path)] = [key] + _stat_key(output_path)
+        self.dirty = True
+
+    def save(self):
+        """Write the manifest atomically if anything changed"""
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'inputs': self.inputs, 'outputs': self.outputs}, f,
+                      separators=(',', ':'))
+        os.replace(tmp_path, self.manifest_path)
+        self.dirty = False
@@ -2,8 +2,9 @@
 """
 Check what's needed for the ComfyUI character generation workflow
 """
-import os
 import json
+from asset_manifest import load_manifest
+from model_verify import DigestCache, describe, verify_model
 
 def check_workflow_requirements():
     """Check what's installed and what's missing for the workflow"""
@@ -20,12 +21,11 @@ def check_workflow_requirements():
         "OpenPose ControlNet": "assets/models/controlnet/openpose_fp16.safetensors"
     }
     
+    cache = DigestCache()
     for name, path in models.items():
-        if os.path.exists(path):
-            size = os.path.getsize(path)
-            print(f"   ✅ {name}: {size:,} bytes")
-        else:
-            print(f"   ❌ {name}: MISSING")
+        result = verify_model(path, cache=cache)
+        print(f"   {'✅' if result['ok'] else '❌'} {name}: {describe(result)}")
+    cache.save()
     
     # Check assets
     assets = {
@@ -39,10 +39,11 @@ def check_workflow_requirements():
     }
     
     print("\n📸 Assets:")
+    manifest = load_manifest()
     for name, path in assets.items():
-        if os.path.exists(path):
-            size = os.path.getsize(path)
-            print(f"   ✅ {name}: {size:,} bytes")
+        record = manifest.get(path)
+        if record:
+            print(f"   ✅ {name}: {record['size']:,} bytes")
         else:
             print(f"   ❌ {name}: MISSING")
     
@@ -5,79 +5,46 @@ Convert pose reference images to edge maps
 This removes ALL visual information except pose structure
 """
 
-from PIL import Image, ImageFilter
+import argparse
 import os
-import numpy as np
+from build_cache import BuildCache
+from pose_pipeline import EDGE_THRESHOLD, build_file, find_poses, report, run_pipeline, to_edge_map
 
 # Configuration
-POSE_NUMBERS = [1, 2, 3, 4, 5]
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 INPUT_DIR = os.path.join(SCRIPT_DIR, '../assets/poses/grayscale')
 OUTPUT_DIR = os.path.join(SCRIPT_DIR, '../assets/poses/edges')
 
-def convert_to_edge_map(input_path, output_path):
+def convert_to_edge_map(input_path, output_path, threshold=EDGE_THRESHOLD, cache=None,
+                        operator='laplacian', dilate=0):
     """Convert grayscale image to pure edge map"""
+    edge_options = {'operator': operator, 'threshold': threshold, 'dilate': dilate}
     try:
-        # Open the grayscale image
-        img = Image.open(input_path)
-        
-        # Convert to RGB for edge detection
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
-        
-        # Apply edge detection filter
-        edges = img.filter(ImageFilter.FIND_EDGES)
-        
-        # Convert to pure black and white (no grays)
-        edges_array = np.array(edges)
-        
-        # Threshold to pure black/white
-        threshold = 50  # Adjust this value if needed
-        edges_array[edges_array < threshold] = 0    # Black
-        edges_array[edges_array >= threshold] = 255 # White
-        
-        # Convert back to PIL Image
-        edges_img = Image.fromarray(edges_array.astype('uint8'))
-        
-        # Convert to RGBA with transparent background
-        edges_rgba = Image.new('RGBA', edges_img.size, (255, 255, 255, 0))  # Transparent background
-        
-        # Copy only the black edges (pose outline)
-        edges_array_rgba = np.array(edges_rgba)
-        edges_array_gray = np.array(edges_img.convert('L'))
-        
-        # Where edges are black (0), make them black in RGBA
-        # Where edges are white (255), keep transparent
-        mask = edges_array_gray == 0
-        edges_array_rgba[mask] = [0, 0, 0, 255]  # Black edges
-        
-        final_img = Image.fromarray(edges_array_rgba)
-        
-        # Save as PNG
-        final_img.save(output_path, 'PNG')
-        print(f"✓ Converted to edge map: {os.path.basename(output_path)}")
+        if build_file(input_path, output_path, 'edges',
+                      lambda img: to_edge_map(img, **edge_options), cache, edge_options):
+            print(f"✓ Converted to edge map: {os.path.basename(output_path)}")
+        else:
+            print(f"↷ Up to date: {os.path.basename(output_path)}")
         return True
     except Exception as e:
         print(f"✗ Failed to convert {os.path.basename(input_path)}: {e}")
         return False
 
 def main():
-    # Create output directory
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--strip-rows', type=int, default=None,
+                        help="process print-size images in memory-mapped strips of this many rows")
+    args = parser.parse_args()
     
     print("Converting grayscale pose images to edge maps...\n")
     
-    converted = 0
-    for pose_num in POSE_NUMBERS:
-        padded_num = str(pose_num).zfill(2)
-        input_path = os.path.join(INPUT_DIR, f"pose{padded_num}.png")
-        output_path = os.path.join(OUTPUT_DIR, f"pose{padded_num}.png")
-        
-        if os.path.exists(input_path):
-            if convert_to_edge_map(input_path, output_path):
-                converted += 1
-        else:
-            print(f"⚠ Skipped: pose{padded_num}.png (file not found)")
+    inputs = find_poses(INPUT_DIR)
+    if not inputs:
+        print(f"⚠ No grayscale poses found in {INPUT_DIR}")
+    results = run_pipeline(inputs, stages=('edges',),
+                           output_dirs={'edges': OUTPUT_DIR}, cache=BuildCache(),
+                           strip_rows=args.strip_rows)
+    converted = report(results, "Converted to edge map")
     
     print(f"\n✓ Done! Converted {converted} images to edge maps")
     print(f"   Saved to: {OUTPUT_DIR}")
@@ -1,7 +1,22 @@
 #!/usr/bin/env python3
-"""Create a completely corrected workflow JSON file."""
+"""Create a completely corrected workflow JSON file.
 
+With --concurrency N the per-page chain is split into N parallel lanes that
+rejoin before compilation (see fan_out_pages).
+"""
+
+import argparse
+import copy
 import json
+from workflow_index import validate_workflow
+
+OUTPUT_FILE = 'docs/n8n-workflow-files/n8n-new/3-book-assembly-production-fixed.json'
+# Per-page chain between "Initialize Page Generation Loop" and "Update Page Progress"
+PAGE_NODES = ("Generate Page HTML", "Generate PDF Page",
+              "Download PDF from RenderPDF and Save to R2", "Upload PDF to R2")
+LANE_SPACING = 220
+# The Merge node (v3) offers 2 to 10 inputs
+MAX_LANES = 10
 
 # Create the corrected workflow structure
 workflow = {
@@ -346,15 +361,154 @@ workflow = {
     "versionId": "1"
 }
 
-# Write the corrected workflow
-with open('docs/n8n-workflow-files/n8n-new/3-book-assembly-production-fixed.json', 'w') as f:
-    json.dump(workflow, f, indent=2)
 
-print("✅ Corrected workflow created successfully!")
-print("📁 File: docs/n8n-workflow-files/n8n-new/3-book-assembly-production-fixed.json")
-print("\n🔧 Fixes applied:")
-print("   ✅ Node 4: Removed template literals with quotes")
-print("   ✅ Node 13: Added dynamic R2 URL")
-print("   ✅ All nodes: Used string concatenation instead of template literals")
-print("\n📋 This file should now import successfully into n8n!")
+def _node(node_id, name, node_type, type_version, position, parameters, **settings):
+    return dict({"id": node_id, "name": name, "type": node_type, "typeVersion": type_version,
+                 "position": position, "parameters": parameters}, **settings)
+
+
+def _edge(target, index=0):
+    return {"node": target, "type": "main", "index": index}
+
+
+def fan_out_pages(workflow, concurrency):
+    """Return a copy of workflow whose page chain runs in `concurrency` lanes
+
+    Lane k takes every concurrency-th page starting at page k and walks it
+    through clones of PAGE_NODES one page at a time (Loop Over Items, batch
+    size 1, since the page code reads $input.first()). Each page node retries
+    on failure, each lane reports its own progress, and the lanes rejoin in
+    a Merge node whose combined progress feeds "Check All Pages Complete".
+    """
+    if not 2 <= concurrency <= MAX_LANES:
+        raise ValueError(f"concurrency must be between 2 and {MAX_LANES}")
+    workflow = copy.deepcopy(workflow)
+    nodes = {node['name']: node for node in workflow['nodes']}
+    connections = workflow['connections']
+    x0, y0 = nodes["Generate Page HTML"]['position']
+    step = nodes["Generate PDF Page"]['position'][0] - x0
+
+    lane_nodes = []
+    merge_x = x0 + step * (len(PAGE_NODES) + 2)
+    for lane in range(1, concurrency + 1):
+        y = y0 + round((lane - (concurrency + 1) / 2) * LANE_SPACING)
+        select = f"Select Pages (Lane {lane})"
+        loop = f"Loop Pages (Lane {lane})"
+        progress = f"Update Page Progress (Lane {lane})"
+        lane_nodes.append(_node(f"5-lane{lane}", select, "n8n-nodes-base.function", 1,
+                                [x0 - step // 2, y], {"functionCode": (
+            f"// Pages for lane {lane} of {concurrency}: every {concurrency} pages starting at page {lane}\n"
+            f"return $input.all().filter(item => (item.json.currentPageNumber - 1) % {concurrency} === {lane - 1});")}))
+        lane_nodes.append(_node(f"loop-lane{lane}", loop, "n8n-nodes-base.splitInBatches", 3,
+                                [x0, y], {"batchSize": 1, "options": {}}))
+        connections[select] = {"main": [[_edge(loop)]]}
+
+        previous = None
+        for position, name in enumerate(PAGE_NODES, 1):
+            clone = copy.deepcopy(nodes[name])
+            clone.update(id=f"{clone['id']}-lane{lane}", name=f"{name} (Lane {lane})",
+                         position=[x0 + step * position, y],
+                         retryOnFail=True, maxTries=3, waitBetweenTries=2000)
+            lane_nodes.append(clone)
+            if previous is None:
+                # Loop Over Items: output 0 is "done", output 1 is the next batch
+                connections[loop] = {"main": [[_edge(progress)], [_edge(clone['name'])]]}
+            else:
+                connections[previous] = {"main": [[_edge(clone['name'])]]}
+            previous = clone['name']
+        connections[previous] = {"main": [[_edge(loop)]]}
+
+        lane_nodes.append(_node(f"9-lane{lane}", progress, "n8n-nodes-base.function", 1,
+                                [x0 + step * (len(PAGE_NODES) + 1), y], {"functionCode": (
+            f"// Summarise the pages generated by lane {lane}\n"
+            "const pages = $input.all().map(item => item.json);\n"
+            "const failed = pages.filter(page => (page.status || '').endsWith('_failed'));\n"
+            f"console.log('Lane {lane}: ' + (pages.length - failed.length) + '/' + pages.length + ' pages generated');\n"
+            f"return [{{ json: {{ lane: {lane}, pages: pages.map(page => page.currentPageNumber), "
+            "failedPages: failed.map(page => page.currentPageNumber), "
+            "pagesGenerated: pages.length - failed.length } }];")}))
+        connections[progress] = {"main": [[_edge("Merge Page Lanes", lane - 1)]]}
+
+    lane_nodes.append(_node("9-merge", "Merge Page Lanes", "n8n-nodes-base.merge", 3,
+                            [merge_x, y0], {"numberInputs": concurrency}))
+    lane_nodes.append(_node("9-collect", "Collect Page Progress", "n8n-nodes-base.function", 1,
+                            [merge_x + step, y0], {"functionCode": (
+        "// Combine lane progress into order progress\n"
+        "const orderData = $('Get Order Ready for Assembly').first().json;\n"
+        "const lanes = $input.all().map(item => item.json);\n"
+        "const pagesGenerated = lanes.reduce((sum, lane) => sum + lane.pagesGenerated, 0);\n"
+        "const failedPages = [].concat(...lanes.map(lane => lane.failedPages));\n"
+        "const totalPages = orderData.totalPagesRequired || 14;\n"
+        "const updatedOrder = {\n"
+        "  ...orderData,\n"
+        "  pagesGenerated: pagesGenerated,\n"
+        "  failedPages: failedPages,\n"
+        "  assemblyProgress: Math.round((pagesGenerated / totalPages) * 100),\n"
+        "  lastPageGeneratedAt: new Date().toISOString()\n"
+        "};\n"
+        "if (pagesGenerated >= totalPages) {\n"
+        "  updatedOrder.status = 'pages_generated';\n"
+        "  updatedOrder.pagesGeneratedAt = new Date().toISOString();\n"
+        "  console.log('All pages generated for order: ' + orderData.amazonOrderId);\n"
+        "} else {\n"
+        "  console.log('Pages generated: ' + pagesGenerated + '/' + totalPages + ', failed: ' + failedPages.join(', '));\n"
+        "}\n"
+        "return [{ json: updatedOrder }];")}))
+    connections["Merge Page Lanes"] = {"main": [[_edge("Collect Page Progress")]]}
+    connections["Collect Page Progress"] = {"main": [[_edge("Check All Pages Complete")]]}
+    connections["Initialize Page Generation Loop"] = {"main": [[
+        _edge(f"Select Pages (Lane {lane})") for lane in range(1, concurrency + 1)]]}
+
+    # Drop the linear page chain and shift everything after it right
+    replaced = set(PAGE_NODES) | {"Update Page Progress"}
+    for name in replaced:
+        connections.pop(name, None)
+    # Read the threshold once: "Check All Pages Complete" itself moves below
+    check_x = nodes["Check All Pages Complete"]['position'][0]
+    shift = merge_x + step * 2 - check_x
+    kept = []
+    for node in workflow['nodes']:
+        if node['name'] in replaced:
+            continue
+        if node['position'][0] >= check_x:
+            node['position'] = [node['position'][0] + shift, node['position'][1]]
+        kept.append(node)
+    index = kept.index(nodes["Check All Pages Complete"])
+    workflow['nodes'] = kept[:index] + lane_nodes + kept[index:]
+    return workflow
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the book assembly workflow")
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help="generate pages in this many parallel lanes (1 = linear chain)")
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    args = parser.parse_args()
+    if not 1 <= args.concurrency <= MAX_LANES:
+        parser.error(f"--concurrency must be between 1 and {MAX_LANES} (the Merge node's input limit)")
+
+    result = fan_out_pages(workflow, args.concurrency) if args.concurrency > 1 else workflow
+    problems = validate_workflow(result)
+    if problems:
+        print("❌ Generated workflow does not validate:")
+        for problem in problems:
+            print(f"   {problem}")
+        raise SystemExit(1)
+
+    # Write the corrected workflow
+    with open(args.output, 'w') as f:
+        json.dump(result, f, indent=2)
+
+    print("✅ Corrected workflow created successfully!")
+    print(f"📁 File: {args.output}")
+    print("\n🔧 Fixes applied:")
+    print("   ✅ Node 4: Removed template literals with quotes")
+    print("   ✅ Node 13: Added dynamic R2 URL")
+    print("   ✅ All nodes: Used string concatenation instead of template literals")
+    if args.concurrency > 1:
+        print(f"   ✅ Pages generated in {args.concurrency} parallel lanes with per-node retries")
+    print("\n📋 This file should now import successfully into n8n!")
+
 
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,12 @@
 #!/usr/bin/env python3
 """Create a corrected workflow JSON file that can be imported into n8n."""
 
-import json
-import re
+import sys
+from workflow_index import validate_workflow
+from workflow_patch import Workflow, apply_patches
 
-# Read the backup file
-with open('docs/n8n-workflow-files/n8n-new/3-book-assembly-production.json.backup', 'r') as f:
-    content = f.read()
+INPUT_FILE = 'docs/n8n-workflow-files/n8n-new/3-book-assembly-production.json.backup'
+OUTPUT_FILE = 'docs/n8n-workflow-files/n8n-new/3-book-assembly-production-fixed.json'
 
 # Fix Node 4 - Replace the problematic function code
 node4_fixed_code = """// Load story text for all pages with character personalization
@@ -60,63 +60,39 @@ const completedOrder = {
 console.log('Book assembly completed for order: ' + orderData.amazonOrderId);
 return [{ json: completedOrder }];"""
 
-# Parse the JSON manually by fixing the problematic sections
-print("🔧 Fixing JSON syntax errors...")
+PATCHES = [
+    {'op': 'set_code', 'node': 'Load Story Text', 'code': node4_fixed_code},
+    {'op': 'set_code', 'node': 'Update Order Status Complete', 'code': node13_fixed_code},
+]
 
-# Find and replace Node 4 function code
-# Look for the start of Node 4's functionCode
-node4_start = content.find('"functionCode": "// Load story text for all pages with character personalization')
-if node4_start == -1:
-    print("❌ Could not find Node 4 start")
-    exit(1)
+input_file = sys.argv[1] if len(sys.argv) > 1 else INPUT_FILE
+output_file = sys.argv[2] if len(sys.argv) > 2 else OUTPUT_FILE
 
-# Find the end of Node 4's functionCode (look for the closing quote and brace)
-node4_end = content.find('"}', node4_start)
-if node4_end == -1:
-    print("❌ Could not find Node 4 end")
-    exit(1)
+print("🔧 Fixing JSON syntax errors...")
 
-# Replace Node 4
-node4_end += 2  # Include the closing quote and brace
-old_node4 = content[node4_start:node4_end]
-escaped_code = node4_fixed_code.replace('\n', '\\n').replace('"', '\\"')
-new_node4 = f'"functionCode": "{escaped_code}"'
-content = content.replace(old_node4, new_node4)
+# Parse once (tolerating raw newlines in code strings), patch the nodes by
+# name and serialize once
+try:
+    workflow = Workflow.load(input_file)
+    applied = apply_patches(workflow, PATCHES)
+except (OSError, ValueError, KeyError) as e:
+    print(f"❌ Could not patch {input_file}: {e}")
+    sys.exit(1)
 print("✅ Fixed Node 4: Load Story Text")
-
-# Find and replace Node 13 function code
-node13_start = content.find('"functionCode": "// Update order status to completed')
-if node13_start == -1:
-    print("❌ Could not find Node 13 start")
-    exit(1)
-
-node13_end = content.find('"}', node13_start)
-if node13_end == -1:
-    print("❌ Could not find Node 13 end")
-    exit(1)
-
-# Replace Node 13
-node13_end += 2
-old_node13 = content[node13_start:node13_end]
-escaped_code13 = node13_fixed_code.replace('\n', '\\n').replace('"', '\\"')
-new_node13 = f'"functionCode": "{escaped_code13}"'
-content = content.replace(old_node13, new_node13)
 print("✅ Fixed Node 13: Update Order Status Complete")
+for line in applied:
+    print(f"   {line}")
 
-# Write the corrected file
-with open('docs/n8n-workflow-files/n8n-new/3-book-assembly-production-fixed.json', 'w') as f:
-    f.write(content)
+# Validate before writing
+problems = validate_workflow(workflow.data)
+if problems:
+    print("❌ Workflow validation failed:")
+    for problem in problems:
+        print(f"   {problem}")
+    sys.exit(1)
+print("✅ Workflow validation passed!")
 
+workflow.save(output_file)
 print("\n✅ Corrected workflow saved to:")
-print("   docs/n8n-workflow-files/n8n-new/3-book-assembly-production-fixed.json")
+print(f"   {output_file}")
 print("\n📋 This file should now import successfully into n8n!")
-
-# Validate the JSON
-try:
-    with open('docs/n8n-workflow-files/n8n-new/3-book-assembly-production-fixed.json', 'r') as f:
-        json.load(f)
-    print("✅ JSON validation passed!")
-except json.JSONDecodeError as e:
-    print(f"❌ JSON validation failed: {e}")
-    print("⚠️  The file may still have syntax issues")
-
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+
+"""
+Preview renditions for print masters
+Each master PNG is decoded once and downscaled into a web and a thumbnail
+rendition, encoded as WebP (alpha is kept, lossily compressed), next to the
+master in a derivatives/ directory. The lossless master itself stays the
+print rendition. assets/derivatives.json maps every master (repo-relative)
+to its renditions, and masters whose size, mtime and rendition settings are
+unchanged are skipped.
+
+    python scripts/derivatives.py                      # every default source
+    python scripts/derivatives.py assets/hair-references/*.png --force
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+import argparse
+import glob
+import json
+import os
+from instrumentation import span
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.normpath(os.path.join(SCRIPT_DIR, '..'))
+MANIFEST_PATH = os.path.join(REPO_DIR, 'assets/derivatives.json')
+MANIFEST_VERSION = 1
+SUBDIR = 'derivatives'
+# Masters that previews and review screens load
+SOURCES = (
+    'renderer-mock/assets/backgrounds/*.png',
+    'assets/poses/grayscale/*.png',
+    'assets/poses/edges/*.png',
+    'assets/poses/annotated/*.png',
+    'assets/hair-references/*.png',
+)
+# Largest first: each rendition is resized from the one before it
+RENDITIONS = {
+    'web': {'max_size': 1600, 'quality': 82, 'alpha_quality': 80},
+    'thumb': {'max_size': 320, 'quality': 70, 'alpha_quality': 60},
+}
+
+
+def rel_path(path):
+    """Repo-relative, '/'-separated path used as a manifest key"""
+    return os.path.relpath(os.path.abspath(path), REPO_DIR).replace(os.sep, '/')
+
+
+def rendition_path(master, name):
+    """Where the named rendition of master is written"""
+    directory, filename = os.path.split(master)
+    return os.path.join(directory, SUBDIR, f"{os.path.splitext(filename)[0]}.{name}.webp")
+
+
+def fit_size(size, max_size):
+    """size scaled down (never up) so the longer side is at most max_size"""
+    width, height = size
+    scale = min(1.0, max_size / max(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def make_renditions(master, renditions=RENDITIONS):
+    """Decode master once and write every rendition; returns its manifest entry
+
+    Runs inside pool workers, so errors are returned under 'error'.
+    """
+    entry = {'error': None}
+    try:
+        st = os.stat(master)
+        with Image.open(master) as source:
+            with span('decode', tool='derivatives') as s:
+                s.bytes_in = st.st_size
+                source.load()
+            has_alpha = 'A' in source.getbands() or 'transparency' in source.info
+            image = source.convert('RGBA' if has_alpha else 'RGB')
+        entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns, width=image.width,
+                     height=image.height, renditions={})
+
+        for name, spec in renditions.items():
+            target = fit_size(image.size, spec['max_size'])
+            if target != image.size:
+                with span('resize', tool='derivatives', rendition=name):
+                    # reducing_gap lets Pillow box-reduce first, then filter the rest
+                    image = image.resize(target, Image.Resampling.LANCZOS, reducing_gap=3.0)
+            path = rendition_path(master, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with span('encode', tool='derivatives', rendition=name) as s:
+                image.save(tmp_path, 'WEBP', quality=spec['quality'],
+                           alpha_quality=spec['alpha_quality'], method=4)
+                os.replace(tmp_path, path)
+                s.bytes_out = os.path.getsize(path)
+            entry['renditions'][name] = {'path': rel_path(path), 'width': image.width,
+                                         'height': image.height, 'bytes': s.bytes_out}
+    except Exception as e:
+        entry['error'] = str(e)
+    return entry
+
+
+class DerivativeManifest:
+    """Master -> renditions index, saved atomically"""
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        self.masters = {}
+        self.dirty = False
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.masters = data['masters']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def is_fresh(self, master, renditions=RENDITIONS):
+        """True if master is unchanged and all of its renditions exist with these settings"""
+        entry = self.masters.get(rel_path(master))
+        if not entry or entry.get('settings') != renditions:
+            return False
+        st = os.stat(master)
+        if [entry['size'], entry['mtime_ns']] != [st.st_size, st.st_mtime_ns]:
+            return False
+        return all(os.path.exists(os.path.join(REPO_DIR, r['path'])) for r in entry['renditions'].values())
+
+    def record(self, master, entry, renditions=RENDITIONS):
+        entry = {key: value for key, value in entry.items() if key != 'error'}
+        entry['settings'] = renditions
+        self.masters[rel_path(master)] = entry
+        self.dirty = True
+
+    def renditions(self, master):
+        """{'print': repo-relative master path, name: rendition path, ...} or None"""
+        entry = self.masters.get(rel_path(master))
+        if entry is None:
+            return None
+        paths = {'print': rel_path(master)}
+        paths.update((name, r['path']) for name, r in entry['renditions'].items())
+        return paths
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': MANIFEST_VERSION, 'masters': self.masters}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def find_masters(patterns=SOURCES):
+    """Every existing master matching the repo-relative glob patterns"""
+    masters = []
+    for pattern in patterns:
+        masters.extend(sorted(glob.glob(os.path.join(REPO_DIR, pattern))))
+    return masters
+
+
+def build_derivatives(masters, manifest=None, renditions=RENDITIONS, workers=None, force=False):
+    """Render renditions for every stale master across a process pool
+
+    Yields (master, entry) in input order; entry is None when the master
+    was already up to date, otherwise a make_renditions() result.
+    """
+    stale = {m for m in masters if force or manifest is None or not manifest.is_fresh(m, renditions)}
+
+    def finish(master, entry):
+        if entry is not None and not entry['error'] and manifest is not None:
+            manifest.record(master, entry, renditions)
+        return master, entry
+
+    try:
+        if workers == 1 or len(stale) <= 1:
+            for master in masters:
+                yield finish(master, make_renditions(master, renditions) if master in stale else None)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {m: pool.submit(make_renditions, m, renditions) for m in masters if m in stale}
+            for master in masters:
+                yield finish(master, futures[master].result() if master in futures else None)
+    finally:
+        if manifest is not None:
+            manifest.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write web and thumbnail renditions of print masters")
+    parser.add_argument('masters', nargs='*', help="master images (default: every default source)")
+    parser.add_argument('--manifest', default=MANIFEST_PATH)
+    parser.add_argument('--workers', type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="rebuild renditions even if up to date")
+    args = parser.parse_args()
+
+    masters = args.masters or find_masters()
+    if not masters:
+        print("⚠ No master images found")
+        return
+
+    manifest = DerivativeManifest(args.manifest)
+    master_bytes = preview_bytes = failed = 0
+    for master, entry in build_derivatives(masters, manifest, workers=args.workers, force=args.force):
+        name = rel_path(master)
+        if entry is None:
+            print(f"↷ Up to date: {name}")
+            continue
+        if entry['error']:
+            failed += 1
+            print(f"✗ Failed to process {name}: {entry['error']}")
+            continue
+        web = entry['renditions']['web']['bytes'] if 'web' in entry['renditions'] else 0
+        master_bytes += entry['size']
+        preview_bytes += web
+        sizes = ', '.join(f"{n} {r['width']}x{r['height']} {r['bytes'] / 1024:.0f}KB"
+                          for n, r in entry['renditions'].items())
+        print(f"✓ {name}: {sizes}")
+
+    if master_bytes:
+        print(f"\n✓ Masters {master_bytes / 2**20:.1f}MB → web previews {preview_bytes / 2**20:.2f}MB")
+    print(f"   Manifest: {os.path.relpath(args.manifest)}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
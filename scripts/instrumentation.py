@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+
+"""
+Lightweight timing and memory spans for the asset scripts
+Wrap a stage in span() (or decorate it with timed()) to record its wall
+time, CPU time, bytes in/out and the process's peak RSS:
+
+    with span('encode', stage='edges') as s:
+        img.save(path)
+        s.bytes_out = os.path.getsize(path)
+
+Spans are always aggregated in memory (prometheus_text() renders them).
+Set LHB_TRACE to a file path (or '-' for stderr) to also append one JSON
+line per span; lines are written with a single O_APPEND write, so pool
+workers can share one trace file. Set LHB_METRICS to a path to write the
+Prometheus text for the process at exit.
+
+    python scripts/instrumentation.py summary trace.jsonl
+    python scripts/instrumentation.py prometheus trace.jsonl > metrics.prom
+"""
+
+from functools import wraps
+import argparse
+import atexit
+import json
+import os
+import resource
+import sys
+import threading
+import time
+
+TRACE_ENV = 'LHB_TRACE'
+METRICS_ENV = 'LHB_METRICS'
+METRIC_PREFIX = 'lhb_span'
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KB elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Span:
+    """One timed stage; set bytes_in / bytes_out while it is open"""
+
+    __slots__ = ('name', 'labels', 'bytes_in', 'bytes_out', 'started', 'wall', 'cpu', 'error')
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.error = None
+
+    def record(self):
+        return {'ts': round(self.started, 6), 'span': self.name, 'labels': self.labels,
+                'wall_s': round(self.wall, 6), 'cpu_s': round(self.cpu, 6),
+                'bytes_in': self.bytes_in, 'bytes_out': self.bytes_out,
+                'peak_rss_bytes': peak_rss_bytes(), 'pid': os.getpid(), 'error': self.error}
+
+
+class Recorder:
+    """Aggregates spans per (name, labels) and optionally appends them to a trace file"""
+
+    def __init__(self, trace_path=None):
+        self.totals = {}
+        self._lock = threading.Lock()
+        self._fd = None
+        self.trace_path = trace_path
+        if trace_path == '-':
+            self._fd = sys.stderr.fileno()
+        elif trace_path:
+            self._fd = os.open(trace_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def add(self, record):
+        key = (record['span'], tuple(sorted(record['labels'].items())))
+        with self._lock:
+            totals = self.totals.setdefault(key, {'count': 0, 'errors': 0, 'wall_s': 0.0, 'cpu_s': 0.0,
+                                                  'bytes_in': 0, 'bytes_out': 0, 'peak_rss_bytes': 0})
+            totals['count'] += 1
+            totals['errors'] += record['error'] is not None
+            for field in ('wall_s', 'cpu_s', 'bytes_in', 'bytes_out'):
+                totals[field] += record[field]
+            totals['peak_rss_bytes'] = max(totals['peak_rss_bytes'], record['peak_rss_bytes'])
+        if self._fd is not None:
+            os.write(self._fd, (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8'))
+
+
+_recorder = None
+_recorder_pid = None
+
+
+def recorder():
+    """The process's Recorder, configured from the environment on first use
+
+    Forked pool workers get their own (the parent's totals are not theirs).
+    """
+    global _recorder, _recorder_pid
+    if _recorder is None or _recorder_pid != os.getpid():
+        _recorder = Recorder(os.environ.get(TRACE_ENV))
+        _recorder_pid = os.getpid()
+        if os.environ.get(METRICS_ENV):
+            atexit.register(write_prometheus, os.environ[METRICS_ENV])
+    return _recorder
+
+
+class span:
+    """Context manager that times a stage and records it on exit"""
+
+    def __init__(self, name, **labels):
+        self.span = Span(name, {key: str(value) for key, value in labels.items()})
+
+    def __enter__(self):
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        self.span.started = time.time()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.wall = time.perf_counter() - self._wall
+        self.span.cpu = time.process_time() - self._cpu
+        if exc_type is not None:
+            self.span.error = exc_type.__name__
+        recorder().add(self.span.record())
+        return False
+
+
+def timed(name=None, **labels):
+    """Decorator form of span(); the span is named after the function by default"""
+    def decorate(func):
+        span_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def prometheus_text(totals=None):
+    """Render aggregated spans in the Prometheus text exposition format"""
+    totals = recorder().totals if totals is None else totals
+    metrics = (
+        ('count_total', 'counter', 'count', "Spans completed"),
+        ('errors_total', 'counter', 'errors', "Spans that raised"),
+        ('seconds_total', 'counter', 'wall_s', "Wall-clock seconds spent in spans"),
+        ('cpu_seconds_total', 'counter', 'cpu_s', "CPU seconds spent in spans"),
+        ('bytes_in_total', 'counter', 'bytes_in', "Bytes read by spans"),
+        ('bytes_out_total', 'counter', 'bytes_out', "Bytes written by spans"),
+        ('peak_rss_bytes', 'gauge', 'peak_rss_bytes', "Peak RSS seen at the end of a span"),
+    )
+    lines = []
+    for suffix, kind, field, help_text in metrics:
+        metric = f"{METRIC_PREFIX}_{suffix}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for (name, labels), values in sorted(totals.items()):
+            label_text = ','.join(f'{key}="{_escape(value)}"' for key, value in (('span', name),) + labels)
+            lines.append(f"{metric}{{{label_text}}} {values[field]:g}")
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path):
+    """Write this process's aggregated spans as Prometheus text"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, path)
+
+
+def load_trace(path):
+    """Aggregate a JSON-lines trace (from any number of processes) into totals"""
+    aggregate = Recorder()
+    with open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                aggregate.add(json.loads(line))
+    return aggregate.totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise span traces")
+    parser.add_argument('command', choices=('summary', 'prometheus'))
+    parser.add_argument('trace', help="JSON-lines trace written with LHB_TRACE")
+    args = parser.parse_args()
+
+    totals = load_trace(args.trace)
+    if args.command == 'prometheus':
+        sys.stdout.write(prometheus_text(totals))
+        return
+    print(f"{'span':32s} {'count':>6s} {'wall s':>9s} {'cpu s':>9s} {'MB in':>9s} {'MB out':>9s} {'peak MB':>8s}")
+    for (name, labels), t in sorted(totals.items(), key=lambda item: -item[1]['wall_s']):
+        label = name + (f" [{', '.join(f'{k}={v}' for k, v in labels)}]" if labels else '')
+        print(f"{label[:32]:32s} {t['count']:6d} {t['wall_s']:9.3f} {t['cpu_s']:9.3f} "
+              f"{t['bytes_in'] / 1e6:9.2f} {t['bytes_out'] / 1e6:9.2f} {t['peak_rss_bytes'] / 2**20:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+
+"""
+Compact storage for the binary inpainting masks
+All masks of one pose (pose01_head_mask.png, pose01_clothing_dress.png, ...)
+are packed into a single <pose>.masks container next to them. Each mask
+keeps only its bounding box, stored either bit-packed (one bit per pixel,
+rows padded to a byte) or as run lengths, whichever is smaller. The file is:
+
+    b'LHBMASK1' | uint64 header length | JSON header | blobs
+
+with every blob aligned to 64 bytes, so MaskStore can memory-map the file
+and decode a mask's region straight from the mapping. The PNGs stay the
+masters (ComfyUI loads them); the container is for Python-side compositing
+and inpaint preparation, which only need the covered region.
+
+    python scripts/mask_store.py pack assets/masks
+    python scripts/mask_store.py info assets/masks/pose01.masks
+"""
+
+from collections import defaultdict
+from PIL import Image
+import argparse
+import glob
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import numpy as np
+from instrumentation import span
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MASK_DIR = os.path.join(SCRIPT_DIR, '../assets/masks')
+MAGIC = b'LHBMASK1'
+VERSION = 1
+ALIGN = 64
+# Pixels above this (alpha, or luminance for opaque masks) are covered
+THRESHOLD = 127
+MASK_FILE = re.compile(r'^(pose\d+)_(.+)\.png$')
+
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def load_mask(path, threshold=THRESHOLD):
+    """Decode a mask PNG into a boolean array
+
+    Masks with real transparency are read from alpha, otherwise from
+    luminance (white = covered).
+    """
+    with Image.open(path) as img:
+        if 'A' in img.getbands() or 'transparency' in img.info:
+            alpha = img.convert('RGBA').getchannel('A')
+            if alpha.getextrema()[0] < 255:
+                return np.asarray(alpha) > threshold
+        return np.asarray(img.convert('L')) > threshold
+
+
+def bounding_box(mask):
+    """(left, top, right, bottom) of the covered pixels, or None if empty"""
+    rows = np.flatnonzero(mask.any(axis=1))
+    if not len(rows):
+        return None
+    cols = np.flatnonzero(mask.any(axis=0))
+    return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+
+def encode_runs(region):
+    """Run lengths over the region in row-major order, starting with an uncovered run"""
+    flat = region.ravel()
+    changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    bounds = np.concatenate(([0], changes, [flat.size]))
+    runs = np.diff(bounds)
+    if flat[0]:
+        runs = np.concatenate(([0], runs))
+    return runs.astype('<u4')
+
+
+def decode_runs(runs, shape):
+    values = np.zeros(len(runs), bool)
+    values[1::2] = True
+    return np.repeat(values, runs).reshape(shape)
+
+
+def encode_mask(mask):
+    """(header entry, blob) for one mask; picks the smaller of bits and runs"""
+    bbox = bounding_box(mask)
+    entry = {'bbox': bbox, 'pixels': int(mask.sum()), 'encoding': 'empty'}
+    if bbox is None:
+        return entry, b''
+    left, top, right, bottom = bbox
+    region = mask[top:bottom, left:right]
+    bits = np.packbits(region, axis=1).tobytes()
+    runs = encode_runs(region).tobytes()
+    if len(runs) < len(bits):
+        entry['encoding'] = 'rle'
+        return entry, runs
+    entry['encoding'] = 'bits'
+    return entry, bits
+
+
+def pack_masks(masks, output_path, sources=None):
+    """Write {name: bool array} (all the same size) to one container
+
+    sources maps names to their PNG paths; their stat is stored so pack_dir
+    can tell when the container is stale.
+    """
+    shapes = {mask.shape for mask in masks.values()}
+    if len(shapes) > 1:
+        raise ValueError(f"masks differ in size: {sorted(shapes)}")
+    height, width = shapes.pop() if shapes else (0, 0)
+
+    entries, blobs = {}, []
+    for name, mask in sorted(masks.items()):
+        entry, blob = encode_mask(mask)
+        if sources and name in sources:
+            st = os.stat(sources[name])
+            entry['source'] = [os.path.basename(sources[name]), st.st_size, st.st_mtime_ns]
+        entries[name] = entry
+        blobs.append(blob)
+
+    # Offsets are relative to the data start, so the header can be sized first
+    offset = 0
+    for entry, blob in zip(entries.values(), blobs):
+        entry['offset'], entry['length'] = offset, len(blob)
+        offset = _aligned(offset + len(blob))
+    header = json.dumps({'version': VERSION, 'width': width, 'height': height, 'masks': entries},
+                        separators=(',', ':')).encode('utf-8')
+    data_start = _aligned(len(MAGIC) + 8 + len(header))
+
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<Q', len(header)) + header)
+        for entry, blob in zip(entries.values(), blobs):
+            f.seek(data_start + entry['offset'])
+            f.write(blob)
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, output_path)
+    return entries
+
+
+class MaskStore:
+    """Read-only, memory-mapped view of a .masks container
+
+    Regions are decoded on demand from the mapping; nothing is read for
+    masks that are never asked for.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path}: not a mask container")
+        (header_len,) = struct.unpack_from('<Q', self._map, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(self._map[start:start + header_len])
+        if header.get('version') != VERSION:
+            self.close()
+            raise ValueError(f"{path}: unsupported version {header.get('version')}")
+        self.width, self.height = header['width'], header['height']
+        self.masks = header['masks']
+        self._data = _aligned(start + header_len)
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def names(self):
+        return list(self.masks)
+
+    def bbox(self, name):
+        """(left, top, right, bottom) of the covered area, or None if empty"""
+        bbox = self.masks[name]['bbox']
+        return tuple(bbox) if bbox else None
+
+    def region(self, name):
+        """Boolean array covering just the mask's bounding box (None if empty)"""
+        entry = self.masks[name]
+        if entry['encoding'] == 'empty':
+            return None
+        left, top, right, bottom = entry['bbox']
+        shape = (bottom - top, right - left)
+        start = self._data + entry['offset']
+        if entry['encoding'] == 'rle':
+            runs = np.frombuffer(self._map, '<u4', entry['length'] // 4, start)
+            return decode_runs(runs, shape)
+        rows = np.frombuffer(self._map, np.uint8, entry['length'], start).reshape(shape[0], -1)
+        return np.unpackbits(rows, axis=1, count=shape[1]).view(bool)
+
+    def mask(self, name):
+        """Full-frame boolean array"""
+        full = np.zeros((self.height, self.width), bool)
+        region = self.region(name)
+        if region is not None:
+            left, top, right, bottom = self.masks[name]['bbox']
+            full[top:bottom, left:right] = region
+        return full
+
+    def region_image(self, name):
+        """(mode 'L' image of the bbox region, (left, top)) for Image.paste(..., mask=)"""
+        region = self.region(name)
+        if region is None:
+            return None, None
+        left, top = self.masks[name]['bbox'][:2]
+        return Image.fromarray(region.view(np.uint8) * 255, 'L'), (left, top)
+
+    def image(self, name):
+        """Full-frame mode 'L' mask image (white = covered), as the PNG would decode"""
+        return Image.fromarray(self.mask(name).view(np.uint8) * 255, 'L')
+
+
+def find_pose_masks(mask_dir=MASK_DIR):
+    """{pose: {name: png path}} for every <pose>_<name>.png in mask_dir"""
+    poses = defaultdict(dict)
+    for path in sorted(glob.glob(os.path.join(mask_dir, 'pose*_*.png'))):
+        match = MASK_FILE.match(os.path.basename(path))
+        if match:
+            poses[match.group(1)][match.group(2)] = path
+    return dict(poses)
+
+
+def is_fresh(container, sources):
+    """True if container holds exactly these sources, unchanged"""
+    try:
+        with MaskStore(container) as store:
+            recorded = {name: entry.get('source') for name, entry in store.masks.items()}
+    except (OSError, ValueError):
+        return False
+    if set(recorded) != set(sources):
+        return False
+    for name, path in sources.items():
+        st = os.stat(path)
+        if recorded[name] != [os.path.basename(path), st.st_size, st.st_mtime_ns]:
+            return False
+    return True
+
+
+def pack_dir(mask_dir=MASK_DIR, force=False, threshold=THRESHOLD):
+    """Pack each pose's mask PNGs into <mask_dir>/<pose>.masks
+
+    Yields (pose, container path, entries or None when up to date).
+    """
+    for pose, sources in find_pose_masks(mask_dir).items():
+        container = os.path.join(mask_dir, f"{pose}.masks")
+        if not force and is_fresh(container, sources):
+            yield pose, container, None
+            continue
+        with span('decode', tool='mask_store') as s:
+            s.bytes_in = sum(os.path.getsize(path) for path in sources.values())
+            masks = {name: load_mask(path, threshold) for name, path in sources.items()}
+        with span('encode', tool='mask_store') as s:
+            entries = pack_masks(masks, container, sources)
+            s.bytes_out = os.path.getsize(container)
+        yield pose, container, entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack and inspect bit-packed mask containers")
+    commands = parser.add_subparsers(dest='command', required=True)
+    pack = commands.add_parser('pack', help="pack <pose>_*.png masks into <pose>.masks")
+    pack.add_argument('mask_dir', nargs='?', default=MASK_DIR)
+    pack.add_argument('--force', action='store_true', help="repack even if up to date")
+    pack.add_argument('--threshold', type=int, default=THRESHOLD)
+    info = commands.add_parser('info', help="list the masks in a container")
+    info.add_argument('container')
+    extract = commands.add_parser('extract', help="write one mask back out as a PNG")
+    extract.add_argument('container')
+    extract.add_argument('name')
+    extract.add_argument('-o', '--output', required=True)
+    args = parser.parse_args()
+
+    if args.command == 'pack':
+        if not os.path.isdir(args.mask_dir):
+            print(f"✗ Mask directory not found: {args.mask_dir}")
+            sys.exit(1)
+        found = 0
+        for pose, container, entries in pack_dir(args.mask_dir, args.force, args.threshold):
+            found += 1
+            if entries is None:
+                print(f"↷ Up to date: {os.path.basename(container)}")
+                continue
+            png_bytes = sum(entry['source'][1] for entry in entries.values())
+            print(f"✓ {os.path.basename(container)}: {len(entries)} masks, "
+                  f"{png_bytes:,} bytes of PNG → {os.path.getsize(container):,} bytes")
+        if not found:
+            print(f"⚠ No <pose>_<name>.png masks in {args.mask_dir}")
+    elif args.command == 'info':
+        with MaskStore(args.container) as store:
+            print(f"{args.container}: {store.width}x{store.height}, {len(store.masks)} masks")
+            for name, entry in store.masks.items():
+                bbox = 'empty' if entry['bbox'] is None else 'bbox ' + ','.join(map(str, entry['bbox']))
+                print(f"  {name:24s} {entry['encoding']:5s} {entry['length']:>9,} bytes  "
+                      f"{entry['pixels']:>9,} px  {bbox}")
+    else:
+        with MaskStore(args.container) as store:
+            store.image(args.name).save(args.output, 'PNG')
+        print(f"✓ Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
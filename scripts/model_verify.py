@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+
+"""
+Fast integrity checks for .safetensors model files
+The quick check reads only the JSON header (8-byte length + JSON) and checks
+every tensor's dtype, shape and byte range against the file size, which
+catches truncated or corrupted downloads without reading gigabytes. The deep
+check hashes the file in parallel chunks over a memory map. Results are
+cached in .cache/model-digests.json keyed on (inode, size, mtime), so a
+repeat check of an unchanged file costs one stat().
+
+    python scripts/model_verify.py assets/models/**/*.safetensors [--deep]
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.normpath(os.path.join(SCRIPT_DIR, '../.cache/model-digests.json'))
+# Headers are a few hundred KB even for SDXL; anything near this is corrupt
+MAX_HEADER_BYTES = 100 * 1024 * 1024
+HASH_CHUNK = 64 * 1024 * 1024
+HASH_WORKERS = min(8, os.cpu_count() or 1)
+DTYPE_SIZES = {
+    'BOOL': 1, 'U8': 1, 'I8': 1, 'F8_E4M3': 1, 'F8_E5M2': 1,
+    'U16': 2, 'I16': 2, 'F16': 2, 'BF16': 2,
+    'U32': 4, 'I32': 4, 'F32': 4,
+    'U64': 8, 'I64': 8, 'F64': 8,
+}
+
+
+def _is_count(value):
+    # JSON true/false load as bool, which is an int subclass
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def check_header(path):
+    """Validate a safetensors header against the file size
+
+    Returns {'size', 'tensors', 'dtypes': {dtype: count}, 'problems': [...]}.
+    """
+    size = os.path.getsize(path)
+    result = {'size': size, 'tensors': 0, 'dtypes': {}, 'problems': []}
+    problems = result['problems']
+    with open(path, 'rb') as f:
+        prefix = f.read(8)
+        if len(prefix) < 8:
+            problems.append("file is shorter than the 8-byte header length")
+            return result
+        (header_len,) = struct.unpack('<Q', prefix)
+        if header_len > min(MAX_HEADER_BYTES, size - 8):
+            problems.append(f"header length {header_len:,} does not fit in a {size:,} byte file")
+            return result
+        try:
+            header = json.loads(f.read(header_len))
+        except ValueError as e:
+            problems.append(f"header is not valid JSON: {e}")
+            return result
+    if not isinstance(header, dict):
+        problems.append("header is not a JSON object")
+        return result
+
+    data_bytes = size - 8 - header_len
+    ranges = []
+    for name, info in header.items():
+        if name == '__metadata__':
+            continue
+        try:
+            dtype, shape, (begin, end) = info['dtype'], info['shape'], info['data_offsets']
+            if not (isinstance(dtype, str) and isinstance(shape, list)
+                    and all(_is_count(value) for value in shape + [begin, end])):
+                raise ValueError
+        except (KeyError, TypeError, ValueError):
+            problems.append(f"{name}: malformed tensor entry")
+            continue
+        if dtype not in DTYPE_SIZES:
+            problems.append(f"{name}: unknown dtype {dtype!r}")
+            continue
+        count = 1
+        for dim in shape:
+            count *= dim
+        if end - begin != count * DTYPE_SIZES[dtype]:
+            problems.append(f"{name}: {dtype}{shape} needs {count * DTYPE_SIZES[dtype]:,} bytes, "
+                            f"offsets give {end - begin:,}")
+        if not 0 <= begin <= end <= data_bytes:
+            problems.append(f"{name}: bytes {begin:,}-{end:,} are past the end of the data "
+                            f"({data_bytes:,} bytes, file truncated?)")
+        result['dtypes'][dtype] = result['dtypes'].get(dtype, 0) + 1
+        result['tensors'] += 1
+        ranges.append((begin, end, name))
+
+    ranges.sort()
+    position = 0
+    for begin, end, name in ranges:
+        if begin < position:
+            problems.append(f"{name}: overlaps the previous tensor")
+        elif begin > position:
+            problems.append(f"{name}: {begin - position:,} unused bytes before it")
+        position = max(position, end)
+    if not problems and position != data_bytes:
+        problems.append(f"{data_bytes - position:,} trailing bytes after the last tensor")
+    return result
+
+
+def chunk_digest(path, chunk_size=HASH_CHUNK, workers=HASH_WORKERS):
+    """SHA-256 of the file's chunk digests, hashed in parallel over mmap
+
+    hashlib releases the GIL on large buffers, so threads hash chunks
+    concurrently without copying them out of the page cache. The result is
+    tagged with the chunk size, since it differs from a plain SHA-256.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return f"sha256-chunks:{chunk_size}:{hashlib.sha256().hexdigest()}"
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            def digest(offset):
+                return hashlib.sha256(view[offset:offset + chunk_size]).digest()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(digest, range(0, size, chunk_size)))
+        finally:
+            view.release()
+    return f"sha256-chunks:{chunk_size}:{hashlib.sha256(b''.join(parts)).hexdigest()}"
+
+
+class DigestCache:
+    """Check results keyed on (inode, size, mtime) so unchanged files are not re-read"""
+
+    def __init__(self, cache_path=CACHE_PATH):
+        self.cache_path = cache_path
+        self.entries = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+        try:
+            with open(cache_path, 'r') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def stamp(path):
+        st = os.stat(path)
+        return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+    def get(self, path):
+        """Cached entry for path if the file is unchanged, else None"""
+        with self._lock:
+            entry = self.entries.get(os.path.abspath(path))
+        if entry and entry['stat'] == self.stamp(path):
+            return entry
+        return None
+
+    def put(self, path, stamp, **fields):
+        with self._lock:
+            key = os.path.abspath(path)
+            entry = self.entries.get(key)
+            if not entry or entry['stat'] != stamp:
+                entry = self.entries[key] = {'stat': stamp}
+            entry.update(fields)
+            self.dirty = True
+
+    def save(self):
+        """Write the cache atomically if anything changed"""
+        with self._lock:
+            if not self.dirty or not self.cache_path:
+                return
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f, separators=(',', ':'))
+            os.replace(tmp_path, self.cache_path)
+            self.dirty = False
+
+
+def verify_model(path, deep=False, cache=None, expected_digest=None):
+    """Check one model file
+
+    Returns {'path', 'ok', 'size', 'tensors', 'dtypes', 'problems', 'digest',
+    'cached'}; a missing file is reported as a problem rather than raised.
+    """
+    result = {'path': path, 'ok': False, 'size': 0, 'tensors': 0, 'dtypes': {},
+              'problems': [], 'digest': None, 'cached': False}
+    try:
+        stamp = DigestCache.stamp(path)
+    except OSError:
+        result['problems'].append("missing")
+        return result
+
+    entry = cache.get(path) if cache is not None else None
+    if entry and 'header' in entry and (not deep or entry.get('digest')):
+        result.update(entry['header'], digest=entry.get('digest'), cached=True)
+    else:
+        header = check_header(path)
+        result.update(header)
+        if deep and not header['problems']:
+            result['digest'] = chunk_digest(path)
+        # Only cache results taken from a file that did not change meanwhile
+        if cache is not None and DigestCache.stamp(path) == stamp:
+            fields = {'header': header}
+            if result['digest']:
+                fields['digest'] = result['digest']
+            cache.put(path, stamp, **fields)
+
+    if expected_digest and result['digest'] and result['digest'] != expected_digest:
+        result['problems'] = result['problems'] + [f"digest {result['digest']} != expected {expected_digest}"]
+    result['ok'] = not result['problems']
+    return result
+
+
+def describe(result):
+    """One-line summary of a verify_model result"""
+    if result['problems'] == ["missing"]:
+        return "MISSING"
+    if not result['ok']:
+        more = len(result['problems']) - 1
+        return result['problems'][0] + (f" (+{more} more)" if more else "")
+    dtypes = ', '.join(f"{count} {dtype}" for dtype, count in sorted(result['dtypes'].items()))
+    return f"{result['size']:,} bytes, {result['tensors']} tensors ({dtypes})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify .safetensors model files")
+    parser.add_argument('models', nargs='+')
+    parser.add_argument('--deep', action='store_true', help="also hash the whole file (cached)")
+    parser.add_argument('--no-cache', action='store_true', help="ignore and do not update the cache")
+    args = parser.parse_args()
+
+    cache = None if args.no_cache else DigestCache()
+    failed = 0
+    for path in args.models:
+        result = verify_model(path, deep=args.deep, cache=cache)
+        if result['ok']:
+            print(f"✓ {path}: {describe(result)}{' [cached]' if result['cached'] else ''}")
+            if result['digest']:
+                print(f"    {result['digest']}")
+        else:
+            failed += 1
+            print(f"✗ {path}: {describe(result)}")
+            for problem in result['problems'][1:]:
+                print(f"    {problem}")
+    if cache is not None:
+        cache.save()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+
+"""
+Pose preprocessing pipeline: grayscale -> edge map -> annotation
+Each pose is decoded once and every stage runs in memory, so the only disk
+writes are the final artifacts. Poses are spread over a process pool, and
+outputs that the build cache reports as up to date are skipped.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageFont
+import argparse
+import glob
+import os
+import numpy as np
+from build_cache import BuildCache
+from instrumentation import span
+
+# Configuration
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+INPUT_DIR = os.path.join(SCRIPT_DIR, '../assets/poses')
+OUTPUT_DIRS = {
+    'grayscale': os.path.join(SCRIPT_DIR, '../assets/poses/grayscale'),
+    'edges': os.path.join(SCRIPT_DIR, '../assets/poses/edges'),
+    'annotated': os.path.join(SCRIPT_DIR, '../assets/poses/annotated'),
+}
+STAGES = ('grayscale', 'edges', 'annotated')
+POSE_PATTERN = 'pose[0-9]*.png'
+EDGE_THRESHOLD = 50
+EDGE_OPERATORS = ('laplacian', 'sobel', 'scharr')
+EDGE_OPTIONS = {'operator': 'laplacian', 'threshold': EDGE_THRESHOLD, 'dilate': 0}
+FONT_PATH = "/System/Library/Fonts/Arial.ttf"
+ANNOTATION_STYLES = {
+    'character': {'border': 'green', 'title': "COPY THIS CHARACTER", 'title_fill': 'green',
+                  'footer': "SOURCE OF TRUTH", 'footer_fill': 'darkgreen'},
+    'pose': {'border': 'red', 'title': "POSE ONLY - IGNORE CHARACTER", 'title_fill': 'red',
+             'footer': "STRUCTURE ONLY", 'footer_fill': 'darkred'},
+}
+BORDER_WIDTH = 8
+# Full-frame RGBA stamps; a batch normally needs one per style
+STAMP_CACHE_SIZE = 4
+# Bump when a stage's output changes for the same input and parameters
+STAGE_VERSION = 1
+
+
+# ---------------------------------------------------------------------------
+# In-memory stages
+# ---------------------------------------------------------------------------
+
+def to_grayscale(img):
+    """Return a grayscale RGBA copy of img, keeping the alpha channel"""
+    if img.mode == 'RGBA':
+        gray = img.convert('RGB').convert('L')
+        return Image.merge('LA', (gray, img.split()[3])).convert('RGBA')
+    return img.convert('L').convert('RGBA')
+
+
+def _gradient_magnitude(luma, side, centre):
+    """|Gx| + |Gy| over the interior of luma for a 3x3 [side, centre, side] derivative"""
+    h, w = luma.shape
+    rows = [luma[dy:h - 2 + dy] for dy in range(3)]
+    cols = [luma[:, dx:w - 2 + dx] for dx in range(3)]
+
+    gx = np.zeros((h - 2, w - 2), np.int16)
+    gy = np.zeros((h - 2, w - 2), np.int16)
+    term = np.empty((h - 2, w - 2), np.int16)
+    for i, weight in enumerate((side, centre, side)):
+        np.add(gx, np.multiply(rows[i][:, 2:], weight, out=term, dtype=np.int16), out=gx)
+        np.subtract(gx, np.multiply(rows[i][:, :-2], weight, out=term, dtype=np.int16), out=gx)
+        np.add(gy, np.multiply(cols[i][2:], weight, out=term, dtype=np.int16), out=gy)
+        np.subtract(gy, np.multiply(cols[i][:-2], weight, out=term, dtype=np.int16), out=gy)
+    np.abs(gx, out=gx)
+    np.abs(gy, out=gy)
+    return np.add(gx, gy, out=gx)
+
+
+def _laplacian(luma):
+    """8-neighbour Laplacian over the interior of luma, clipped like PIL's FIND_EDGES"""
+    h, w = luma.shape
+    acc = np.multiply(luma[1:-1, 1:-1], 9, dtype=np.int16)
+    for dy in range(3):
+        for dx in range(3):
+            np.subtract(acc, luma[dy:h - 2 + dy, dx:w - 2 + dx], out=acc, dtype=np.int16)
+    return np.clip(acc, 0, 255, out=acc)
+
+
+def _dilate(mask, radius):
+    """Binary dilation of mask by a (2r+1)x(2r+1) square, in place"""
+    for axis in (0, 1):
+        source = mask.copy()
+        for d in range(1, radius + 1):
+            if axis == 0:
+                mask[d:] |= source[:-d]
+                mask[:-d] |= source[d:]
+            else:
+                mask[:, d:] |= source[:, :-d]
+                mask[:, :-d] |= source[:, d:]
+    return mask
+
+
+def edge_kernel(luma, operator='laplacian', threshold=EDGE_THRESHOLD, dilate=0):
+    """Turn a uint8 luminance array into an RGBA edge buffer in one pass
+
+    The response is computed from strided views of luma, so no padded or
+    intermediate image is allocated. As with PIL's FIND_EDGES, the 1px border
+    passes the source value through. Pixels whose response reaches the
+    threshold (optionally dilated by `dilate` pixels) are transparent; every
+    other pixel is opaque black, which is what the original converter wrote.
+
+    The laplacian operator reproduces FIND_EDGES exactly. sobel and scharr
+    return |Gx| + |Gy|, so they need larger thresholds.
+    """
+    if operator not in EDGE_OPERATORS:
+        raise ValueError(f"unknown edge operator: {operator}")
+
+    h, w = luma.shape
+    edges = np.greater_equal(luma, threshold)
+    if h > 2 and w > 2:
+        if operator == 'laplacian':
+            response = _laplacian(luma)
+        elif operator == 'sobel':
+            response = _gradient_magnitude(luma, 1, 2)
+        else:
+            response = _gradient_magnitude(luma, 3, 10)
+        np.greater_equal(response, threshold, out=edges[1:-1, 1:-1])
+    if dilate > 0:
+        _dilate(edges, dilate)
+
+    rgba = np.empty((h, w, 4), np.uint8)
+    np.multiply(edges, 255, out=rgba[..., 0], casting='unsafe')
+    rgba[..., 1] = rgba[..., 0]
+    rgba[..., 2] = rgba[..., 0]
+    np.subtract(255, rgba[..., 0], out=rgba[..., 3])
+    return rgba
+
+
+def to_edge_map(img, threshold=EDGE_THRESHOLD, operator='laplacian', dilate=0):
+    """Return an RGBA edge map of img (see edge_kernel)"""
+    luma = np.asarray(img if img.mode == 'L' else img.convert('L'))
+    return Image.fromarray(edge_kernel(luma, operator, threshold, dilate), 'RGBA')
+
+
+@lru_cache(maxsize=4)
+def load_fonts(font_path=FONT_PATH):
+    """Load the (large, small) annotation fonts once, falling back to the default"""
+    try:
+        return ImageFont.truetype(font_path, 40), ImageFont.truetype(font_path, 24)
+    except OSError:
+        return ImageFont.load_default(), ImageFont.load_default()
+
+
+@lru_cache(maxsize=STAMP_CACHE_SIZE)
+def annotation_stamp(size, border, title, title_fill, footer, footer_fill, font_path=FONT_PATH):
+    """Border plus top and bottom banners for an image size, as a transparent RGBA layer
+
+    Cached per (size, style, font), so a batch of same-size images measures
+    and renders each banner once. Callers must not modify the result.
+    """
+    width, height = size
+    stamp = Image.new('RGBA', size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(stamp)
+    font_large, font_small = load_fonts(font_path)
+
+    # Border (one call; same pixels as BORDER_WIDTH nested 1px outlines)
+    draw.rectangle([0, 0, width - 1, height - 1], outline=border, width=BORDER_WIDTH)
+
+    # Top banner
+    bbox = draw.textbbox((0, 0), title, font=font_large)
+    text_width = bbox[2] - bbox[0]
+    text_x = (width - text_width) // 2
+    text_y = 20
+    padding = 10
+    draw.rectangle([text_x - padding, text_y - padding,
+                    text_x + text_width + padding, text_y + 50 + padding],
+                   fill=title_fill, outline='white', width=2)
+    draw.text((text_x, text_y), title, fill='white', font=font_large)
+
+    # Bottom banner
+    bbox = draw.textbbox((0, 0), footer, font=font_small)
+    footer_width = bbox[2] - bbox[0]
+    footer_x = (width - footer_width) // 2
+    footer_y = height - 40
+    draw.rectangle([footer_x - 5, footer_y - 5,
+                    footer_x + footer_width + 5, footer_y + 30],
+                   fill=footer_fill, outline='white', width=1)
+    draw.text((footer_x, footer_y), footer, fill='white', font=font_small)
+
+    return stamp
+
+
+def _annotate(img, border, title, title_fill, footer, footer_fill):
+    """Composite the cached border and banner stamp over a copy of img"""
+    if img.mode != 'RGBA':
+        img = img.convert('RGBA')
+    return Image.alpha_composite(img, annotation_stamp(img.size, border, title, title_fill,
+                                                       footer, footer_fill))
+
+
+def annotate_character(img):
+    """Mark img as the character to copy from"""
+    return _annotate(img, **ANNOTATION_STYLES['character'])
+
+
+def annotate_pose(img):
+    """Mark img as a pose-only reference"""
+    return _annotate(img, **ANNOTATION_STYLES['pose'])
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+def find_poses(input_dir=INPUT_DIR, pattern=POSE_PATTERN):
+    """Return the sorted pose files in input_dir"""
+    return sorted(glob.glob(os.path.join(input_dir, pattern)))
+
+
+def stage_params(stage, edge_options=None):
+    """Return the parameters that the output of stage depends on"""
+    params = {'version': STAGE_VERSION}
+    if stage == 'edges':
+        params.update(EDGE_OPTIONS, **(edge_options or {}))
+    elif stage in ('annotated', 'character'):
+        style = 'character' if stage == 'character' else 'pose'
+        params.update(ANNOTATION_STYLES[style], font=FONT_PATH)
+    return params
+
+
+def build_file(input_path, output_path, stage, transform, cache=None, edge_options=None):
+    """Write transform(image) for a single file unless the cache says it is fresh
+
+    Returns False when the output was already up to date, True when it was
+    rebuilt. Errors propagate to the caller.
+    """
+    key = None
+    if cache is not None:
+        key = cache.key(input_path, stage, stage_params(stage, edge_options))
+        if cache.is_fresh(output_path, key):
+            return False
+
+    with Image.open(input_path) as img:
+        with span('decode', stage=stage) as s:
+            s.bytes_in = os.path.getsize(input_path)
+            img.load()
+        with span('transform', stage=stage):
+            image = transform(img)
+    with span('encode', stage=stage) as s:
+        image.save(output_path, 'PNG')
+        s.bytes_out = os.path.getsize(output_path)
+
+    if key is not None:
+        cache.record(output_path, key)
+    return True
+
+
+def process_pose(input_path, stages=STAGES, output_dirs=OUTPUT_DIRS, edge_options=None,
+                 strip_rows=None):
+    """Run the requested stages for one pose and write each artifact once
+
+    With strip_rows set, grayscale and edges run in tiled mode (see
+    pose_tiles) so memory stays bounded for print-size images.
+
+    Returns a dict with the pose name, the written paths, the stages skipped
+    as up to date and an error message (None on success). Runs inside pool
+    workers, so it never raises.
+    """
+    name = os.path.basename(input_path)
+    result = {'pose': name, 'outputs': [], 'skipped': [], 'error': None}
+    try:
+        if strip_rows:
+            from pose_tiles import convert_tiled
+            outputs = {stage: os.path.join(output_dirs[stage], name) for stage in stages}
+            with span('tiled', stages='+'.join(stages)) as s:
+                s.bytes_in = os.path.getsize(input_path)
+                result['outputs'] = convert_tiled(input_path, outputs, strip_rows, edge_options,
+                                                  annotate=annotate_pose)
+                s.bytes_out = sum(os.path.getsize(path) for path in result['outputs'])
+            return result
+
+        with Image.open(input_path) as img:
+            with span('decode', stage='pose') as s:
+                s.bytes_in = os.path.getsize(input_path)
+                img.load()
+            with span('transform', stage='grayscale'):
+                gray = to_grayscale(img)
+
+        artifacts = {}
+        if 'grayscale' in stages:
+            artifacts['grayscale'] = gray
+        if 'edges' in stages:
+            with span('transform', stage='edges'):
+                artifacts['edges'] = to_edge_map(gray, **dict(EDGE_OPTIONS, **(edge_options or {})))
+        if 'annotated' in stages:
+            with span('transform', stage='annotated'):
+                artifacts['annotated'] = annotate_pose(gray)
+
+        for stage, image in artifacts.items():
+            output_path = os.path.join(output_dirs[stage], name)
+            with span('encode', stage=stage) as s:
+                image.save(output_path, 'PNG')
+                s.bytes_out = os.path.getsize(output_path)
+            result['outputs'].append(output_path)
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def run_pipeline(input_paths, stages=STAGES, output_dirs=OUTPUT_DIRS,
+                 edge_options=None, workers=None, cache=None, strip_rows=None):
+    """Process every pose in input_paths across a process pool
+
+    With a BuildCache, stages whose output is up to date are skipped and
+    poses with nothing stale never reach the pool. Yields one result dict
+    (see process_pose) per pose as it completes, in input order.
+    """
+    for stage in stages:
+        os.makedirs(output_dirs[stage], exist_ok=True)
+
+    jobs = []
+    for path in input_paths:
+        keys = {}
+        stale = stages
+        if cache is not None:
+            try:
+                keys = {stage: cache.key(path, stage, stage_params(stage, edge_options))
+                        for stage in stages}
+            except OSError:
+                keys = {}
+            name = os.path.basename(path)
+            stale = tuple(stage for stage in stages if not keys or not cache.is_fresh(
+                os.path.join(output_dirs[stage], name), keys[stage]))
+        jobs.append((path, stale, keys))
+
+    def finish(result, stale, keys):
+        result['skipped'] = [stage for stage in stages if stage not in stale]
+        if cache is not None and keys and not result['error']:
+            for stage in stale:
+                cache.record(os.path.join(output_dirs[stage], result['pose']), keys[stage])
+        return result
+
+    def up_to_date(path):
+        return {'pose': os.path.basename(path), 'outputs': [], 'error': None}
+
+    pending = [job for job in jobs if job[1]]
+    try:
+        if workers == 1 or len(pending) <= 1:
+            for path, stale, keys in jobs:
+                result = process_pose(path, stale, output_dirs, edge_options, strip_rows) if stale else up_to_date(path)
+                yield finish(result, stale, keys)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(process_pose, path, stale, output_dirs, edge_options, strip_rows)
+                       if stale else None for path, stale, keys in jobs]
+            for (path, stale, keys), future in zip(jobs, futures):
+                result = future.result() if future else up_to_date(path)
+                yield finish(result, stale, keys)
+    finally:
+        if cache is not None:
+            cache.save()
+
+
+# Annotation style -> (build cache stage, transform)
+ANNOTATORS = {'character': ('character', annotate_character), 'pose': ('annotated', annotate_pose)}
+
+
+def _annotate_file(input_path, output_path, style):
+    """Annotate one file; runs inside pool workers, so it never raises"""
+    stage, transform = ANNOTATORS[style]
+    result = {'pose': os.path.basename(input_path), 'outputs': [], 'skipped': [], 'error': None}
+    try:
+        build_file(input_path, output_path, stage, transform)
+        result['outputs'].append(output_path)
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def annotate_directory(input_dir, output_dir, style='pose', pattern=POSE_PATTERN, cache=None,
+                       workers=None):
+    """Annotate every image in input_dir matching pattern into output_dir
+
+    Each worker renders the stamp once per image size and composites it onto
+    every image. Outputs the build cache reports as up to date are skipped.
+    Yields one result dict (see process_pose) per image, in name order.
+    """
+    stage = ANNOTATORS[style][0]
+    os.makedirs(output_dir, exist_ok=True)
+
+    jobs = []
+    for path in find_poses(input_dir, pattern):
+        output_path = os.path.join(output_dir, os.path.basename(path))
+        key = cache.key(path, stage, stage_params(stage)) if cache is not None else None
+        jobs.append((path, output_path, key, key is not None and cache.is_fresh(output_path, key)))
+
+    def finish(result, output_path, key):
+        if key is not None and not result['error']:
+            cache.record(output_path, key)
+        return result
+
+    def up_to_date(path):
+        return {'pose': os.path.basename(path), 'outputs': [], 'skipped': [stage], 'error': None}
+
+    pending = [job for job in jobs if not job[3]]
+    try:
+        if workers == 1 or len(pending) <= 1:
+            for path, output_path, key, fresh in jobs:
+                yield up_to_date(path) if fresh else finish(_annotate_file(path, output_path, style),
+                                                            output_path, key)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [None if fresh else pool.submit(_annotate_file, path, output_path, style)
+                       for path, output_path, key, fresh in jobs]
+            for (path, output_path, key, fresh), future in zip(jobs, futures):
+                yield up_to_date(path) if fresh else finish(future.result(), output_path, key)
+    finally:
+        if cache is not None:
+            cache.save()
+
+
+def report(results, label):
+    """Print a ✓/✗ line per result and return the number of successes"""
+    done = 0
+    for result in results:
+        if result['error']:
+            print(f"✗ Failed to process {result['pose']}: {result['error']}")
+        elif not result['outputs'] and result.get('skipped'):
+            print(f"↷ Up to date: {result['pose']}")
+            done += 1
+        else:
+            print(f"✓ {label}: {result['pose']}")
+            done += 1
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the pose preprocessing pipeline")
+    parser.add_argument('inputs', nargs='*', help="pose files (default: every pose in --input-dir)")
+    parser.add_argument('--input-dir', default=INPUT_DIR)
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help="comma-separated subset of: " + ', '.join(STAGES))
+    parser.add_argument('--threshold', type=int, default=EDGE_THRESHOLD)
+    parser.add_argument('--operator', choices=EDGE_OPERATORS, default='laplacian')
+    parser.add_argument('--dilate', type=int, default=0, help="grow edges by this many pixels")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="process pool size (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="rebuild outputs even if up to date")
+    parser.add_argument('--strip-rows', type=int, default=None,
+                        help="process in memory-mapped strips of this many rows (bounded memory)")
+    args = parser.parse_args()
+
+    stages = tuple(s for s in args.stages.split(',') if s)
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+
+    inputs = args.inputs or find_poses(args.input_dir)
+    if not inputs:
+        print(f"⚠ No poses found in {args.input_dir}")
+        return
+
+    print(f"Processing {len(inputs)} poses ({' → '.join(stages)})...\n")
+    cache = None if args.force else BuildCache()
+    edge_options = {'operator': args.operator, 'threshold': args.threshold, 'dilate': args.dilate}
+    done = report(run_pipeline(inputs, stages, edge_options=edge_options,
+                               workers=args.workers, cache=cache, strip_rows=args.strip_rows),
+                  "Processed")
+
+    print(f"\n✓ Done! Processed {done}/{len(inputs)} poses")
+    for stage in stages:
+        print(f"   {stage}: {OUTPUT_DIRS[stage]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+
+"""
+Tiled grayscale / edge conversion for print-resolution images
+Pixels live in .npy scratch buffers on disk and every stage reads and
+writes them one horizontal strip at a time with plain file I/O, so peak
+memory depends on the strip height rather than the image size. PNGs are
+decoded from, and encoded to, the compressed stream strip by strip as well.
+Edge strips carry halo rows so results match the whole-image kernel.
+"""
+
+from PIL import Image
+import io
+import os
+import shutil
+import struct
+import tempfile
+import zlib
+import numpy as np
+from pose_pipeline import EDGE_OPTIONS, annotate_pose, edge_kernel
+
+STRIP_ROWS = 256
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# 8-bit PNG colour types whose decoded rows PIL returns in PNG sample layout
+# (L, RGB, P, LA, RGBA) -> bytes per pixel
+STREAMED_COLOR_TYPES = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+READ_CHUNK = 1 << 16
+# Rows filtered at once when encoding (the filters need ~14 int16 copies)
+FILTER_ROWS = 32
+
+
+def _strips(height, strip_rows):
+    for y0 in range(0, height, strip_rows):
+        yield y0, min(height, y0 + strip_rows)
+
+
+def _create_raw(raw_path, shape):
+    """Create an uninitialised uint8 .npy buffer; returns the data offset
+
+    open_memmap writes the header and sizes a sparse file; no pixel page is
+    touched, the pixels are written afterwards with plain writes.
+    """
+    return np.lib.format.open_memmap(raw_path, mode='w+', dtype=np.uint8, shape=shape).offset
+
+
+def _raw_layout(raw_path):
+    """(shape, data offset) of a .npy buffer, read from its header"""
+    raw = np.load(raw_path, mmap_mode='r')
+    return raw.shape, raw.offset
+
+
+def _read_rows(raw_path, shape, offset, y0, y1):
+    """Rows y0:y1 of a .npy buffer as a fresh array (a read, not a mapping)"""
+    row = int(np.prod(shape[1:]))
+    data = np.fromfile(raw_path, np.uint8, (y1 - y0) * row, offset=offset + y0 * row)
+    return data.reshape((y1 - y0,) + tuple(shape[1:]))
+
+
+def _luma(rgba):
+    """ITU-R 601-2 luma with PIL's integer rounding, so it matches convert('L')"""
+    acc = rgba[..., 0] * np.uint32(19595)
+    acc += rgba[..., 1] * np.uint32(38470)
+    acc += rgba[..., 2] * np.uint32(7471)
+    acc += 0x8000
+    acc >>= 16
+    return acc.astype(np.uint8)
+
+
+def _chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def _read_png_header(f):
+    """Read a PNG up to its first IDAT
+
+    Returns (width, height, colour type, ancillary chunks as bytes, first
+    IDAT length) if the image can be decoded row by row (non-interlaced,
+    8-bit, see STREAMED_COLOR_TYPES), otherwise None. Ancillary chunks
+    (PLTE, tRNS, gAMA, ...) are passed on to the strip decoder.
+    """
+    if f.read(len(PNG_SIGNATURE)) != PNG_SIGNATURE:
+        return None
+    length, kind = struct.unpack('>I4s', f.read(8))
+    if kind != b'IHDR':
+        return None
+    width, height, depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', f.read(length))
+    f.read(4)
+    if depth != 8 or interlace or color_type not in STREAMED_COLOR_TYPES:
+        return None
+    ancillary = []
+    while True:
+        length, kind = struct.unpack('>I4s', f.read(8))
+        if kind == b'IDAT':
+            return width, height, color_type, b''.join(ancillary), length
+        if kind == b'IEND':
+            raise ValueError("PNG has no image data")
+        ancillary.append(_chunk(kind, f.read(length)))
+        f.read(4)
+
+
+def _scanlines(f, idat_length, stride, height, strip_rows):
+    """Yield the filtered scanlines of consecutive strips, inflating only what each needs"""
+    inflate = zlib.decompressobj()
+    remaining = idat_length
+    for y0, y1 in _strips(height, strip_rows):
+        need = (y1 - y0) * stride
+        data = bytearray()
+        while len(data) < need:
+            compressed = inflate.unconsumed_tail
+            if not compressed:
+                while not remaining:
+                    f.read(4)
+                    remaining, kind = struct.unpack('>I4s', f.read(8))
+                    if kind != b'IDAT':
+                        raise ValueError("PNG image data is truncated")
+                compressed = f.read(min(remaining, READ_CHUNK))
+                if not compressed:
+                    raise ValueError("PNG image data is truncated")
+                remaining -= len(compressed)
+            data += inflate.decompress(compressed, need - len(data))
+        yield data
+
+
+def _png_strips(f, width, height, color_type, ancillary, idat_length, strip_rows):
+    """Decode a non-interlaced 8-bit PNG one strip at a time; yields PIL images
+
+    Each strip's scanlines are wrapped in a small PNG of their own so PIL's
+    decoder does the unfiltering. Filters reach one row up, so every strip
+    but the first is prefixed with the previous strip's last row, already
+    unfiltered (filter type 0), and that row is dropped after decoding.
+    """
+    stride = 1 + width * STREAMED_COLOR_TYPES[color_type]
+    previous = b''
+    for data in _scanlines(f, idat_length, stride, height, strip_rows):
+        first = 1 if previous else 0
+        rows = first + len(data) // stride
+        ihdr = struct.pack('>IIBBBBB', width, rows, 8, color_type, 0, 0, 0)
+        png = (PNG_SIGNATURE + _chunk(b'IHDR', ihdr) + ancillary
+               + _chunk(b'IDAT', zlib.compress(previous + data, 0)) + _chunk(b'IEND', b''))
+        with Image.open(io.BytesIO(png)) as strip:
+            strip.load()
+            previous = b'\x00' + strip.crop((0, rows - 1, width, rows)).tobytes()
+            yield strip.crop((0, first, width, rows))
+
+
+def _image_strips(img, strip_rows):
+    """Fallback for what _png_strips cannot stream: PIL decodes the whole frame"""
+    width, height = img.size
+    for y0, y1 in _strips(height, strip_rows):
+        yield img.crop((0, y0, width, y1))
+
+
+def decode_to_raw(input_path, raw_path, strip_rows=STRIP_ROWS):
+    """Decode an image into a memory-mapped (h, w, 4) RGBA .npy buffer
+
+    Non-interlaced 8-bit PNGs are decoded strip by strip from the compressed
+    stream and appended to the buffer, so only about one strip of pixels is
+    ever in memory. Other images (JPEG,
+    interlaced or 16-bit PNG, ...) are decoded whole by PIL first.
+    Images without an alpha channel get an opaque one, as to_grayscale does.
+    """
+    with open(input_path, 'rb') as f:
+        header = _read_png_header(f)
+        with Image.open(input_path) as img:
+            width, height = img.size
+            has_alpha = img.mode == 'RGBA'
+            offset = _create_raw(raw_path, (height, width, 4))
+            strips = _png_strips(f, *header, strip_rows) if header else _image_strips(img, strip_rows)
+            with open(raw_path, 'r+b') as out:
+                out.seek(offset)
+                for strip in strips:
+                    rgba = np.array(strip.convert('RGBA'))
+                    if not has_alpha:
+                        rgba[..., 3] = 255
+                    out.write(rgba.tobytes())
+    return raw_path
+
+
+def grayscale_tiled(src_path, dst_path, strip_rows=STRIP_ROWS):
+    """Write the grayscale RGBA version of an RGBA .npy buffer strip by strip"""
+    shape, offset = _raw_layout(src_path)
+    dst_offset = _create_raw(dst_path, shape)
+    with open(dst_path, 'r+b') as out:
+        out.seek(dst_offset)
+        for y0, y1 in _strips(shape[0], strip_rows):
+            strip = _read_rows(src_path, shape, offset, y0, y1)
+            gray = _luma(strip)
+            strip[..., 0] = gray
+            strip[..., 1] = gray
+            strip[..., 2] = gray
+            out.write(strip.tobytes())
+    return dst_path
+
+
+def edge_map_tiled(src_path, dst_path, strip_rows=STRIP_ROWS, operator='laplacian',
+                   threshold=EDGE_OPTIONS['threshold'], dilate=0):
+    """Write the edge map of an RGBA .npy buffer strip by strip
+
+    Each strip is widened by 1 + dilate halo rows on both sides, which is
+    exactly how far the 3x3 kernel and the dilation reach, so strip seams
+    are indistinguishable from a whole-image run.
+    """
+    shape, offset = _raw_layout(src_path)
+    height = shape[0]
+    halo = 1 + dilate
+    dst_offset = _create_raw(dst_path, shape[:2] + (4,))
+    with open(dst_path, 'r+b') as out:
+        out.seek(dst_offset)
+        for y0, y1 in _strips(height, strip_rows):
+            top = max(0, y0 - halo)
+            bottom = min(height, y1 + halo)
+            rgba = edge_kernel(_luma(_read_rows(src_path, shape, offset, top, bottom)),
+                               operator, threshold, dilate)
+            out.write(rgba[y0 - top:y1 - top].tobytes())
+    return dst_path
+
+
+def raw_image(raw_path):
+    """Wrap an RGBA .npy buffer as a PIL image without copying the pixels
+
+    The buffer is memory-mapped, so this is for whole-frame work (annotation);
+    the strip stages read rows instead.
+    """
+    raw = np.load(raw_path, mmap_mode='r')
+    height, width = raw.shape[:2]
+    return Image.frombuffer('RGBA', (width, height), raw, 'raw', 'RGBA', 0, 1)
+
+
+def _filter_rows(rows, above, bpp):
+    """PNG-filter a block of rows; returns (n, 1 + stride) scanlines
+
+    above is the unfiltered row before the block (zeros for the first).
+    Every filter is computed from unfiltered neighbours, so all five are
+    vectorised; each row keeps the one with the smallest sum of absolute
+    signed bytes, the usual adaptive heuristic.
+    """
+    x = rows.astype(np.int16)
+    b = np.concatenate((above[None].astype(np.int16), x[:-1]))
+    a = np.zeros_like(x)
+    a[:, bpp:] = x[:, :-bpp]
+    c = np.zeros_like(x)
+    c[:, bpp:] = b[:, :-bpp]
+    p = a + b - c
+    pa, pb, pc = np.abs(p - a), np.abs(p - b), np.abs(p - c)
+    paeth = np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+    candidates = np.stack((x, x - a, x - b, x - (a + b) // 2, x - paeth)).astype(np.uint8)
+    cost = np.stack([np.abs(f.view(np.int8).astype(np.int16)).sum(axis=1) for f in candidates])
+    best = cost.argmin(axis=0)
+    lines = np.empty((len(rows), 1 + rows.shape[1]), np.uint8)
+    lines[:, 0] = best
+    lines[:, 1:] = candidates[best, np.arange(len(rows))]
+    return lines
+
+
+def encode_png(raw_path, output_path, strip_rows=STRIP_ROWS, compress_level=6):
+    """Encode an RGBA .npy buffer to an RGBA PNG strip by strip
+
+    Rows are filtered and deflated as they are read, so only one strip is
+    in memory; the pixels decode exactly as PIL's encoder would write them.
+    """
+    shape, offset = _raw_layout(raw_path)
+    height, width = shape[:2]
+    deflate = zlib.compressobj(compress_level)
+    above = np.zeros(width * 4, np.uint8)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as out:
+        out.write(PNG_SIGNATURE + _chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)))
+        for y0, y1 in _strips(height, strip_rows):
+            rows = _read_rows(raw_path, shape, offset, y0, y1).reshape(y1 - y0, width * 4)
+            for r0 in range(0, len(rows), FILTER_ROWS):
+                block = rows[r0:r0 + FILTER_ROWS]
+                data = deflate.compress(_filter_rows(block, above, 4).tobytes())
+                if data:
+                    out.write(_chunk(b'IDAT', data))
+                above = block[-1]
+        out.write(_chunk(b'IDAT', deflate.flush()) + _chunk(b'IEND', b''))
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def convert_tiled(input_path, outputs, strip_rows=STRIP_ROWS, edge_options=None,
+                  annotate=annotate_pose, work_dir=None):
+    """Run the pose stages for one image in tiled mode
+
+    outputs maps 'grayscale' / 'edges' / 'annotated' to PNG paths. The raw
+    buffers go to work_dir (a temporary directory by default) and are
+    removed afterwards. Annotation (annotate_pose unless another callable
+    is given) needs the whole frame, so it is handed the memory-mapped
+    grayscale image and is not strip-bounded.
+    Returns the written paths.
+    """
+    options = dict(EDGE_OPTIONS, **(edge_options or {}))
+    scratch = tempfile.mkdtemp(prefix='pose-tiles-', dir=work_dir)
+    try:
+        source = decode_to_raw(input_path, os.path.join(scratch, 'source.npy'), strip_rows)
+        gray = grayscale_tiled(source, os.path.join(scratch, 'gray.npy'), strip_rows)
+        os.remove(source)
+
+        written = []
+        if 'grayscale' in outputs:
+            written.append(encode_png(gray, outputs['grayscale'], strip_rows))
+        if 'edges' in outputs:
+            edges = edge_map_tiled(gray, os.path.join(scratch, 'edges.npy'), strip_rows, **options)
+            written.append(encode_png(edges, outputs['edges'], strip_rows))
+        if 'annotated' in outputs:
+            annotate(raw_image(gray)).save(outputs['annotated'], 'PNG')
+            written.append(outputs['annotated'])
+        return written
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
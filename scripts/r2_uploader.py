@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+
+"""
+Shared R2 uploader
+One pooled S3 client and a bounded thread pool of transfers. Large files use
+multipart uploads, and objects whose bytes are unchanged since the last
+upload are skipped (local ETag manifest, optionally confirmed with HEAD).
+upload_bytes() takes an in-memory body, so generated assets need no temp file.
+
+Credentials come from R2_ENDPOINT / R2_ACCESS_KEY / R2_SECRET_KEY. Point
+R2_ENDPOINT at a local S3-compatible server (MinIO, moto) to test.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import threading
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from instrumentation import span
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.normpath(os.path.join(SCRIPT_DIR, '../.cache/r2-manifest.json'))
+BUCKET = 'little-hero-assets'
+MAX_WORKERS = 8
+# Book PDFs and print backgrounds cross this; pose PNGs do not
+MULTIPART_THRESHOLD = 16 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 16 * 1024 * 1024
+
+
+def local_etag(path, chunksize=MULTIPART_CHUNKSIZE, threshold=MULTIPART_THRESHOLD):
+    """Return the ETag S3 will report for path when uploaded with these settings
+
+    Single-part uploads get the hex MD5 of the body; multipart uploads get the
+    MD5 of the concatenated part digests followed by "-<part count>".
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        if size < threshold:
+            digest = hashlib.md5()
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+            return digest.hexdigest()
+        parts = [hashlib.md5(chunk).digest() for chunk in iter(lambda: f.read(chunksize), b'')]
+    return f"{hashlib.md5(b''.join(parts)).hexdigest()}-{len(parts)}"
+
+
+def bytes_etag(data, chunksize=MULTIPART_CHUNKSIZE, threshold=MULTIPART_THRESHOLD):
+    """local_etag() for an in-memory body"""
+    view = memoryview(data)
+    if len(view) < threshold:
+        return hashlib.md5(view).hexdigest()
+    parts = [hashlib.md5(view[offset:offset + chunksize]).digest()
+             for offset in range(0, len(view), chunksize)]
+    return f"{hashlib.md5(b''.join(parts)).hexdigest()}-{len(parts)}"
+
+
+class R2Uploader:
+    """Upload files to one bucket over a single pooled client
+
+    The boto3 client is thread-safe and shares its connection pool across
+    transfers, so TLS sessions are reused instead of renegotiated per file.
+    """
+
+    def __init__(self, bucket=BUCKET, endpoint_url=None, access_key=None, secret_key=None,
+                 max_workers=MAX_WORKERS, manifest_path=MANIFEST_PATH, verify_remote=False,
+                 client=None):
+        self.bucket = bucket
+        self.max_workers = max_workers
+        self.verify_remote = verify_remote
+        self.manifest_path = manifest_path
+        self.client = client or boto3.client(
+            's3',
+            endpoint_url=endpoint_url or os.environ.get('R2_ENDPOINT'),
+            aws_access_key_id=access_key or os.environ.get('R2_ACCESS_KEY'),
+            aws_secret_access_key=secret_key or os.environ.get('R2_SECRET_KEY'),
+            region_name='auto',
+            config=Config(max_pool_connections=max_workers * 2,
+                          retries={'max_attempts': 5, 'mode': 'standard'}),
+        )
+        self.transfer_config = TransferConfig(multipart_threshold=MULTIPART_THRESHOLD,
+                                              multipart_chunksize=MULTIPART_CHUNKSIZE,
+                                              max_concurrency=4)
+        self._lock = threading.Lock()
+        self.manifest = {}
+        if manifest_path:
+            try:
+                with open(manifest_path, 'r') as f:
+                    self.manifest = json.load(f)
+            except (OSError, ValueError):
+                pass
+
+    def _manifest_key(self, object_key):
+        return f"{self.bucket}/{object_key}"
+
+    def _local_etag(self, path):
+        """ETag of path, memoised on (size, mtime) through the manifest"""
+        st = os.stat(path)
+        with self._lock:
+            memo = self.manifest.get('files', {}).get(os.path.abspath(path))
+        if memo and memo[:2] == [st.st_size, st.st_mtime_ns]:
+            return memo[2]
+        etag = local_etag(path)
+        with self._lock:
+            self.manifest.setdefault('files', {})[os.path.abspath(path)] = \
+                [st.st_size, st.st_mtime_ns, etag]
+        return etag
+
+    def _remote_etag(self, object_key):
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=object_key)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+        return head['ETag'].strip('"')
+
+    def _is_current(self, object_key, etag):
+        if self.verify_remote:
+            return self._remote_etag(object_key) == etag
+        with self._lock:
+            return self.manifest.get('objects', {}).get(self._manifest_key(object_key)) == etag
+
+    def _record(self, object_key, etag):
+        with self._lock:
+            self.manifest.setdefault('objects', {})[self._manifest_key(object_key)] = etag
+
+    def is_unchanged(self, file_path, object_key):
+        """True if the object already holds exactly these bytes"""
+        return self._is_current(object_key, self._local_etag(file_path))
+
+    def upload(self, file_path, object_key, content_type=None, force=False):
+        """Upload one file; returns 'uploaded' or 'skipped', raises on failure"""
+        if not force and self.is_unchanged(file_path, object_key):
+            return 'skipped'
+
+        content_type = content_type or mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+        with span('upload', bucket=self.bucket) as s:
+            s.bytes_in = os.path.getsize(file_path)
+            self.client.upload_file(file_path, self.bucket, object_key,
+                                    ExtraArgs={'ContentType': content_type},
+                                    Config=self.transfer_config)
+        self._record(object_key, self._local_etag(file_path))
+        return 'uploaded'
+
+    def upload_bytes(self, data, object_key, content_type=None, force=False):
+        """Upload an in-memory body (bytes or BytesIO) without a temp file
+
+        Skips unchanged content like upload(); returns 'uploaded' or
+        'skipped', raises on failure.
+        """
+        body = data if isinstance(data, io.BytesIO) else io.BytesIO(data)
+        buffer = body.getbuffer()
+        try:
+            etag = bytes_etag(buffer)
+            size = len(buffer)
+        finally:
+            buffer.release()
+        if not force and self._is_current(object_key, etag):
+            return 'skipped'
+
+        content_type = content_type or mimetypes.guess_type(object_key)[0] or 'application/octet-stream'
+        body.seek(0)
+        with span('upload', bucket=self.bucket) as s:
+            s.bytes_in = size
+            self.client.upload_fileobj(body, self.bucket, object_key,
+                                       ExtraArgs={'ContentType': content_type},
+                                       Config=self.transfer_config)
+        self._record(object_key, etag)
+        return 'uploaded'
+
+    def upload_many(self, items, force=False):
+        """Upload (file_path, object_key) pairs concurrently
+
+        Yields (object_key, status, error) in input order, where status is
+        'uploaded', 'skipped' or 'failed'. The manifest is saved at the end.
+        """
+        def run(item):
+            file_path, object_key = item
+            try:
+                return object_key, self.upload(file_path, object_key, force=force), None
+            except Exception as e:
+                return object_key, 'failed', e
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                yield from pool.map(run, items)
+        finally:
+            self.save()
+
+    def save(self):
+        """Persist the ETag manifest"""
+        if not self.manifest_path:
+            return
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with self._lock:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.manifest, f, separators=(',', ':'))
+        os.replace(tmp_path, self.manifest_path)
+
+
+def report(results):
+    """Print a ✓/↷/✗ line per upload result and return the number that are in place"""
+    done = 0
+    for object_key, status, error in results:
+        if status == 'failed':
+            print(f"✗ Failed to upload {object_key}: {error}")
+            continue
+        print(f"✓ Uploaded: {object_key}" if status == 'uploaded' else f"↷ Unchanged: {object_key}")
+        done += 1
+    return done
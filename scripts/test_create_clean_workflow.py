@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+"""
+Layout of the fanned-out book assembly workflow, run with: python -m pytest scripts
+"""
+
+import importlib.util
+import os
+import pytest
+from workflow_index import validate_workflow
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+spec = importlib.util.spec_from_file_location('create_clean_workflow',
+                                              os.path.join(SCRIPT_DIR, 'create-clean-workflow.py'))
+create_clean_workflow = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(create_clean_workflow)
+
+
+@pytest.mark.parametrize('concurrency', range(2, create_clean_workflow.MAX_LANES + 1))
+def test_fan_out_layout(concurrency):
+    result = create_clean_workflow.fan_out_pages(create_clean_workflow.workflow, concurrency)
+    assert validate_workflow(result) == []
+    positions = {}
+    for node in result['nodes']:
+        position = tuple(node['position'])
+        assert position not in positions, f"{node['name']!r} overlaps {positions[position]!r}"
+        positions[position] = node['name']
+    merge = next(node for node in result['nodes'] if node['name'] == "Merge Page Lanes")
+    assert merge['parameters']['numberInputs'] == concurrency
+
+
+def test_fan_out_shifts_every_downstream_node():
+    original = {node['name']: node['position'] for node in create_clean_workflow.workflow['nodes']}
+    result = {node['name']: node['position']
+              for node in create_clean_workflow.fan_out_pages(create_clean_workflow.workflow, 3)['nodes']}
+    check_x = original["Check All Pages Complete"][0]
+    shifts = {name: result[name][0] - x for name, (x, y) in original.items() if x >= check_x}
+    assert len(shifts) > 1 and len(set(shifts.values())) == 1, shifts
+    assert result["Merge Page Lanes"][0] < result["Check All Pages Complete"][0]
+
+
+def test_concurrency_limits():
+    for concurrency in (1, create_clean_workflow.MAX_LANES + 1):
+        with pytest.raises(ValueError):
+            create_clean_workflow.fan_out_pages(create_clean_workflow.workflow, concurrency)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+"""
+safetensors header checks on corrupt files, run with: python -m pytest scripts
+"""
+
+import json
+import struct
+import pytest
+from model_verify import verify_model
+
+
+def write_model(tmp_path, header, data=b''):
+    path = tmp_path / 'model.safetensors'
+    raw = json.dumps(header).encode('utf-8')
+    path.write_bytes(struct.pack('<Q', len(raw)) + raw + data)
+    return str(path)
+
+
+def test_valid_model(tmp_path):
+    path = write_model(tmp_path, {'__metadata__': {}, 'w': {'dtype': 'F16', 'shape': [2, 3],
+                                                              'data_offsets': [0, 12]}}, bytes(12))
+    result = verify_model(path)
+    assert result['ok'] and result['tensors'] == 1 and result['dtypes'] == {'F16': 1}
+
+
+@pytest.mark.parametrize('entry', [
+    {'dtype': ['F16'], 'shape': [2], 'data_offsets': [0, 4]},
+    {'dtype': 'F16', 'shape': 2, 'data_offsets': [0, 4]},
+    {'dtype': 'F16', 'shape': [2, '3'], 'data_offsets': [0, 4]},
+    {'dtype': 'F16', 'shape': [2, -1], 'data_offsets': [0, 4]},
+    {'dtype': 'F16', 'shape': [True], 'data_offsets': [0, 4]},
+    {'dtype': 'F16', 'shape': [2], 'data_offsets': [0, 4.0]},
+    {'dtype': 'F16', 'shape': [2], 'data_offsets': [0]},
+    {'dtype': 'F16', 'shape': [2], 'data_offsets': None},
+    {'dtype': 'F16', 'shape': [2]},
+    'F16',
+])
+def test_malformed_tensor_entries(tmp_path, entry):
+    result = verify_model(write_model(tmp_path, {'w': entry}, bytes(4)))
+    assert not result['ok']
+    assert result['problems'][0] == "w: malformed tensor entry"
+
+
+def test_unknown_dtype(tmp_path):
+    result = verify_model(write_model(tmp_path, {'w': {'dtype': 'F12', 'shape': [2],
+                                                       'data_offsets': [0, 4]}}, bytes(4)))
+    assert result['problems'][0] == "w: unknown dtype 'F12'"
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+"""
+file_size() lookups through the asset manifest, run with: python -m pytest scripts
+"""
+
+from asset_manifest import AssetManifest
+from verify_setup import file_size
+
+
+def make_tree(tmp_path):
+    """A repo with one asset and one file outside assets/, indexed"""
+    (tmp_path / 'assets/masks').mkdir(parents=True)
+    (tmp_path / 'assets/masks/pose01_head_mask.png').write_bytes(b'm' * 10)
+    (tmp_path / 'docs/planning').mkdir(parents=True)
+    (tmp_path / 'docs/planning/workflow (1).json').write_bytes(b'{}' * 3)
+    manifest = AssetManifest(tmp_path / 'assets', tmp_path / '.cache/manifest.json', base=tmp_path)
+    manifest.refresh()
+    return manifest
+
+
+def test_asset_and_non_asset_files(tmp_path):
+    manifest = make_tree(tmp_path)
+    assert manifest.key('assets/masks/pose01_head_mask.png') == 'masks/pose01_head_mask.png'
+    assert manifest.key('docs/planning/workflow (1).json') is None
+    assert file_size('assets/masks/pose01_head_mask.png', manifest) == 10
+    assert file_size('docs/planning/workflow (1).json', manifest) == 6
+    assert file_size(str(tmp_path / 'docs/planning/workflow (1).json'), manifest) == 6
+
+
+def test_missing_files(tmp_path):
+    manifest = make_tree(tmp_path)
+    assert file_size('assets/masks/pose01_iris_mask.png', manifest) is None
+    assert file_size('docs/planning/missing.json', manifest) is None
+    # Neighbours of the asset root are not inside it
+    (tmp_path / 'assets-old').mkdir()
+    (tmp_path / 'assets-old/x.png').write_bytes(b'x')
+    assert manifest.key('assets-old/x.png') is None
+    assert file_size('assets-old/x.png', manifest) == 1
+
+
+def test_independent_of_working_directory(tmp_path, monkeypatch):
+    manifest = make_tree(tmp_path)
+    monkeypatch.chdir(tmp_path / 'assets')
+    # Would name assets/README.md if taken from the working directory
+    assert manifest.key('README.md') is None
+    assert file_size('assets/masks/pose01_head_mask.png', manifest) == 10
+    assert file_size('docs/planning/workflow (1).json', manifest) == 6
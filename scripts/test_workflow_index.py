@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+"""
+scan_file() on malformed workflow exports, run with: python -m pytest scripts
+"""
+
+import json
+from workflow_index import scan_file
+
+
+def scan(tmp_path, workflow):
+    path = tmp_path / 'workflow.json'
+    path.write_text(json.dumps(workflow))
+    return scan_file(str(path))
+
+
+def node(name, **fields):
+    return dict({'name': name, 'type': 'n8n-nodes-base.code', 'id': name}, **fields)
+
+
+def test_valid_workflow(tmp_path):
+    record = scan(tmp_path, {'nodes': [node('A'), node('B')],
+                             'connections': {'A': {'main': [[{'node': 'B'}], None, []]}}})
+    assert record['problems'] == []
+    assert record['nodes'] == [['A', 'n8n-nodes-base.code', 'A'], ['B', 'n8n-nodes-base.code', 'B']]
+
+
+def test_nodes_without_names(tmp_path):
+    record = scan(tmp_path, {'nodes': [{'type': 'x', 'id': '1'}, {'type': 'x', 'id': '2'},
+                                       node(['not', 'a', 'name'])],
+                             'connections': {}})
+    assert record['problems'] == ["node '#0' has no name", "node '#1' has no name",
+                                  "node #2 name is not a string", "node ['not', 'a', 'name'] id is not a string"]
+
+
+def test_duplicate_names_and_ids(tmp_path):
+    record = scan(tmp_path, {'nodes': [node('A'), node('A', id='B')], 'connections': {}})
+    assert record['problems'] == ["duplicate node name 'A'"]
+    record = scan(tmp_path, {'nodes': [node('A'), node('B', id='A')], 'connections': {}})
+    assert record['problems'] == ["duplicate node id 'A' ('B')"]
+
+
+def test_malformed_connections(tmp_path):
+    record = scan(tmp_path, {'nodes': [node('A'), node('B')],
+                             'connections': {'A': {'main': 5, 'ai': [[{'node': 'B'}], 7, [{'nope': 1}]]},
+                                             'B': ['main'],
+                                             'C': {'main': [[{'node': 'Z'}]]}}})
+    assert record['problems'] == [
+        "connection from unknown node 'C'",
+        "malformed connections for 'A'",
+        "malformed edge 'A' [ai:1]",
+        "malformed edge 'A' [ai:2]",
+        "malformed connections for 'B'",
+        "dangling edge 'C' [main:0] → 'Z'",
+    ]
+
+
+def test_not_a_workflow(tmp_path):
+    assert scan(tmp_path, [1, 2])['problems'] == ["top level is not a JSON object"]
+    assert scan(tmp_path, {'nodes': {}})['problems'] == ["missing 'nodes' list"]
+    assert scan(tmp_path, {'nodes': [], 'connections': []})['problems'] == ["'connections' is not an object"]
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+
+"""
+Trim empty margins from overlays and reference images
+Each image is cropped to the bounding box of its content: the alpha bbox when
+the image has real transparency, otherwise the area that differs from the
+corner (background) colour. Images can also be scaled down so the longer
+side is at most --max-size. The trimmed copies go to a trimmed/ directory
+next to the sources, with an index.json that records each image's original
+canvas size, crop offset and scale, so placement on the original canvas
+stays exact (see canvas_box). Unchanged sources are skipped.
+
+    python scripts/trim_assets.py                          # default sources
+    python scripts/trim_assets.py assets/hair-references/*.png --max-size 768
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageChops
+import argparse
+import glob
+import json
+import os
+from instrumentation import span
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.normpath(os.path.join(SCRIPT_DIR, '..'))
+SUBDIR = 'trimmed'
+INDEX_NAME = 'index.json'
+INDEX_VERSION = 1
+# Glob (repo-relative) -> longest side after trimming (None keeps print size)
+SOURCES = {
+    'renderer-mock/assets/overlays/characters/*.png': None,
+    'assets/hair-references/*.png': 1024,
+}
+# Max per-channel difference from the corner colour still counted as background
+TOLERANCE = 8
+
+
+def content_bbox(image, tolerance=TOLERANCE, alpha_threshold=0):
+    """(bbox, method) of the non-empty area; bbox is None for an empty image
+
+    method is 'alpha' when transparency decided it, 'solid' when the image
+    is opaque and margins were matched against the top-left pixel's colour.
+    """
+    if 'A' in image.getbands() or 'transparency' in image.info:
+        alpha = image.convert('RGBA').getchannel('A')
+        if alpha.getextrema()[0] < 255:
+            if alpha_threshold:
+                alpha = alpha.point([0] * (alpha_threshold + 1) + [255] * (255 - alpha_threshold))
+            return alpha.getbbox(), 'alpha'
+    rgb = image.convert('RGB')
+    diff = ImageChops.difference(rgb, Image.new('RGB', rgb.size, rgb.getpixel((0, 0))))
+    red, green, blue = diff.split()
+    spread = ImageChops.lighter(ImageChops.lighter(red, green), blue)
+    return spread.point([0] * (tolerance + 1) + [255] * (255 - tolerance)).getbbox(), 'solid'
+
+
+def trim_image(image, max_size=None, margin=0, tolerance=TOLERANCE, alpha_threshold=0):
+    """Crop image to its content (plus margin) and cap its longer side
+
+    Returns (trimmed image, placement) where placement holds the original
+    'canvas' [w, h], the crop 'offset' [x, y] and 'size' [w, h] on that
+    canvas, the 'scale' applied afterwards and the detection 'method'.
+    """
+    width, height = image.size
+    bbox, method = content_bbox(image, tolerance, alpha_threshold)
+    if bbox is None:
+        bbox, method = (0, 0, width, height), 'empty'
+    left, top, right, bottom = (max(0, bbox[0] - margin), max(0, bbox[1] - margin),
+                                min(width, bbox[2] + margin), min(height, bbox[3] + margin))
+    trimmed = image.crop((left, top, right, bottom))
+    scale = 1.0
+    if max_size and max(trimmed.size) > max_size:
+        scale = max_size / max(trimmed.size)
+        trimmed = trimmed.resize((max(1, round(trimmed.width * scale)), max(1, round(trimmed.height * scale))),
+                                 Image.Resampling.LANCZOS)
+    return trimmed, {'canvas': [width, height], 'offset': [left, top], 'size': [right - left, bottom - top],
+                     'scale': scale, 'method': method}
+
+
+def canvas_box(placement, canvas_size=None):
+    """Where a trimmed image belongs, as (left, top, right, bottom)
+
+    Coordinates are on the original canvas, or on a canvas resized to
+    canvas_size. Paste the trimmed image resized to that box to reproduce
+    the untrimmed layout.
+    """
+    fx = fy = 1.0
+    if canvas_size:
+        fx, fy = canvas_size[0] / placement['canvas'][0], canvas_size[1] / placement['canvas'][1]
+    (x, y), (w, h) = placement['offset'], placement['size']
+    return round(x * fx), round(y * fy), round((x + w) * fx), round((y + h) * fy)
+
+
+def output_path(source):
+    directory, filename = os.path.split(source)
+    return os.path.join(directory, SUBDIR, filename)
+
+
+def trim_file(source, settings):
+    """Trim one file into its trimmed/ directory; returns its index entry
+
+    Runs inside pool workers, so errors are returned under 'error'.
+    """
+    entry = {'error': None}
+    try:
+        st = os.stat(source)
+        with Image.open(source) as image:
+            with span('decode', tool='trim_assets') as s:
+                s.bytes_in = st.st_size
+                image.load()
+            if image.mode == 'P':
+                image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+            with span('transform', tool='trim_assets'):
+                trimmed, placement = trim_image(image, **settings)
+        path = output_path(source)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with span('encode', tool='trim_assets') as s:
+            trimmed.save(tmp_path, 'PNG')
+            os.replace(tmp_path, path)
+            s.bytes_out = os.path.getsize(path)
+        entry.update(placement, output=list(trimmed.size), source_size=st.st_size,
+                     source_mtime_ns=st.st_mtime_ns, bytes=s.bytes_out)
+    except Exception as e:
+        entry['error'] = str(e)
+    return entry
+
+
+class TrimIndex:
+    """Placement records for one trimmed/ directory, keyed by file name"""
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, INDEX_NAME)
+        self.entries = {}
+        self.dirty = False
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                self.entries = data['images']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def is_fresh(self, source, settings):
+        entry = self.entries.get(os.path.basename(source))
+        if not entry or entry.get('settings') != settings or not os.path.exists(output_path(source)):
+            return False
+        st = os.stat(source)
+        return [entry['source_size'], entry['source_mtime_ns']] == [st.st_size, st.st_mtime_ns]
+
+    def record(self, source, entry, settings):
+        entry = {key: value for key, value in entry.items() if key != 'error'}
+        entry['settings'] = settings
+        self.entries[os.path.basename(source)] = entry
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': INDEX_VERSION, 'images': self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def load_placement(trimmed_path):
+    """Index entry for a trimmed image, or None if it is not indexed"""
+    directory, filename = os.path.split(trimmed_path)
+    return TrimIndex(directory).entries.get(filename)
+
+
+def trim_many(jobs, workers=None, force=False):
+    """Trim (source, settings) pairs across a process pool
+
+    Yields (source, entry) in input order; entry is None when the trimmed
+    copy was already up to date.
+    """
+    indexes = {}
+    for source, settings in jobs:
+        directory = os.path.dirname(output_path(source))
+        if directory not in indexes:
+            indexes[directory] = TrimIndex(directory)
+    stale = {source for source, settings in jobs
+             if force or not indexes[os.path.dirname(output_path(source))].is_fresh(source, settings)}
+
+    def finish(source, settings, entry):
+        if entry is not None and not entry['error']:
+            indexes[os.path.dirname(output_path(source))].record(source, entry, settings)
+        return source, entry
+
+    try:
+        if workers == 1 or len(stale) <= 1:
+            for source, settings in jobs:
+                yield finish(source, settings, trim_file(source, settings) if source in stale else None)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {source: pool.submit(trim_file, source, settings)
+                       for source, settings in jobs if source in stale}
+            for source, settings in jobs:
+                yield finish(source, settings, futures[source].result() if source in futures else None)
+    finally:
+        for index in indexes.values():
+            index.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trim empty margins from overlays and reference images")
+    parser.add_argument('inputs', nargs='*', help="images to trim (default: overlays and hair references)")
+    parser.add_argument('--max-size', type=int, default=None,
+                        help="cap the longer side after trimming (default: per source, none for inputs)")
+    parser.add_argument('--margin', type=int, default=0, help="keep this many pixels around the content")
+    parser.add_argument('--tolerance', type=int, default=TOLERANCE,
+                        help="background colour tolerance for opaque images")
+    parser.add_argument('--alpha-threshold', type=int, default=0,
+                        help="treat alpha at or below this as transparent")
+    parser.add_argument('--workers', type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="re-trim even if up to date")
+    args = parser.parse_args()
+
+    def settings(max_size):
+        return {'max_size': args.max_size or max_size, 'margin': args.margin,
+                'tolerance': args.tolerance, 'alpha_threshold': args.alpha_threshold}
+
+    if args.inputs:
+        jobs = [(path, settings(None)) for path in args.inputs]
+    else:
+        jobs = [(path, settings(max_size)) for pattern, max_size in SOURCES.items()
+                for path in sorted(glob.glob(os.path.join(REPO_DIR, pattern)))]
+    if not jobs:
+        print("⚠ No images found")
+        return
+
+    before = after = failed = 0
+    for source, entry in trim_many(jobs, args.workers, args.force):
+        name = os.path.relpath(source)
+        if entry is None:
+            print(f"↷ Up to date: {name}")
+        elif entry['error']:
+            failed += 1
+            print(f"✗ Failed to trim {name}: {entry['error']}")
+        else:
+            before += entry['canvas'][0] * entry['canvas'][1]
+            after += entry['output'][0] * entry['output'][1]
+            (cw, ch), (ow, oh), (x, y) = entry['canvas'], entry['output'], entry['offset']
+            print(f"✓ {name}: {cw}x{ch} → {ow}x{oh} (offset {x},{y}, scale {entry['scale']:.3f}, {entry['method']})")
+
+    if before:
+        print(f"\n✓ Pixels to decode and send: {before / 1e6:.1f}M → {after / 1e6:.1f}M")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,118 @@
 #!/usr/bin/env python3
 """
 Update ComfyUI workflow JSON with correct asset paths
+
+The parsed workflow is walked once and PATH_* placeholders are replaced only
+where they prefix a string value, so keys and numbers are never touched.
+Mappings default to the repo's assets/ directory (or $LHB_ASSETS_DIR) and
+can be overridden with a JSON file via --config or $COMFYUI_PATH_MAPPINGS.
 """
+import argparse
 import json
 import os
+import re
+from instrumentation import span
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.environ.get('LHB_ASSETS_DIR', os.path.normpath(os.path.join(SCRIPT_DIR, '../assets')))
+DEFAULT_WORKFLOW = "docs/planning/comfy_ui_workflow_json_base_hair_overlay (1).json"
 
-# Define the path mappings
-path_mappings = {
-    "PATH_POSE_IMAGE": "/Users/jeff/Projects/little-hero-books/assets/poses/",
-    "PATH_MASKS": "/Users/jeff/Projects/little-hero-books/assets/masks/",
-    "PATH_MODELS/Checkpoints": "/Users/jeff/Projects/little-hero-books/assets/models/checkpoints/",
-    "PATH_MODELS/VAEs": "/Users/jeff/Projects/little-hero-books/assets/models/vaes/",
-    "PATH_MODELS/Loras": "/Users/jeff/Projects/little-hero-books/assets/models/loras/",
-    "PATH_MODELS/ControlNet": "/Users/jeff/Projects/little-hero-books/assets/models/controlnet/",
-    "PATH_OUTPUT": "/Users/jeff/Projects/little-hero-books/assets/output/"
+# Placeholder -> path relative to the assets directory
+PLACEHOLDERS = {
+    "PATH_POSE_IMAGE": "poses/",
+    "PATH_MASKS": "masks/",
+    "PATH_MODELS/Checkpoints": "models/checkpoints/",
+    "PATH_MODELS/VAEs": "models/vaes/",
+    "PATH_MODELS/Loras": "models/loras/",
+    "PATH_MODELS/ControlNet": "models/controlnet/",
+    "PATH_OUTPUT": "output/"
 }
 
-def update_workflow_paths(json_file_path):
-    """Update all PATH_* placeholders in the ComfyUI workflow JSON"""
-    
-    # Read the JSON file
-    with open(json_file_path, 'r') as f:
+
+def default_mappings(assets_dir=ASSETS_DIR):
+    """Return placeholder -> absolute path mappings rooted at assets_dir"""
+    return {placeholder: os.path.join(assets_dir, rel) for placeholder, rel in PLACEHOLDERS.items()}
+
+
+def load_mappings(config_path=None, assets_dir=ASSETS_DIR):
+    """Defaults, overlaid with a JSON {placeholder: path} file if one is given"""
+    mappings = default_mappings(assets_dir)
+    config_path = config_path or os.environ.get('COMFYUI_PATH_MAPPINGS')
+    if config_path:
+        with open(config_path, 'r') as f:
+            mappings.update(json.load(f))
+    return mappings
+
+
+def compile_mappings(mappings):
+    """Build a prefix matcher that prefers the longest placeholder"""
+    alternatives = sorted(mappings, key=len, reverse=True)
+    return re.compile('|'.join(re.escape(p) for p in alternatives)), mappings
+
+
+def rewrite_paths(workflow, mappings):
+    """Replace placeholder prefixes in every string value of workflow, in place
+
+    Returns the number of strings rewritten.
+    """
+    pattern, mappings = compile_mappings(mappings) if isinstance(mappings, dict) else mappings
+    rewritten = 0
+    stack = [workflow]
+    while stack:
+        node = stack.pop()
+        items = node.items() if isinstance(node, dict) else enumerate(node)
+        for key, value in items:
+            if isinstance(value, str):
+                match = pattern.match(value)
+                if match:
+                    node[key] = mappings[match.group(0)] + value[match.end():]
+                    rewritten += 1
+            elif isinstance(value, (dict, list)):
+                stack.append(value)
+    return rewritten
+
+
+def update_workflow_paths(json_file_path, mappings=None, output_path=None):
+    """Update all PATH_* placeholders in the ComfyUI workflow JSON
+
+    Writes to output_path (default: in place) and returns the number of
+    strings rewritten.
+    """
+    compiled = compile_mappings(mappings or load_mappings())
+
+    with span('json.parse', tool='update_comfyui_paths') as s, open(json_file_path, 'r') as f:
+        s.bytes_in = os.fstat(f.fileno()).st_size
         workflow = json.load(f)
-    
-    # Convert to string for replacement
-    workflow_str = json.dumps(workflow, indent=2)
-    
-    # Replace all PATH_* placeholders
-    for placeholder, real_path in path_mappings.items():
-        workflow_str = workflow_str.replace(placeholder, real_path)
-    
-    # Parse back to JSON to validate
-    updated_workflow = json.loads(workflow_str)
-    
-    # Write the updated file
-    with open(json_file_path, 'w') as f:
-        json.dump(updated_workflow, f, indent=2)
-    
-    print(f"✅ Updated {json_file_path} with correct paths")
-    print("Updated paths:")
-    for placeholder, real_path in path_mappings.items():
-        print(f"  {placeholder} → {real_path}")
+
+    with span('transform', tool='update_comfyui_paths'):
+        rewritten = rewrite_paths(workflow, compiled)
+
+    with span('json.serialize', tool='update_comfyui_paths') as s, open(output_path or json_file_path, 'w') as f:
+        json.dump(workflow, f, indent=2)
+        s.bytes_out = f.tell()
+
+    print(f"✅ Updated {output_path or json_file_path} ({rewritten} paths)")
+    return rewritten
+
 
 if __name__ == "__main__":
-    workflow_file = "docs/planning/comfy_ui_workflow_json_base_hair_overlay (1).json"
-    update_workflow_paths(workflow_file)
+    parser = argparse.ArgumentParser(description="Replace PATH_* placeholders in ComfyUI workflows")
+    parser.add_argument('workflows', nargs='*', default=[DEFAULT_WORKFLOW])
+    parser.add_argument('--config', help="JSON file of {placeholder: path} overrides")
+    parser.add_argument('--assets-dir', default=ASSETS_DIR, help="root for the default mappings")
+    parser.add_argument('--output-dir', help="write updated files here instead of in place")
+    args = parser.parse_args()
+
+    path_mappings = load_mappings(args.config, args.assets_dir)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    for workflow_file in args.workflows:
+        output_path = os.path.join(args.output_dir, os.path.basename(workflow_file)) if args.output_dir else None
+        try:
+            update_workflow_paths(workflow_file, path_mappings, output_path)
+        except (OSError, ValueError) as e:
+            print(f"❌ {workflow_file}: {e}")
 
+    print("Updated paths:")
+    for placeholder, real_path in path_mappings.items():
+        print(f"  {placeholder} → {real_path}")
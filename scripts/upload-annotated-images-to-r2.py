@@ -5,35 +5,24 @@ Upload annotated images to R2 storage
 This replaces the original images with annotated versions
 """
 
-import boto3
+import argparse
 import os
-from botocore.exceptions import ClientError
+from pose_pipeline import find_poses
+from r2_uploader import R2Uploader, report
 
-def upload_to_r2(file_path, bucket_name, object_key):
+def upload_to_r2(file_path, bucket_name, object_key, uploader=None):
     """Upload a file to R2 storage"""
-    try:
-        # R2 credentials (you'll need to set these)
-        r2_client = boto3.client(
-            's3',
-            endpoint_url='https://your-account-id.r2.cloudflarestorage.com',
-            aws_access_key_id='your-access-key',
-            aws_secret_access_key='your-secret-key',
-            region_name='auto'
-        )
-        
-        # Upload file
-        r2_client.upload_file(file_path, bucket_name, object_key)
-        print(f"✓ Uploaded: {object_key}")
-        return True
-        
-    except ClientError as e:
-        print(f"✗ Failed to upload {object_key}: {e}")
-        return False
-    except Exception as e:
-        print(f"✗ Error uploading {object_key}: {e}")
-        return False
+    uploader = uploader or R2Uploader(bucket_name)
+    results = uploader.upload_many([(file_path, object_key)])
+    return report(results) == 1
 
 def main():
+    parser = argparse.ArgumentParser(description="Upload annotated character and pose images to R2")
+    parser.add_argument('--stream', action='store_true',
+                        help="annotate the source poses and upload in memory (see asset_stream.py)")
+    parser.add_argument('--write', action='store_true', help="with --stream, also write assets/poses/annotated")
+    args = parser.parse_args()
+
     script_dir = os.path.dirname(os.path.abspath(__file__))
     
     # Paths
@@ -42,39 +31,34 @@ def main():
     
     # R2 configuration
     bucket_name = 'little-hero-assets'
+    uploader = R2Uploader(bucket_name)
     
     print("Uploading annotated images to R2...\n")
     
-    # Upload annotated character (replace base-character.png)
+    # Upload annotated character (replace base-character.png) alongside the poses
+    items = []
     if os.path.exists(character_file):
-        success = upload_to_r2(
-            character_file, 
-            bucket_name, 
-            'book-mvp-simple-adventure/characters/base-character.png'
-        )
-        if success:
-            print("✓ Character annotation uploaded")
+        items.append((character_file, 'book-mvp-simple-adventure/characters/base-character.png'))
     else:
         print(f"⚠ Character file not found: {character_file}")
     
     # Upload annotated pose images
-    pose_numbers = [1, 2, 3, 4, 5]
-    uploaded_count = 0
-    
-    for pose_num in pose_numbers:
-        padded_num = str(pose_num).zfill(2)
-        pose_file = os.path.join(poses_dir, f"pose{padded_num}.png")
+    if args.stream:
+        from asset_stream import PoseStream, report as stream_report
+        report(uploader.upload_many(items))
+        stream = PoseStream(uploader, upload=('annotated',), write=('annotated',) if args.write else ())
+        uploaded_count = stream_report(stream.run(find_poses()))
+    else:
+        pose_files = find_poses(poses_dir)
+        if not pose_files:
+            print(f"⚠ No annotated poses found in {poses_dir}")
+        items.extend((pose_file, f'book-mvp-simple-adventure/characters/poses/{os.path.basename(pose_file)}')
+                     for pose_file in pose_files)
         
-        if os.path.exists(pose_file):
-            success = upload_to_r2(
-                pose_file,
-                bucket_name,
-                f'book-mvp-simple-adventure/characters/poses/pose{padded_num}.png'
-            )
-            if success:
-                uploaded_count += 1
-        else:
-            print(f"⚠ Pose file not found: {pose_file}")
+        results = list(uploader.upload_many(items))
+        report(results)
+        uploaded_count = sum(1 for object_key, status, _ in results
+                             if status != 'failed' and '/poses/' in object_key)
     
     print(f"\n✓ Upload complete!")
     print(f"   Character: 1 file")
@@ -5,35 +5,24 @@ Upload edge map images to R2 storage
 This replaces pose references with pure structural outlines
 """
 
-import boto3
+import argparse
 import os
-from botocore.exceptions import ClientError
+from pose_pipeline import find_poses
+from r2_uploader import R2Uploader, report
 
-def upload_to_r2(file_path, bucket_name, object_key):
+def upload_to_r2(file_path, bucket_name, object_key, uploader=None):
     """Upload a file to R2 storage"""
-    try:
-        # R2 credentials (you'll need to set these)
-        r2_client = boto3.client(
-            's3',
-            endpoint_url='https://your-account-id.r2.cloudflarestorage.com',
-            aws_access_key_id='your-access-key',
-            aws_secret_access_key='your-secret-key',
-            region_name='auto'
-        )
-        
-        # Upload file
-        r2_client.upload_file(file_path, bucket_name, object_key)
-        print(f"✓ Uploaded: {object_key}")
-        return True
-        
-    except ClientError as e:
-        print(f"✗ Failed to upload {object_key}: {e}")
-        return False
-    except Exception as e:
-        print(f"✗ Error uploading {object_key}: {e}")
-        return False
+    uploader = uploader or R2Uploader(bucket_name)
+    results = uploader.upload_many([(file_path, object_key)])
+    return report(results) == 1
 
 def main():
+    parser = argparse.ArgumentParser(description="Upload edge maps to R2")
+    parser.add_argument('--stream', action='store_true',
+                        help="convert the source poses and upload in memory (see asset_stream.py)")
+    parser.add_argument('--write', action='store_true', help="with --stream, also write assets/poses/edges")
+    args = parser.parse_args()
+
     script_dir = os.path.dirname(os.path.abspath(__file__))
     
     # Paths
@@ -41,27 +30,25 @@ def main():
     
     # R2 configuration
     bucket_name = 'little-hero-assets'
+    uploader = R2Uploader(bucket_name)
     
-    print("Uploading edge map images to R2...\n")
-    
-    # Upload edge map pose images
-    pose_numbers = [1, 2, 3, 4, 5]
-    uploaded_count = 0
-    
-    for pose_num in pose_numbers:
-        padded_num = str(pose_num).zfill(2)
-        edge_file = os.path.join(edges_dir, f"pose{padded_num}.png")
+    if args.stream:
+        from asset_stream import PoseStream, report as stream_report
+        print("Streaming edge maps to R2...\n")
+        stream = PoseStream(uploader, upload=('edges',), write=('edges',) if args.write else ())
+        uploaded_count = stream_report(stream.run(find_poses()))
+    else:
+        print("Uploading edge map images to R2...\n")
+        
+        # Upload edge map pose images
+        edge_files = find_poses(edges_dir)
+        if not edge_files:
+            print(f"⚠ No edge maps found in {edges_dir}")
         
-        if os.path.exists(edge_file):
-            success = upload_to_r2(
-                edge_file,
-                bucket_name,
-                f'book-mvp-simple-adventure/characters/poses/pose{padded_num}.png'
-            )
-            if success:
-                uploaded_count += 1
-        else:
-            print(f"⚠ Edge file not found: {edge_file}")
+        uploaded_count = report(uploader.upload_many([
+            (edge_file, f'book-mvp-simple-adventure/characters/poses/{os.path.basename(edge_file)}')
+            for edge_file in edge_files
+        ]))
     
     print(f"\n✓ Upload complete!")
     print(f"   Edge maps: {uploaded_count} files")
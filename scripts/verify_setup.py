@@ -4,17 +4,40 @@ Verify ComfyUI setup is complete
 """
 import os
 import json
+from asset_manifest import load_manifest
+from model_verify import DigestCache, describe, verify_model
+
+def file_size(filepath, manifest=None):
+    """Size of a file from the asset manifest (or the filesystem outside assets/), None if missing
+
+    Relative paths are taken from the repo root in both cases.
+    """
+    manifest = manifest or load_manifest()
+    if manifest.key(filepath) is not None:
+        record = manifest.get(filepath)
+        return record['size'] if record else None
+    path = manifest.resolve(filepath)
+    return os.path.getsize(path) if os.path.isfile(path) else None
 
 def check_file_exists(filepath, description):
     """Check if a file exists and report status"""
-    if os.path.exists(filepath):
-        size = os.path.getsize(filepath)
+    size = file_size(filepath)
+    if size is not None:
         print(f"✅ {description}: {filepath} ({size:,} bytes)")
         return True
     else:
         print(f"❌ {description}: {filepath} - MISSING")
         return False
 
+def check_model(filepath, description, cache=None):
+    """Check a model file's safetensors header (not just that it exists)"""
+    result = verify_model(filepath, cache=cache)
+    if result['ok']:
+        print(f"✅ {description}: {filepath} ({describe(result)})")
+    else:
+        print(f"❌ {description}: {filepath} - {describe(result)}")
+    return result['ok']
+
 def verify_comfyui_setup():
     """Verify all required files and directories exist"""
     print("🔍 Verifying ComfyUI setup for Little Hero Books...\n")
@@ -47,8 +70,10 @@ def verify_comfyui_setup():
         ("assets/models/controlnet/openpose_fp16.safetensors", "OpenPose ControlNet")
     ]
     
+    cache = DigestCache()
     for filepath, description in models:
-        all_good &= check_file_exists(filepath, description)
+        all_good &= check_model(filepath, description, cache)
+    cache.save()
     
     # Check workflow file
     print("\n⚙️  Workflow File:")
@@ -64,7 +89,7 @@ def verify_comfyui_setup():
     ]
     
     for dirpath in output_dirs:
-        if os.path.exists(dirpath):
+        if load_manifest().is_dir(dirpath):
             print(f"✅ Output directory: {dirpath}")
         else:
             print(f"❌ Output directory: {dirpath} - MISSING")
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+
+"""
+n8n workflow validator and node index
+Every workflow export under docs/n8n-workflow-files is parsed in parallel and
+checked for structural problems n8n would reject on import: missing node
+fields, duplicate node ids or names, and connections whose source or target
+is not a node in the workflow. Node names, types and ids are kept in a
+persistent index (.cache/workflow-index.json) that is refreshed only for
+files whose size or mtime changed, so lookups do not re-read every export.
+
+    python scripts/workflow_index.py check                # whole tree
+    python scripts/workflow_index.py check new-flow.json  # pre-import check
+    python scripts/workflow_index.py find --type code --name "Story"
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import os
+import sys
+from instrumentation import span
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKFLOW_DIR = os.path.normpath(os.path.join(SCRIPT_DIR, '../docs/n8n-workflow-files'))
+INDEX_PATH = os.path.normpath(os.path.join(SCRIPT_DIR, '../.cache/workflow-index.json'))
+# Bump when the per-file record format or the checks change
+INDEX_VERSION = 1
+
+
+def iter_connections(workflow):
+    """Yield (source, output_type, output_index, target) for every edge"""
+    for source, outputs in (workflow.get('connections') or {}).items():
+        if not isinstance(outputs, dict):
+            yield source, None, None, None
+            continue
+        for output_type, branches in outputs.items():
+            if not isinstance(branches, (list, type(None))):
+                yield source, None, None, None
+                continue
+            for output_index, edges in enumerate(branches or []):
+                if not isinstance(edges, (list, type(None))):
+                    yield source, output_type, output_index, None
+                    continue
+                for edge in edges or []:
+                    yield source, output_type, output_index, edge.get('node') if isinstance(edge, dict) else None
+
+
+def validate_workflow(workflow):
+    """Return a list of structural problems (empty when the workflow looks importable)"""
+    if not isinstance(workflow, dict):
+        return ["top level is not a JSON object"]
+    nodes = workflow.get('nodes')
+    if not isinstance(nodes, list):
+        return ["missing 'nodes' list"]
+    if not isinstance(workflow.get('connections', {}), dict):
+        return ["'connections' is not an object"]
+
+    problems = []
+    names, ids = set(), set()
+    for position, node in enumerate(nodes):
+        if not isinstance(node, dict):
+            problems.append(f"node #{position} is not an object")
+            continue
+        name = node.get('name')
+        label = name or f"#{position}"
+        for field in ('name', 'type'):
+            if not node.get(field):
+                problems.append(f"node {label!r} has no {field}")
+        if name and not isinstance(name, str):
+            problems.append(f"node #{position} name is not a string")
+        elif name:
+            if name in names:
+                problems.append(f"duplicate node name {name!r}")
+            names.add(name)
+        node_id = node.get('id')
+        if node_id is not None and not isinstance(node_id, (str, int)):
+            problems.append(f"node {label!r} id is not a string")
+        elif node_id is not None:
+            if node_id in ids:
+                problems.append(f"duplicate node id {node_id!r} ({label!r})")
+            ids.add(node_id)
+
+    for source in workflow.get('connections') or {}:
+        if source not in names:
+            problems.append(f"connection from unknown node {source!r}")
+    for source, output_type, output_index, target in iter_connections(workflow):
+        if output_type is None:
+            problems.append(f"malformed connections for {source!r}")
+        elif target is None:
+            problems.append(f"malformed edge {source!r} [{output_type}:{output_index}]")
+        elif target not in names:
+            problems.append(f"dangling edge {source!r} [{output_type}:{output_index}] → {target!r}")
+    return problems
+
+
+def scan_file(path):
+    """Parse and validate one workflow file
+
+    Returns {'name', 'nodes': [[name, type, id], ...], 'problems': [...]}.
+    """
+    try:
+        with span('json.parse', tool='workflow_index') as s, open(path, 'r', encoding='utf-8') as f:
+            s.bytes_in = os.fstat(f.fileno()).st_size
+            workflow = json.load(f)
+    except (OSError, ValueError) as e:
+        return {'name': None, 'nodes': [], 'problems': [f"cannot parse: {e}"]}
+    nodes = workflow.get('nodes') if isinstance(workflow, dict) else None
+    return {
+        'name': workflow.get('name') if isinstance(workflow, dict) else None,
+        'nodes': [[node.get('name'), node.get('type'), node.get('id')]
+                  for node in nodes or [] if isinstance(node, dict)],
+        'problems': validate_workflow(workflow),
+    }
+
+
+def find_workflows(root=WORKFLOW_DIR):
+    """Return every *.json file under root, sorted"""
+    found = []
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith('.json') and entry.is_file():
+                    found.append(entry.path)
+    return sorted(found)
+
+
+def scan_many(paths, workers=None):
+    """Scan paths across a process pool; yields (path, record) in input order"""
+    if workers == 1 or len(paths) <= 1:
+        for path in paths:
+            yield path, scan_file(path)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from zip(paths, pool.map(scan_file, paths, chunksize=4))
+
+
+class WorkflowIndex:
+    """Persistent per-file record of nodes and problems, refreshed by (size, mtime)"""
+
+    def __init__(self, index_path=INDEX_PATH):
+        self.index_path = index_path
+        self.root = os.path.dirname(os.path.abspath(index_path))
+        self.files = {}
+        self.dirty = False
+        try:
+            with open(index_path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                self.files = data.get('files', {})
+        except (OSError, ValueError):
+            pass
+
+    def _rel(self, path):
+        return os.path.relpath(os.path.abspath(path), self.root)
+
+    def _abs(self, rel):
+        return os.path.normpath(os.path.join(self.root, rel))
+
+    def update(self, root=WORKFLOW_DIR, workers=None):
+        """Rescan files under root that are new or changed and forget deleted ones
+
+        Returns the number of files rescanned.
+        """
+        stale = []
+        seen = set()
+        for path in find_workflows(root):
+            rel = self._rel(path)
+            seen.add(rel)
+            st = os.stat(path)
+            entry = self.files.get(rel)
+            if not entry or entry['stat'] != [st.st_size, st.st_mtime_ns]:
+                stale.append((path, [st.st_size, st.st_mtime_ns]))
+
+        prefix = self._rel(root) + os.sep
+        for rel in [rel for rel in self.files if rel.startswith(prefix) and rel not in seen]:
+            del self.files[rel]
+            self.dirty = True
+
+        stamps = dict(stale)
+        for path, record in scan_many([path for path, _ in stale], workers):
+            record['stat'] = stamps[path]
+            self.files[self._rel(path)] = record
+            self.dirty = True
+        return len(stale)
+
+    def problems(self):
+        """Yield (path, problems) for every indexed file that has any"""
+        for rel, record in sorted(self.files.items()):
+            if record['problems']:
+                yield self._abs(rel), record['problems']
+
+    def find(self, name=None, node_type=None):
+        """Yield (path, workflow_name, node_name, node_type, node_id)
+
+        name and node_type match case-insensitive substrings; either may be
+        omitted.
+        """
+        name = name.lower() if name else None
+        node_type = node_type.lower() if node_type else None
+        for rel, record in sorted(self.files.items()):
+            for node_name, type_, node_id in record['nodes']:
+                if name and name not in (node_name or '').lower():
+                    continue
+                if node_type and node_type not in (type_ or '').lower():
+                    continue
+                yield self._abs(rel), record['name'], node_name, type_, node_id
+
+    def save(self):
+        """Write the index atomically if anything changed"""
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': INDEX_VERSION, 'files': self.files}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
+        self.dirty = False
+
+
+def report(results):
+    """Print a ✓/✗ block per (path, record) and return the number of files with problems"""
+    failed = 0
+    for path, record in results:
+        if record['problems']:
+            failed += 1
+            print(f"✗ {path}")
+            for problem in record['problems']:
+                print(f"    {problem}")
+        else:
+            print(f"✓ {path} ({len(record['nodes'])} nodes)")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate and search n8n workflow exports")
+    parser.add_argument('--root', default=WORKFLOW_DIR, help="workflow tree to index")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="process pool size (default: CPU count)")
+    parser.add_argument('--rebuild', action='store_true', help="ignore the saved index")
+    commands = parser.add_subparsers(dest='command', required=True)
+    check = commands.add_parser('check', help="validate files (default: the whole tree)")
+    check.add_argument('paths', nargs='*', help="check these files instead of the indexed tree")
+    find = commands.add_parser('find', help="list nodes matching a name and/or type")
+    find.add_argument('--name')
+    find.add_argument('--type', dest='node_type')
+    args = parser.parse_args()
+
+    if args.command == 'check' and args.paths:
+        failed = report(scan_many(args.paths, args.workers))
+        print(f"\n{'✗' if failed else '✓'} {len(args.paths) - failed}/{len(args.paths)} workflows valid")
+        sys.exit(1 if failed else 0)
+
+    index = WorkflowIndex()
+    if args.rebuild:
+        index.files = {}
+    rescanned = index.update(args.root, args.workers)
+    index.save()
+
+    if args.command == 'check':
+        total = len(index.files)
+        failed = 0
+        for path, problems in index.problems():
+            failed += 1
+            print(f"✗ {path}")
+            for problem in problems:
+                print(f"    {problem}")
+        print(f"{'✗' if failed else '✓'} {total - failed}/{total} workflows valid ({rescanned} rescanned)")
+        sys.exit(1 if failed else 0)
+
+    if not (args.name or args.node_type):
+        parser.error("find needs --name and/or --type")
+    matches = 0
+    for path, workflow_name, node_name, node_type, node_id in index.find(args.name, args.node_type):
+        matches += 1
+        print(f"{os.path.relpath(path)}  [{workflow_name}]  {node_name}  ({node_type}, id={node_id})")
+    print(f"\n{matches} node(s) found")
+
+
+if __name__ == "__main__":
+    main()
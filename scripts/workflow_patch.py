@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+
+"""
+Declarative patches for n8n workflow exports
+Each workflow is parsed once, its nodes are indexed by id and name, a list of
+patches is applied to the parsed tree and the result is validated and
+serialized once. The same patch list can be applied to many workflow files
+in one run.
+
+A patch file is a JSON list of operations:
+
+    [{"op": "set_code", "node": "Update Order Status Complete", "code_file": "node13-fixed.txt"},
+     {"op": "set_parameter", "node": "Wait", "path": "amount", "value": 5},
+     {"op": "rewire", "source": "Wait", "target": "Poll PDFMonkey until ready"},
+     {"op": "disconnect", "source": "Log Assembly Results"}]
+
+Nodes are addressed by id or name. code_file paths are relative to the patch
+file.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import os
+import sys
+from instrumentation import span
+from workflow_index import validate_workflow
+
+CODE_FIELDS = ('jsCode', 'functionCode', 'pythonCode')
+
+
+class Workflow:
+    """A parsed workflow with its nodes indexed by id and by name"""
+
+    def __init__(self, data):
+        self.data = data
+        self.by_id = {}
+        self.by_name = {}
+        for node in data.get('nodes', []):
+            if node.get('id') is not None:
+                self.by_id[node['id']] = node
+            self.by_name[node.get('name')] = node
+
+    @classmethod
+    def load(cls, path):
+        with span('json.parse', tool='workflow_patch') as s, open(path, 'r', encoding='utf-8') as f:
+            s.bytes_in = os.fstat(f.fileno()).st_size
+            # strict=False accepts raw newlines inside code strings, which
+            # hand-edited exports often contain
+            return cls(json.load(f, strict=False))
+
+    def save(self, path):
+        tmp_path = path + '.tmp'
+        with span('json.serialize', tool='workflow_patch') as s:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, indent=2, ensure_ascii=False)
+                s.bytes_out = f.tell()
+            os.replace(tmp_path, path)
+
+    def node(self, ref):
+        """Return the node with this id or name"""
+        node = self.by_id.get(ref) or self.by_name.get(ref)
+        if node is None:
+            raise KeyError(f"no node {ref!r}")
+        return node
+
+    def rename(self, node, name):
+        """Rename a node and every connection that refers to it"""
+        old = node['name']
+        connections = self.data.setdefault('connections', {})
+        if old in connections:
+            connections[name] = connections.pop(old)
+        for outputs in connections.values():
+            for branches in outputs.values():
+                for edges in branches or []:
+                    for edge in edges or []:
+                        if edge.get('node') == old:
+                            edge['node'] = name
+        del self.by_name[old]
+        node['name'] = name
+        self.by_name[name] = node
+
+
+def set_code(workflow, patch):
+    node = workflow.node(patch['node'])
+    parameters = node.setdefault('parameters', {})
+    field = next((f for f in CODE_FIELDS if f in parameters),
+                 'functionCode' if node.get('type', '').endswith('.function') else 'jsCode')
+    parameters[field] = patch['code']
+    return f"set {field} of {node['name']!r} ({len(patch['code'])} chars)"
+
+
+def set_parameter(workflow, patch):
+    node = workflow.node(patch['node'])
+    path = patch['path'].split('.') if isinstance(patch['path'], str) else list(patch['path'])
+    target = node.setdefault('parameters', {})
+    for part in path[:-1]:
+        target = target.setdefault(part, {})
+    target[path[-1]] = patch['value']
+    return f"set {'.'.join(path)} of {node['name']!r}"
+
+
+def rename_node(workflow, patch):
+    node = workflow.node(patch['node'])
+    old = node['name']
+    workflow.rename(node, patch['name'])
+    return f"renamed {old!r} → {patch['name']!r}"
+
+
+def _branch(workflow, source, output_type, output):
+    branches = workflow.data.setdefault('connections', {}).setdefault(source, {}).setdefault(output_type, [])
+    while len(branches) <= output:
+        branches.append([])
+    return branches
+
+
+def rewire(workflow, patch):
+    """Point a source output at target, replacing its edges unless append is set"""
+    source = workflow.node(patch['source'])['name']
+    target = workflow.node(patch['target'])['name']
+    output_type = patch.get('type', 'main')
+    output = patch.get('output', 0)
+    branches = _branch(workflow, source, output_type, output)
+    edge = {'node': target, 'type': output_type, 'index': patch.get('input', 0)}
+    if patch.get('append'):
+        if edge not in branches[output]:
+            branches[output].append(edge)
+    else:
+        branches[output] = [edge]
+    return f"wired {source!r} [{output_type}:{output}] → {target!r}"
+
+
+def disconnect(workflow, patch):
+    """Drop a source's edges (one output, or all of them), optionally only those to target"""
+    source = workflow.node(patch['source'])['name']
+    target = workflow.node(patch['target'])['name'] if patch.get('target') else None
+    outputs = workflow.data.get('connections', {}).get(source, {})
+    for output_type, branches in outputs.items():
+        for output, edges in enumerate(branches or []):
+            if 'output' in patch and output != patch['output']:
+                continue
+            branches[output] = [e for e in edges or [] if target and e.get('node') != target]
+    return f"disconnected {source!r}" + (f" from {target!r}" if target else "")
+
+
+OPERATIONS = {
+    'set_code': set_code,
+    'set_parameter': set_parameter,
+    'rename': rename_node,
+    'rewire': rewire,
+    'disconnect': disconnect,
+}
+
+
+def load_patches(path):
+    """Read a patch list, inlining any code_file references"""
+    with open(path, 'r', encoding='utf-8') as f:
+        patches = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    for patch in patches:
+        if 'code_file' in patch:
+            with open(os.path.join(base, patch.pop('code_file')), 'r', encoding='utf-8') as f:
+                patch['code'] = f.read()
+    return patches
+
+
+def apply_patches(workflow, patches):
+    """Apply patches to a Workflow in order; returns a description per patch"""
+    applied = []
+    for patch in patches:
+        operation = OPERATIONS.get(patch.get('op'))
+        if operation is None:
+            raise ValueError(f"unknown patch op {patch.get('op')!r}")
+        applied.append(operation(workflow, patch))
+    return applied
+
+
+def patch_file(input_path, patches, output_path=None, dry_run=False):
+    """Patch one workflow file
+
+    Returns {'path', 'applied', 'problems', 'error'}. The output is only
+    written when every patch applied and the result validates.
+    """
+    result = {'path': output_path or input_path, 'applied': [], 'problems': [], 'error': None}
+    try:
+        workflow = Workflow.load(input_path)
+        result['applied'] = apply_patches(workflow, patches)
+        result['problems'] = validate_workflow(workflow.data)
+        if not result['problems'] and not dry_run:
+            workflow.save(output_path or input_path)
+    except (OSError, ValueError, KeyError) as e:
+        result['error'] = str(e)
+    return result
+
+
+def patch_many(input_paths, patches, output_dir=None, suffix='', workers=None, dry_run=False):
+    """Patch many workflow files across a process pool; yields results in input order"""
+    def output_for(path):
+        stem, ext = os.path.splitext(os.path.basename(path))
+        directory = output_dir or os.path.dirname(path)
+        return os.path.join(directory, stem + suffix + ext) if (output_dir or suffix) else None
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    jobs = [(path, patches, output_for(path), dry_run) for path in input_paths]
+    if workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield patch_file(*job)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(patch_file, *job) for job in jobs]
+        for future in futures:
+            yield future.result()
+
+
+def report(results):
+    """Print a ✓/✗ block per patched file and return the number that succeeded"""
+    done = 0
+    for result in results:
+        if result['error'] or result['problems']:
+            print(f"✗ {result['path']}: {result['error'] or 'result does not validate'}")
+            for problem in result['problems']:
+                print(f"    {problem}")
+            continue
+        print(f"✓ {result['path']}")
+        for line in result['applied']:
+            print(f"    {line}")
+        done += 1
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply declarative patches to n8n workflow exports")
+    parser.add_argument('patches', help="JSON patch list")
+    parser.add_argument('workflows', nargs='+')
+    parser.add_argument('--output-dir', help="write patched files here instead of in place")
+    parser.add_argument('--suffix', default='', help="append to output file names, e.g. -fixed")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="process pool size (default: CPU count)")
+    parser.add_argument('--dry-run', action='store_true', help="apply and validate without writing")
+    args = parser.parse_args()
+
+    patches = load_patches(args.patches)
+    done = report(patch_many(args.workflows, patches, args.output_dir, args.suffix,
+                             args.workers, args.dry_run))
+    print(f"\n{'✓' if done == len(args.workflows) else '✗'} Patched {done}/{len(args.workflows)} workflows")
+    sys.exit(0 if done == len(args.workflows) else 1)
+
+
+if __name__ == "__main__":
+    main()